@@ -1,14 +1,40 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import argparse
+import base64
+import bisect
+import contextlib
+import fnmatch
+import functools
+import hashlib
+import http.client
+import io
+import itertools
+import ctypes
+import ctypes.util
+import fcntl
+import json
+import logging
+import lzma
+import mmap
 import os
 import re
+import select
 import sys
 import shutil
+import signal
 import stat
+import struct
 import subprocess
 import tempfile
 import threading
+import time
+import traceback
+import urllib.parse
+import urllib.request
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
@@ -28,6 +54,8 @@ DEFAULT_INSTALL_DIR = os.path.join(os.path.expanduser("~"), "Applications")
 
 DESKTOP_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "applications")
 ICON_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "icons", "aliux")
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "aliux")
+STATE_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "aliux")
 
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
 HEADER_IMAGE_PATH = os.path.join(ASSETS_DIR, "aliux.png")
@@ -40,6 +68,8 @@ HEADER_MAX_H = 165
 ALIUX_DESKTOP_TAG = "X-Aliux-Installer"
 ALIUX_DESKTOP_TAG_VALUE = "true"
 
+LOG = logging.getLogger("aliux")
+
 
 CATEGORY_MAP = {
     "Audio": "AudioVideo;Audio;",
@@ -71,25 +101,105 @@ def set_executable(path: str) -> None:
     os.chmod(path, st.st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
 
 
-def atomic_copy_replace(src: str, dst: str) -> None:
+# Copie par gros blocs alignés sur la taille de page (8 Mio)
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+# Tous les 64 Mio écrits: fdatasync + éviction des pages de la destination
+COPY_WRITEBACK_BYTES = 64 * 1024 * 1024
+
+
+def _fadvise(fd: int, offset: int, length: int, advice_name: str) -> None:
+    """posix_fadvise si disponible (indication au noyau, erreurs ignorées)."""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
+
+
+def copy_file_chunked(src: str, dst_fd: int, progress=None, sink=None) -> int:
+    """Copie le contenu de src dans le descripteur dst_fd, bloc par bloc.
+
+    - lecture séquentielle annoncée au noyau (POSIX_FADV_SEQUENTIAL);
+    - les pages déjà copiées (source et destination) sont libérées avec
+      POSIX_FADV_DONTNEED: une copie de plusieurs Go n'évince pas le cache de l'utilisateur;
+    - progress(octets_copiés, total) est appelé après chaque bloc; il peut lever une
+      exception (ex: JobCancelled) pour interrompre la copie;
+    - sink(bloc) reçoit chaque bloc lu (ex: hashlib.sha256().update): l'empreinte est
+      calculée pendant la copie, sans relire le fichier.
+
+    Retourne le nombre d'octets copiés.
+    """
+    chunk = max(mmap.PAGESIZE, COPY_CHUNK_SIZE - COPY_CHUNK_SIZE % mmap.PAGESIZE)
+    buf = bytearray(chunk)
+    view = memoryview(buf)
+
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        total = os.fstat(src_fd).st_size
+        _fadvise(src_fd, 0, 0, "POSIX_FADV_SEQUENTIAL")
+
+        done = 0
+        synced = 0
+        if progress:
+            progress(0, total)
+        while True:
+            n = os.readv(src_fd, [buf])
+            if n <= 0:
+                break
+            out = view[:n]
+            if sink:
+                sink(out)
+            while out:
+                w = os.write(dst_fd, out)
+                out = out[w:]
+            _fadvise(src_fd, done, n, "POSIX_FADV_DONTNEED")
+            done += n
+
+            if done - synced >= COPY_WRITEBACK_BYTES:
+                os.fdatasync(dst_fd)
+                _fadvise(dst_fd, synced, done - synced, "POSIX_FADV_DONTNEED")
+                synced = done
+
+            if progress:
+                progress(done, max(total, done))
+
+        os.fsync(dst_fd)
+        _fadvise(dst_fd, synced, 0, "POSIX_FADV_DONTNEED")
+        return done
+    finally:
+        os.close(src_fd)
+
+
+def atomic_copy_replace(src: str, dst: str, progress=None, sink=None, before_replace=None) -> None:
     """Copie src vers dst en mode atomique.
 
     Stratégie:
-    - copie vers un fichier temporaire dans le même dossier
+    - copie par blocs (copy_file_chunked) vers un fichier temporaire dans le même dossier
     - chmod +x si possible
     - os.replace(tmp, dst) (remplacement atomique sur le même FS)
 
     Avantage:
     - si une ancienne version est en cours d'exécution, elle conserve son inode;
       la nouvelle version devient immédiatement le fichier à cet emplacement.
+
+    `progress(octets_copiés, total)`, `sink(bloc)` : voir copy_file_chunked().
+    `before_replace(tmp)` est appelé une fois la copie terminée, avant la mise en place:
+    une exception annule l'opération (ex: signature invalide) sans toucher à dst.
     """
     dst_dir = os.path.dirname(dst)
     ensure_dir(dst_dir)
 
     fd, tmp_path = tempfile.mkstemp(prefix=".aliux-tmp-", dir=dst_dir)
-    os.close(fd)
     try:
-        shutil.copy2(src, tmp_path)
+        try:
+            copy_file_chunked(src, fd, progress=progress, sink=sink)
+        finally:
+            os.close(fd)
+        shutil.copystat(src, tmp_path)
+        if before_replace:
+            before_replace(tmp_path)
         try:
             set_executable(tmp_path)
         except Exception:
@@ -107,6 +217,30 @@ def atomic_copy_replace(src: str, dst: str) -> None:
             pass
 
 
+@contextlib.contextmanager
+def atomic_output(dst: str, mode: int | None = None):
+    """Écrit dst de façon atomique: fichier temporaire (.aliux-tmp-*) dans le même dossier,
+    fsync puis os.replace() en sortie normale; supprimé en cas d'exception.
+    """
+    dst_dir = os.path.dirname(dst)
+    ensure_dir(dst_dir)
+    fd, tmp_path = tempfile.mkstemp(prefix=".aliux-tmp-", dir=dst_dir)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, dst)
+    finally:
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except Exception:
+            pass
+
+
 def default_browse_dir() -> str:
     """Dossier de départ pour les boîtes de dialogue (priorité aux supports amovibles)."""
     user = os.environ.get("USER") or os.environ.get("USERNAME") or ""
@@ -181,7 +315,7 @@ def is_non_executable_mount(path: str) -> bool:
     return False
 
 
-def ensure_self_local_copy() -> str | None:
+def ensure_self_local_copy(progress=None) -> str | None:
     """Copie l'AppImage d'Aliux dans ~/Applications/Aliux/ et la rend exécutable.
 
     Important:
@@ -190,6 +324,7 @@ def ensure_self_local_copy() -> str | None:
         ~/Applications/Aliux/Aliux.AppImage
 
     Retourne le chemin de l'AppImage locale, ou None si non applicable.
+    `progress` est transmis à atomic_copy_replace() (une annulation est propagée).
     """
     src = os.environ.get("APPIMAGE")
     if not src or not os.path.isfile(src):
@@ -212,8 +347,10 @@ def ensure_self_local_copy() -> str | None:
         except Exception:
             pass
 
-        atomic_copy_replace(src, dest)
+        atomic_copy_replace(src, dest, progress=progress)
         return dest
+    except JobCancelled:
+        raise
     except Exception:
         return None
 
@@ -303,8 +440,12 @@ def read_text_file(path: str, max_bytes: int = 300_000) -> str:
 
 def parse_desktop_file(desktop_path: str) -> dict:
     """Parse simple d'un .desktop (section [Desktop Entry]) -> dict clé=valeur."""
+    return parse_desktop_text(read_text_file(desktop_path))
+
+
+def parse_desktop_text(txt: str) -> dict:
+    """Comme parse_desktop_file(), à partir du texte du lanceur."""
     out = {}
-    txt = read_text_file(desktop_path)
     in_entry = False
     for line in txt.splitlines():
         line = line.strip()
@@ -321,6 +462,72 @@ def parse_desktop_file(desktop_path: str) -> dict:
     return out
 
 
+# ---------------------------------------------------------------------------
+# Configuration (~/.config/aliux/config.json, optionnelle)
+# ---------------------------------------------------------------------------
+
+CONFIG_PATH = os.path.join(os.path.expanduser("~"), ".config", "aliux", "config.json")
+
+DEFAULT_CONFIG = {
+    # Dossiers surveillés par « aliux watch » (vide : dossier de téléchargement XDG)
+    "watch_dirs": [],
+    # Délai sans changement de taille avant d'installer un fichier arrivé (s)
+    "watch_settle_seconds": 3.0,
+    # Période du mode scrutation (si inotify est indisponible) (s)
+    "watch_poll_seconds": 5.0,
+    # Trousseau GnuPG des clés de confiance (format binaire: gpg --export > fichier)
+    "signature_keyring": os.path.join(os.path.dirname(CONFIG_PATH), "trusted-keys.gpg"),
+    # Signatures embarquées: "off", "warn" (seule une signature invalide bloque) ou "require"
+    "signature_policy": "warn",
+    # Dossiers parcourus par « aliux adopt » (vide : ~/Applications et dossier de téléchargement)
+    "adopt_dirs": [],
+    # Dépôt local d'AppImage approuvées (dossier partagé…) pour « aliux repo » et les mises à jour
+    "repo_dir": None,
+    # Téléchargements HTTP: segments parallèles pour les gros fichiers (1: un seul flux)
+    "download_segments": 4,
+    # Métriques au format node_exporter (collecteur « textfile »), ex.
+    # "/var/lib/prometheus/node-exporter/aliux.prom"; None: désactivées
+    "metrics_textfile": None,
+    # Recompression après installation (tâche de fond): None (désactivée), "zstd" ou "lz4";
+    # nécessite unsquashfs et mksquashfs
+    "recompress": None,
+    # Priorité des tâches de fond (installations en lot, vérification, ménage, mode veille):
+    # nice (0-19) et classe d'E/S ("idle", "best-effort" + niveau 0-7, "none": inchangée);
+    # installations interactives: priorité normale
+    "background_nice": 10,
+    "background_ioclass": "idle",
+    "background_iolevel": 7,
+}
+
+
+def load_config() -> dict:
+    """Configuration utilisateur fusionnée avec DEFAULT_CONFIG (fichier absent = défauts)."""
+    cfg = dict(DEFAULT_CONFIG)
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            cfg.update(data)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        LOG.warning("Configuration illisible (%s) : %s", CONFIG_PATH, e)
+    return cfg
+
+
+def xdg_download_dir() -> str:
+    """Dossier de téléchargement XDG (ex: ~/Téléchargements), ~/Downloads à défaut."""
+    home = os.path.expanduser("~")
+    try:
+        txt = read_text_file(os.path.join(home, ".config", "user-dirs.dirs"))
+        m = re.search(r'^XDG_DOWNLOAD_DIR="([^"]+)"', txt, re.M)
+        if m:
+            return m.group(1).replace("$HOME", home)
+    except OSError:
+        pass
+    return os.path.join(home, "Downloads")
+
+
 def _fit_header_image(path: str, max_w: int, max_h: int) -> tk.PhotoImage:
     """
     Charge une image depuis 'path' et la redimensionne pour tenir dans max_w/max_h.
@@ -409,31 +616,396 @@ def find_best_icon_in_extract(root_dir: str, icon_hint: str | None) -> str | Non
     return None
 
 
-def try_extract_appimage_metadata(appimage_path: str) -> tuple[str | None, str | None, str | None]:
-    """Retourne (suggested_name, icon_file_path, icon_hint) via --appimage-extract."""
+# ---------------------------------------------------------------------------
+# Inspection AppImage (ELF + superbloc squashfs) et espace disque
+# ---------------------------------------------------------------------------
+
+# Identifiants de compression squashfs -> facteur d'expansion estimé (prudent)
+SQUASHFS_COMPRESSION = {1: "gzip", 2: "lzma", 3: "lzo", 4: "xz", 5: "lz4", 6: "zstd"}
+_SQUASHFS_EXPANSION = {"gzip": 2.8, "lzma": 3.5, "lzo": 2.5, "xz": 3.5, "lz4": 2.2, "zstd": 3.2}
+
+# Marge de sécurité ajoutée à chaque système de fichiers sollicité
+PREFLIGHT_MARGIN = 64 * 1024 * 1024
+# Tailles forfaitaires (lanceur .desktop, icône copiée)
+PREFLIGHT_DESKTOP_BYTES = 64 * 1024
+PREFLIGHT_ICON_BYTES = 4 * 1024 * 1024
+
+
+class InsufficientSpaceError(RuntimeError):
+    """Espace disque insuffisant pour mener l'opération à bien."""
+
+
+def appimage_payload_offset(path) -> int | None:
+    """Position du système de fichiers squashfs dans une AppImage de type 2.
+
+    Le runtime ELF est suivi directement du squashfs: la position est la fin de la
+    table des en-têtes de sections (e_shoff + e_shentsize * e_shnum).
+    `path` peut aussi être un fichier binaire déjà ouvert.
+    """
+    try:
+        with (open(path, "rb") if isinstance(path, str) else contextlib.nullcontext(path)) as f:
+            f.seek(0)
+            ident = f.read(64)
+    except OSError:
+        return None
+    if len(ident) < 64 or ident[:4] != b"\x7fELF":
+        return None
+    endian = "<" if ident[5] == 1 else ">"
+    if ident[4] == 2:  # ELF64
+        e_shoff = struct.unpack_from(endian + "Q", ident, 0x28)[0]
+        e_shentsize, e_shnum = struct.unpack_from(endian + "HH", ident, 0x3A)
+    elif ident[4] == 1:  # ELF32
+        e_shoff = struct.unpack_from(endian + "I", ident, 0x20)[0]
+        e_shentsize, e_shnum = struct.unpack_from(endian + "HH", ident, 0x2E)
+    else:
+        return None
+    return e_shoff + e_shentsize * e_shnum
+
+
+def read_elf_sections(path) -> dict[str, tuple[int, int]]:
+    """Sections ELF de l'AppImage {nom: (position, taille)}, lues sans exécuter le fichier.
+
+    Sert à lire .upd_info (informations de mise à jour), .sha256_sig / .sig_key
+    (signature) ou .digest_md5. `path` peut aussi être un fichier binaire déjà ouvert
+    (ex: io.BytesIO du début d'un téléchargement).
+    """
+    with (open(path, "rb") if isinstance(path, str) else contextlib.nullcontext(path)) as f:
+        f.seek(0)
+        ident = f.read(64)
+        if len(ident) < 64 or ident[:4] != b"\x7fELF":
+            return {}
+        endian = "<" if ident[5] == 1 else ">"
+        if ident[4] == 2:  # ELF64
+            e_shoff = struct.unpack_from(endian + "Q", ident, 0x28)[0]
+            e_shentsize, e_shnum, e_shstrndx = struct.unpack_from(endian + "HHH", ident, 0x3A)
+            sh_fmt = endian + "IIQQQQ"
+        elif ident[4] == 1:  # ELF32
+            e_shoff = struct.unpack_from(endian + "I", ident, 0x20)[0]
+            e_shentsize, e_shnum, e_shstrndx = struct.unpack_from(endian + "HHH", ident, 0x2E)
+            sh_fmt = endian + "IIIIII"
+        else:
+            return {}
+        if not e_shoff or not e_shnum or e_shstrndx >= e_shnum or e_shentsize < struct.calcsize(sh_fmt):
+            return {}
+
+        f.seek(e_shoff)
+        table = f.read(e_shentsize * e_shnum)
+        if len(table) < e_shentsize * e_shnum:
+            return {}
+        headers = []
+        for i in range(e_shnum):
+            name_off, _type, _flags, _addr, offset, size = struct.unpack_from(sh_fmt, table, i * e_shentsize)
+            headers.append((name_off, offset, size))
+
+        _n, str_off, str_size = headers[e_shstrndx]
+        f.seek(str_off)
+        strtab = f.read(min(str_size, 1 << 20))
+
+    out: dict[str, tuple[int, int]] = {}
+    for name_off, offset, size in headers:
+        end = strtab.find(b"\0", name_off)
+        if end < 0:
+            continue
+        name = strtab[name_off:end].decode("ascii", errors="replace")
+        if name:
+            out[name] = (offset, size)
+    return out
+
+
+def read_elf_section(path: str, name: str) -> bytes | None:
+    """Contenu brut d'une section ELF (None si absente)."""
+    try:
+        sections = read_elf_sections(path)
+    except OSError:
+        return None
+    if name not in sections:
+        return None
+    offset, size = sections[name]
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def read_squashfs_superblock(path, offset: int | None = None) -> dict | None:
+    """Lit le superbloc squashfs 4.0 (96 octets) sans exécuter l'AppImage (chemin ou fichier ouvert)."""
+    if offset is None:
+        offset = appimage_payload_offset(path)
+        if offset is None:
+            return None
+    try:
+        with (open(path, "rb") if isinstance(path, str) else contextlib.nullcontext(path)) as f:
+            f.seek(offset)
+            raw = f.read(96)
+    except OSError:
+        return None
+    if len(raw) < 96 or raw[:4] != b"hsqs":
+        return None
+
+    (
+        _magic, inodes, mkfs_time, block_size, fragments, compression, block_log,
+        flags, no_ids, major, minor, root_inode, bytes_used, id_table, xattr_table,
+        inode_table, directory_table, fragment_table, export_table,
+    ) = struct.unpack("<4sIIIIHHHHHHQQQQQQQQ", raw)
+    return {
+        "offset": offset,
+        "inodes": inodes,
+        "mkfs_time": mkfs_time,
+        "block_size": block_size,
+        "fragments": fragments,
+        "compression": SQUASHFS_COMPRESSION.get(compression, str(compression)),
+        "block_log": block_log,
+        "flags": flags,
+        "no_ids": no_ids,
+        "version": (major, minor),
+        "root_inode": root_inode,
+        "bytes_used": bytes_used,
+        "id_table_start": id_table,
+        "xattr_id_table_start": xattr_table,
+        "inode_table_start": inode_table,
+        "directory_table_start": directory_table,
+        "fragment_table_start": fragment_table,
+        "export_table_start": export_table,
+    }
+
+
+def estimate_extracted_size(appimage_path: str) -> int:
+    """Estime la place occupée par `--appimage-extract`.
+
+    Le superbloc donne la taille compressée (bytes_used), la compression et le nombre
+    d'inodes; la taille décompressée en est déduite (facteur par compression + un bloc
+    de 4 Kio par inode). Sans superbloc lisible: 4 x la taille du fichier.
+    """
+    try:
+        size = os.path.getsize(appimage_path)
+    except OSError:
+        size = 0
+    sb = read_squashfs_superblock(appimage_path)
+    if not sb:
+        return size * 4
+    factor = _SQUASHFS_EXPANSION.get(sb["compression"], 4.0)
+    return int(sb["bytes_used"] * factor) + sb["inodes"] * 4096
+
+
+def _existing_ancestor(path: str) -> str:
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def disk_free(path: str) -> tuple[int, int]:
+    """Retourne (identifiant du FS, octets disponibles) pour `path` (ou son premier parent existant)."""
+    p = _existing_ancestor(path)
+    st = os.statvfs(p)
+    return (os.stat(p).st_dev, st.f_bavail * st.f_frsize)
+
+
+def extraction_dir_candidates() -> list[str]:
+    return [tempfile.gettempdir(), "/var/tmp", os.path.join(CACHE_DIR, "tmp")]
+
+
+def preflight_install(src: str, install_dir: str, extract: bool = True, size: int | None = None) -> dict:
+    """Vérifie l'espace disque avant une installation (statvfs).
+
+    Besoins estimés:
+    - install_dir : taille de l'AppImage (copie temporaire avant remplacement atomique);
+    - DESKTOP_DIR / ICON_DIR : lanceur et icône;
+    - extraction (si `extract`) : taille décompressée estimée, envoyée vers le système de
+      fichiers (temporaire ou cache) qui garde le plus de marge.
+
+    Les besoins d'un même système de fichiers sont cumulés. Lève InsufficientSpaceError
+    si la copie elle-même ne tient pas. Si seule l'extraction ne tient nulle part,
+    `extract_dir` vaut None (l'extraction de l'icône sera ignorée).
+
+    `size` : taille de l'AppImage si src n'est pas un fichier local (téléchargement).
+
+    Retour: {"extract_dir", "extract_bytes", "needs" {fs: octets}, "free" {fs: octets}}.
+    """
+    size = os.path.getsize(src) if size is None else size
+    needs: dict[int, int] = {}
+    free: dict[int, int] = {}
+
+    def _add(path: str, nbytes: int) -> None:
+        dev, avail = disk_free(path)
+        free[dev] = avail
+        needs[dev] = needs.get(dev, PREFLIGHT_MARGIN) + nbytes
+
+    _add(install_dir, size)
+    _add(DESKTOP_DIR, PREFLIGHT_DESKTOP_BYTES)
+    _add(ICON_DIR, PREFLIGHT_ICON_BYTES)
+
+    for dev, need in needs.items():
+        if need > free[dev]:
+            raise InsufficientSpaceError(
+                f"Espace disque insuffisant pour installer dans {install_dir} : "
+                f"{format_bytes(need)} nécessaires, {format_bytes(free[dev])} disponibles."
+            )
+
+    extract_dir = None
+    extract_bytes = estimate_extracted_size(src) if extract else 0
+    if extract:
+        best_headroom = -1
+        for cand in extraction_dir_candidates() + [install_dir]:
+            try:
+                dev, avail = disk_free(cand)
+            except OSError:
+                continue
+            headroom = avail - needs.get(dev, PREFLIGHT_MARGIN) - extract_bytes
+            if headroom > best_headroom:
+                best_headroom = headroom
+                extract_dir = cand
+                free[dev] = avail
+        if best_headroom < 0:
+            extract_dir = None
+        else:
+            dev, _avail = disk_free(extract_dir)  # type: ignore[arg-type]
+            needs[dev] = needs.get(dev, PREFLIGHT_MARGIN) + extract_bytes
+
+    return {"extract_dir": extract_dir, "extract_bytes": extract_bytes, "needs": needs, "free": free}
+
+
+def choose_extract_dir(appimage_path: str) -> str | None:
+    """Dossier temporaire ayant le plus de marge pour extraire `appimage_path` (ou None)."""
+    need = estimate_extracted_size(appimage_path) + PREFLIGHT_MARGIN
+    best, best_headroom = None, -1
+    for cand in extraction_dir_candidates():
+        try:
+            _dev, avail = disk_free(cand)
+        except OSError:
+            continue
+        if avail - need > best_headroom:
+            best, best_headroom = cand, avail - need
+    return best if best_headroom >= 0 else None
+
+
+class ExtractionError(RuntimeError):
+    """Échec (ou délai dépassé) de `--appimage-extract`."""
+
+
+# Débit minimal supposé pour l'extraction (support lent) et silence toléré du processus.
+EXTRACT_MIN_RATE = 2 * 1024 * 1024
+EXTRACT_MIN_TIMEOUT = 120.0
+EXTRACT_STALL_SECONDS = 120.0
+
+
+def extraction_timeout(appimage_path: str) -> float:
+    """Délai maximal d'extraction, proportionnel à la taille décompressée estimée."""
+    return max(EXTRACT_MIN_TIMEOUT, estimate_extracted_size(appimage_path) / EXTRACT_MIN_RATE)
+
+
+def _kill_process_group(proc: subprocess.Popen) -> None:
+    """Termine le processus et ses descendants (groupe créé par start_new_session)."""
+    for sig, wait in ((signal.SIGTERM, 2.0), (signal.SIGKILL, 5.0)):
+        try:
+            os.killpg(proc.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            return
+        try:
+            proc.wait(timeout=wait)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def run_appimage_extract(job: "Job", appimage_path: str, workdir: str, timeout: float | None = None) -> str:
+    """Lance `appimage --appimage-extract` dans workdir et retourne le dossier squashfs-root.
+
+    La sortie est lue ligne par ligne par un thread dédié (une ligne par fichier extrait):
+    la progression est rapportée par rapport au nombre d'inodes du superbloc. Le processus
+    tourne dans son propre groupe: annulation, délai dépassé (proportionnel à la taille) ou
+    silence prolongé le terminent avec tous ses descendants. Lève ExtractionError ou JobCancelled.
+    """
+    sb = read_squashfs_superblock(appimage_path)
+    expected = sb["inodes"] if sb else 0
+    limit = timeout if timeout is not None else extraction_timeout(appimage_path)
+
+    proc = subprocess.Popen(
+        [appimage_path, "--appimage-extract"],
+        cwd=workdir,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        start_new_session=True,
+    )
+    count = [0]
+    last_output = [time.monotonic()]
+    tail: list[str] = []
+
+    def _reader():
+        for raw in proc.stdout:
+            line = raw.decode("utf-8", "replace").rstrip("\n")
+            if line.startswith("squashfs-root/"):
+                count[0] += 1
+            else:
+                tail.append(line)
+                del tail[:-20]
+            last_output[0] = time.monotonic()
+        proc.stdout.close()
+
+    reader = threading.Thread(target=_reader, name="aliux-extract-reader", daemon=True)
+    reader.start()
+    t0 = time.monotonic()
+    try:
+        while True:
+            reader.join(0.2)
+            if proc.poll() is not None:
+                # Un descendant resté en vie peut garder la sortie ouverte: il est terminé.
+                reader.join(2.0)
+                if reader.is_alive():
+                    _kill_process_group(proc)
+                    reader.join(1.0)
+                break
+            now = time.monotonic()
+            if now - t0 > limit:
+                raise ExtractionError(f"extraction trop longue (> {format_duration(limit)})")
+            if now - last_output[0] > EXTRACT_STALL_SECONDS:
+                raise ExtractionError(f"extraction bloquée (aucune sortie depuis {format_duration(EXTRACT_STALL_SECONDS)})")
+            job.progress(
+                f"Extraction : {count[0]}" + (f" / {expected} fichiers" if expected else " fichiers"),
+                min(1.0, count[0] / expected) if expected else None,
+            )
+    except BaseException:
+        _kill_process_group(proc)
+        reader.join(1.0)
+        raise
+
+    if proc.returncode != 0:
+        detail = tail[-1] if tail else f"code {proc.returncode}"
+        raise ExtractionError(f"--appimage-extract a échoué : {detail}")
+    root_dir = os.path.join(workdir, "squashfs-root")
+    if not os.path.isdir(root_dir):
+        raise ExtractionError("--appimage-extract n'a pas produit de squashfs-root")
+    return root_dir
+
+
+def try_extract_appimage_metadata(
+    appimage_path: str, tmp_root: str | None = None, job: "Job | None" = None, icon_stem: str | None = None
+) -> tuple[str | None, str | None, str | None]:
+    """Retourne (suggested_name, icon_file_path, icon_hint) via --appimage-extract.
+
+    `tmp_root` : dossier où créer l'extraction temporaire (voir preflight_install()).
+    `job` : tâche permettant l'annulation et le suivi (voir run_appimage_extract()).
+    `icon_stem` : l'icône trouvée est copiée vers icon_stem + extension avant la suppression
+    de l'extraction (icon_file_path est alors ce fichier; sans icon_stem il vaut None).
+    JobCancelled est propagée; les autres échecs donnent (None, None, None).
+    """
     try:
         set_executable(appimage_path)
     except Exception:
         pass
 
-    with tempfile.TemporaryDirectory(prefix="aliux-extract-") as td:
+    if tmp_root:
+        ensure_dir(tmp_root)
+    with work_tempdir(tmp_root) as td:
         try:
-            proc = subprocess.run(
-                [appimage_path, "--appimage-extract"],
-                cwd=td,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=120,
-            )
-        except Exception:
-            return (None, None, None)
-
-        if proc.returncode != 0:
-            return (None, None, None)
-
-        root_dir = os.path.join(td, "squashfs-root")
-        if not os.path.isdir(root_dir):
+            root_dir = run_appimage_extract(job or Job("Extraction"), appimage_path, td)
+        except JobCancelled:
+            raise
+        except Exception as e:
+            LOG.info("Extraction de %s : %s", appimage_path, e)
             return (None, None, None)
 
         desktop_found = None
@@ -456,57 +1028,5884 @@ def try_extract_appimage_metadata(appimage_path: str) -> tuple[str | None, str |
             suggested_name = data.get("Name") or data.get("Name[fr]") or data.get("Name[en]")
             icon_hint = data.get("Icon")
 
-        icon_file_path = find_best_icon_in_extract(root_dir, icon_hint)
+        icon_file_path = None
+        icon_src = find_best_icon_in_extract(root_dir, icon_hint)
+        if icon_stem and icon_src and os.path.isfile(icon_src):
+            ext = os.path.splitext(icon_src)[1].lower()
+            if ext not in (".png", ".svg"):
+                ext = ".png"
+            icon_file_path = icon_stem + ext
+            shutil.copy2(icon_src, icon_file_path)
         return (suggested_name, icon_file_path, icon_hint)
 
 
 def list_aliux_installs() -> list[dict]:
     """
     Liste les applis installées par Aliux (tag X-Aliux-Installer=true).
-    Retourne une liste de dict: {name, desktop_path, appimage_path, icon_path}
+    Retourne une liste de dict: {name, desktop_path, appimage_path, icon_path,
+    appimage_size, installed_at, comment, categories, sha256, version, original_sha256, original_sha1,
+    adopted}
+    (date d'installation = date du lanceur; sha256 = empreinte enregistrée à l'installation, None pour
+    les anciennes installations; version = X-Aliux-Version, enregistrée lors des mises à jour depuis
+    le dépôt; original_* = empreintes de l'AppImage d'origine si elle a été recompressée;
+    adopted = lanceur créé par « aliux adopt » pour un fichier laissé en place).
     """
     out: list[dict] = []
     if not os.path.isdir(DESKTOP_DIR):
         return out
 
-    for fn in os.listdir(DESKTOP_DIR):
-        if not fn.endswith(".desktop"):
-            continue
-        dp = os.path.join(DESKTOP_DIR, fn)
+    for fn in os.listdir(DESKTOP_DIR):
+        if not fn.endswith(".desktop"):
+            continue
+        dp = os.path.join(DESKTOP_DIR, fn)
+        try:
+            data = parse_desktop_file(dp)
+        except Exception:
+            continue
+
+        if data.get(ALIUX_DESKTOP_TAG) != ALIUX_DESKTOP_TAG_VALUE:
+            continue
+
+        name = data.get("Name", fn)
+        comment = data.get("Comment", "")
+        categories = data.get("Categories", "")
+        appimage_path = data.get("X-Aliux-AppImagePath")
+        icon_path = data.get("X-Aliux-IconPath")
+
+        if not appimage_path:
+            ex = data.get("Exec", "")
+            m = re.search(r'"([^"]+\.AppImage)"', ex)
+            if m:
+                appimage_path = m.group(1)
+
+        if not icon_path:
+            icon = data.get("Icon", "")
+            if icon.startswith("/") and os.path.exists(icon):
+                icon_path = icon
+
+        try:
+            installed_at = os.stat(dp).st_mtime
+        except OSError:
+            installed_at = 0.0
+        try:
+            appimage_size = os.stat(appimage_path).st_size if appimage_path else None
+        except OSError:
+            appimage_size = None
+
+        out.append(
+            {
+                "name": name,
+                "desktop_path": dp,
+                "appimage_path": appimage_path,
+                "icon_path": icon_path,
+                "appimage_size": appimage_size,
+                "installed_at": installed_at,
+                "comment": comment,
+                "categories": categories,
+                "sha256": data.get("X-Aliux-SHA256") or None,
+                "version": data.get("X-Aliux-Version") or None,
+                "original_sha256": data.get("X-Aliux-OriginalSHA256") or None,
+                "original_sha1": data.get("X-Aliux-OriginalSHA1") or None,
+                "adopted": data.get("X-Aliux-Adopted") == "true",
+            }
+        )
+
+    out.sort(key=lambda x: x.get("name", "").lower())
+    return out
+
+def refresh_desktop_database() -> None:
+    """Met à jour le cache des lanceurs (optionnel: erreurs ignorées; un processus à la fois)."""
+    try:
+        with index_lock("desktop-database"):
+            subprocess.run(
+                ["update-desktop-database", DESKTOP_DIR],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=False,
+            )
+    except Exception:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# Lecture du squashfs embarqué (métadonnées sans exécuter ni monter l'AppImage)
+# ---------------------------------------------------------------------------
+
+SQUASHFS_METADATA_SIZE = 8192
+_SQUASHFS_NO_FRAGMENT = 0xFFFFFFFF
+_SQUASHFS_UNCOMPRESSED_BLOCK = 1 << 24
+# Types d'inode squashfs 4.0 (basiques / étendus)
+_SQUASHFS_DIR_TYPES = (1, 8)
+_SQUASHFS_FILE_TYPES = (2, 9)
+_SQUASHFS_SYMLINK_TYPES = (3, 10)
+
+
+class SquashFSError(RuntimeError):
+    """squashfs illisible (format, compression non prise en charge…)."""
+
+
+# Erreurs possibles à la lecture d'un squashfs tronqué ou corrompu
+SQUASHFS_READ_ERRORS = (SquashFSError, OSError, ValueError, zlib.error, lzma.LZMAError, struct.error)
+
+
+def squashfs_decompressor(compression: str):
+    """Fonction (données, taille_max) -> octets pour une compression squashfs, None si indisponible.
+
+    gzip, xz et lzma utilisent la bibliothèque standard; zstd, lz4 et lzo les modules
+    optionnels zstandard, lz4 et python-lzo.
+    """
+    if compression == "gzip":
+        return lambda data, _max: zlib.decompress(data)
+    if compression == "xz":
+        return lambda data, _max: lzma.decompress(data, format=lzma.FORMAT_XZ)
+    if compression == "lzma":
+        return lambda data, _max: lzma.decompress(data, format=lzma.FORMAT_ALONE)
+    if compression == "zstd":
+        try:
+            import zstandard
+
+            return lambda data, max_out: zstandard.ZstdDecompressor().decompress(data, max_output_size=max_out)
+        except ImportError:
+            pass
+        try:
+            from compression import zstd  # Python >= 3.14
+
+            return lambda data, _max: zstd.decompress(data)
+        except ImportError:
+            return None
+    if compression == "lz4":
+        try:
+            import lz4.block
+
+            return lambda data, max_out: lz4.block.decompress(data, uncompressed_size=max_out)
+        except ImportError:
+            return None
+    if compression == "lzo":
+        try:
+            import lzo
+
+            return lambda data, max_out: lzo.decompress(data, False, max_out)
+        except ImportError:
+            return None
+    return None
+
+
+class SquashFS:
+    """Lecteur squashfs 4.0 en lecture seule (AppImage de type 2).
+
+    Seules les structures nécessaires sont lues: blocs de métadonnées (inodes, répertoires,
+    fragments) et blocs de données des fichiers demandés. `pread(position, taille)` permet
+    de lire ailleurs que dans un fichier (positions relatives au début du squashfs), `sb`
+    de fournir un superbloc déjà lu (voir SquashFSCapture).
+    """
+
+    def __init__(self, path: str, offset: int | None = None, pread=None, sb: dict | None = None):
+        self.sb = sb or read_squashfs_superblock(path, offset)
+        if not self.sb:
+            raise SquashFSError(f"{path} : pas de squashfs 4.0")
+        self._decompress = squashfs_decompressor(self.sb["compression"])
+        if self._decompress is None:
+            raise SquashFSError(f"compression {self.sb['compression']} non prise en charge")
+        self._fd = None
+        if pread is None:
+            self._fd = os.open(path, os.O_RDONLY)
+            base = self.sb["offset"]
+            pread = lambda pos, size: os.pread(self._fd, size, base + pos)  # noqa: E731
+        self._pread = pread
+        self._meta: dict[int, tuple[bytes, int]] = {}
+        self._fragment_index: list[int] | None = None
+        self._fragment_blocks: dict[int, bytes] = {}
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- Blocs
+    def _read(self, pos: int, size: int) -> bytes:
+        data = self._pread(pos, size)
+        if len(data) < size:
+            raise SquashFSError("squashfs tronqué")
+        return data
+
+    def _metadata_block(self, pos: int) -> tuple[bytes, int]:
+        """Bloc de métadonnées à `pos` -> (contenu, position du bloc suivant)."""
+        cached = self._meta.get(pos)
+        if cached:
+            return cached
+        (header,) = struct.unpack("<H", self._read(pos, 2))
+        size = header & 0x7FFF
+        raw = self._read(pos + 2, size)
+        data = raw if header & 0x8000 else self._decompress(raw, SQUASHFS_METADATA_SIZE)
+        self._meta[pos] = (data, pos + 2 + size)
+        return self._meta[pos]
+
+    def _read_metadata(self, pos: int, offset: int, length: int) -> bytes:
+        out = bytearray()
+        while len(out) < length:
+            data, pos = self._metadata_block(pos)
+            out += data[offset : offset + length - len(out)]
+            offset = 0
+        return bytes(out)
+
+    def _data_block(self, pos: int, size_field: int, expected: int) -> bytes:
+        size = size_field & ~_SQUASHFS_UNCOMPRESSED_BLOCK
+        if size == 0:
+            return bytes(expected)  # bloc creux
+        raw = self._read(pos, size)
+        if size_field & _SQUASHFS_UNCOMPRESSED_BLOCK:
+            return raw
+        return self._decompress(raw, self.sb["block_size"])
+
+    def _fragment(self, index: int) -> bytes:
+        block = self._fragment_blocks.get(index)
+        if block is not None:
+            return block
+        if self._fragment_index is None:
+            count = (self.sb["fragments"] + 511) // 512
+            raw = self._read(self.sb["fragment_table_start"], count * 8)
+            self._fragment_index = list(struct.unpack(f"<{count}Q", raw))
+        entry = self._read_metadata(self._fragment_index[index // 512], (index % 512) * 16, 16)
+        start, size_field, _unused = struct.unpack("<QII", entry)
+        block = self._data_block(start, size_field, self.sb["block_size"])
+        self._fragment_blocks[index] = block
+        return block
+
+    # ---- Inodes et répertoires
+    @property
+    def root(self) -> dict:
+        return self.inode(self.sb["root_inode"])
+
+    def inode(self, ref: int) -> dict:
+        """Inode à la référence `ref` (bloc << 16 | position) -> dict {type, kind, …}."""
+        pos = self.sb["inode_table_start"] + (ref >> 16)
+        offset = ref & 0xFFFF
+        head = self._read_metadata(pos, offset, 16)
+        itype, mode, _uid, _gid, mtime, number = struct.unpack("<HHHHII", head)
+        ino = {"type": itype, "mode": mode, "mtime": mtime, "number": number, "kind": "other"}
+        offset += 16
+        if itype == 1:
+            blk, _nlink, size, boff, _parent = struct.unpack("<IIHHI", self._read_metadata(pos, offset, 16))
+            ino.update(kind="dir", dir_block=blk, dir_offset=boff, dir_size=size)
+        elif itype == 8:
+            _nlink, size, blk, _parent, _icount, boff, _xattr = struct.unpack(
+                "<IIIIHHI", self._read_metadata(pos, offset, 24)
+            )
+            ino.update(kind="dir", dir_block=blk, dir_offset=boff, dir_size=size)
+        elif itype in _SQUASHFS_FILE_TYPES:
+            if itype == 2:
+                start, frag, frag_off, size = struct.unpack("<IIII", self._read_metadata(pos, offset, 16))
+                offset += 16
+            else:
+                start, size, _sparse, _nlink, frag, frag_off, _xattr = struct.unpack(
+                    "<QQQIIII", self._read_metadata(pos, offset, 40)
+                )
+                offset += 40
+            bs = self.sb["block_size"]
+            nblocks = size // bs if frag != _SQUASHFS_NO_FRAGMENT else (size + bs - 1) // bs
+            sizes = struct.unpack(f"<{nblocks}I", self._read_metadata(pos, offset, nblocks * 4)) if nblocks else ()
+            ino.update(kind="file", start=start, size=size, fragment=frag, fragment_offset=frag_off, blocks=sizes)
+        elif itype in _SQUASHFS_SYMLINK_TYPES:
+            _nlink, tsize = struct.unpack("<II", self._read_metadata(pos, offset, 8))
+            target = self._read_metadata(pos, offset + 8, tsize)
+            ino.update(kind="symlink", target=target.decode("utf-8", "replace"))
+        return ino
+
+    def listdir(self, ino: dict) -> dict[str, int]:
+        """Entrées d'un répertoire -> {nom: référence d'inode}."""
+        if ino["kind"] != "dir":
+            raise SquashFSError("pas un répertoire")
+        remaining = ino["dir_size"] - 3
+        if remaining <= 0:
+            return {}
+        data = self._read_metadata(self.sb["directory_table_start"] + ino["dir_block"], ino["dir_offset"], remaining)
+        out: dict[str, int] = {}
+        p = 0
+        while p + 12 <= len(data):
+            count, start, _base = struct.unpack_from("<III", data, p)
+            p += 12
+            for _ in range(count + 1):
+                off, _delta, _etype, nsize = struct.unpack_from("<HhHH", data, p)
+                p += 8
+                name = data[p : p + nsize + 1].decode("utf-8", "replace")
+                p += nsize + 1
+                out[name] = (start << 16) | off
+        return out
+
+    def lookup(self, path: str, follow: bool = True, _depth: int = 0) -> dict | None:
+        """Inode d'un chemin de l'image (liens symboliques relatifs suivis), None si absent."""
+        if _depth > 16:
+            return None
+        parts = [p for p in path.strip("/").split("/") if p and p != "."]
+        stack: list[dict] = [self.root]
+        for i, part in enumerate(parts):
+            if part == "..":
+                if len(stack) > 1:
+                    stack.pop()
+                continue
+            cur = stack[-1]
+            if cur["kind"] != "dir":
+                return None
+            ref = self.listdir(cur).get(part)
+            if ref is None:
+                return None
+            ino = self.inode(ref)
+            last = i == len(parts) - 1
+            if ino["kind"] == "symlink" and (follow or not last):
+                target = ino["target"]
+                base = "/".join(parts[:i]) if not target.startswith("/") else ""
+                rest = "/".join(parts[i + 1 :])
+                return self.lookup("/".join(x for x in (base, target, rest) if x), follow, _depth + 1)
+            stack.append(ino)
+        return stack[-1]
+
+    def read_file(self, ino: dict, limit: int | None = None) -> bytes:
+        """Contenu d'un fichier (au plus `limit` octets)."""
+        if ino["kind"] != "file":
+            raise SquashFSError("pas un fichier")
+        size = ino["size"] if limit is None else min(ino["size"], limit)
+        bs = self.sb["block_size"]
+        out = bytearray()
+        pos = ino["start"]
+        for n, field in enumerate(ino["blocks"]):
+            if len(out) >= size:
+                break
+            out += self._data_block(pos, field, min(bs, ino["size"] - n * bs))
+            pos += field & ~_SQUASHFS_UNCOMPRESSED_BLOCK
+        if len(out) < size and ino["fragment"] != _SQUASHFS_NO_FRAGMENT:
+            block = self._fragment(ino["fragment"])
+            tail = ino["size"] % bs
+            out += block[ino["fragment_offset"] : ino["fragment_offset"] + tail]
+        return bytes(out[:size])
+
+
+# Taille max. lue pour un .desktop / une icône embarqués
+_EMBEDDED_DESKTOP_MAX = 1024 * 1024
+_EMBEDDED_ICON_MAX = 8 * 1024 * 1024
+
+
+def _icon_ext(data: bytes) -> str | None:
+    if data.startswith(b"\x89PNG"):
+        return ".png"
+    if b"<svg" in data[:4096]:
+        return ".svg"
+    return None
+
+
+def read_appimage_metadata(path: str, fs: SquashFS | None = None) -> dict:
+    """Nom, commentaire, catégories et icône d'une AppImage, lus dans son squashfs.
+
+    Le .desktop est cherché à la racine puis dans usr/share/applications; l'icône via
+    Icon= (racine, puis hicolor du plus grand au plus petit), puis .DirIcon.
+    Retourne {name, comment, categories, version, icon_hint, icon_ext, icon_data};
+    lève SquashFSError.
+    """
+    own = fs is None
+    fs = fs or SquashFS(path)
+    try:
+        desktop = {}
+        candidates = [n for n in sorted(fs.listdir(fs.root)) if n.lower().endswith(".desktop")]
+        if not candidates:
+            apps = fs.lookup("usr/share/applications")
+            if apps and apps["kind"] == "dir":
+                candidates = [
+                    f"usr/share/applications/{n}" for n in sorted(fs.listdir(apps)) if n.lower().endswith(".desktop")
+                ]
+        for cand in candidates:
+            ino = fs.lookup(cand)
+            if ino and ino["kind"] == "file":
+                desktop = parse_desktop_text(fs.read_file(ino, _EMBEDDED_DESKTOP_MAX).decode("utf-8", "replace"))
+                break
+
+        hint = (desktop.get("Icon") or "").strip()
+        icon_paths: list[str] = []
+        if hint and not hint.startswith("/"):
+            stem = os.path.basename(hint)
+            icon_paths += [stem] if os.path.splitext(stem)[1] else [f"{stem}.png", f"{stem}.svg"]
+            hicolor = fs.lookup("usr/share/icons/hicolor")
+            if hicolor and hicolor["kind"] == "dir":
+
+                def _size(name: str) -> int:
+                    m = re.match(r"(\d+)x\d+", name)
+                    return int(m.group(1)) if m else (10_000 if name == "scalable" else 0)
+
+                for size_dir in sorted(fs.listdir(hicolor), key=_size, reverse=True):
+                    icon_paths += [f"usr/share/icons/hicolor/{size_dir}/apps/{stem}.png",
+                                   f"usr/share/icons/hicolor/{size_dir}/apps/{stem}.svg"]
+        icon_paths.append(".DirIcon")
+
+        icon_data, icon_ext = None, None
+        for cand in icon_paths:
+            ino = fs.lookup(cand)
+            if not ino or ino["kind"] != "file" or ino["size"] > _EMBEDDED_ICON_MAX:
+                continue
+            data = fs.read_file(ino)
+            ext = _icon_ext(data)
+            if ext:
+                icon_data, icon_ext = data, ext
+                break
+
+        return {
+            "name": desktop.get("Name") or desktop.get("Name[fr]") or desktop.get("Name[en]"),
+            "comment": desktop.get("Comment", ""),
+            "categories": desktop.get("Categories", ""),
+            "version": (desktop.get("X-AppImage-Version") or "").strip(),
+            "icon_hint": hint or None,
+            "icon_ext": icon_ext,
+            "icon_data": icon_data,
+        }
+    finally:
+        if own:
+            fs.close()
+
+
+# Au-delà, la capture des métadonnées pendant la copie est abandonnée (repli: extraction)
+SQUASHFS_CAPTURE_HEAD_MAX = 16 * 1024 * 1024
+SQUASHFS_CAPTURE_TABLES_MAX = 64 * 1024 * 1024
+
+
+class SquashFSCapture:
+    """Sink de copie qui garde au passage ce dont read_appimage_metadata() a besoin.
+
+    Les blocs arrivent dans l'ordre du fichier: en-tête ELF (position du squashfs), superbloc,
+    puis, à la fin du squashfs, les tables de métadonnées (inodes, répertoires, fragments,
+    identifiants) gardées en mémoire. Seuls les blocs de données des fichiers lus ensuite
+    (.desktop, icône: quelques Kio) sont relus, dans la copie et non dans la source.
+    """
+
+    def __init__(self):
+        self.pos = 0
+        self.sb: dict | None = None
+        self.reread = 0  # octets relus dans la copie
+        self._head: bytearray | None = bytearray()
+        self._tables: bytearray | None = None
+        self._start = self._end = 0
+
+    def update(self, chunk) -> None:
+        start = self.pos
+        self.pos += len(chunk)
+        if self._head is not None:
+            self._head += chunk
+            self._parse_head()
+            return
+        lo, hi = max(start, self._start), min(self.pos, self._end)
+        if self._tables is not None and lo < hi:
+            self._tables[lo - self._start : hi - self._start] = chunk[lo - start : hi - start]
+
+    def _parse_head(self) -> None:
+        head = self._head
+        if len(head) < 64:
+            return
+        offset = appimage_payload_offset(io.BytesIO(head))
+        if offset is None or offset + 96 > SQUASHFS_CAPTURE_HEAD_MAX:
+            self._head = None
+            return
+        if len(head) < offset + 96:
+            return
+        self._head = None
+        self.sb = read_squashfs_superblock(io.BytesIO(head), offset)
+        if not self.sb:
+            return
+        self._start = offset + self.sb["inode_table_start"]
+        self._end = offset + self.sb["bytes_used"]
+        if not 0 <= self._end - self._start <= SQUASHFS_CAPTURE_TABLES_MAX:
+            return
+        self._tables = bytearray(self._end - self._start)
+        if self._start < len(head):
+            part = head[self._start : self._end]
+            self._tables[: len(part)] = part
+
+    @property
+    def complete(self) -> bool:
+        return self._tables is not None and self.pos >= self._end
+
+    def metadata(self, path: str) -> dict:
+        """read_appimage_metadata() de la copie `path`, à partir des tables capturées."""
+        if not self.complete:
+            raise SquashFSError("métadonnées du squashfs non capturées pendant la copie")
+        base = self.sb["offset"]
+        t0, t1 = self.sb["inode_table_start"], self.sb["bytes_used"]
+        tables = self._tables
+        fd = os.open(path, os.O_RDONLY)
+
+        def _pread(pos: int, size: int) -> bytes:
+            if t0 <= pos < t1:
+                return bytes(tables[pos - t0 : min(t1, pos + size) - t0])
+            self.reread += size
+            return os.pread(fd, size, base + pos)
+
+        try:
+            return read_appimage_metadata(path, fs=SquashFS(path, pread=_pread, sb=self.sb))
+        finally:
+            os.close(fd)
+
+
+# ---------------------------------------------------------------------------
+# Signatures des AppImage (.sha256_sig / .sig_key), vérifiées sans exécuter le fichier
+# ---------------------------------------------------------------------------
+
+SIGNATURE_SECTIONS = (".sha256_sig", ".sig_key")
+# Téléchargements: début du fichier gardé en mémoire pour y lire les sections de signature
+SIGNATURE_HEAD_BYTES = 4 * 1024 * 1024
+
+
+class SignatureError(RuntimeError):
+    """Signature invalide (ou absente alors qu'elle est exigée)."""
+
+
+def read_signature_info(path) -> dict | None:
+    """Signature embarquée par appimagetool --sign (None si l'AppImage n'est pas signée).
+
+    Retourne {signature, key, ranges}: signature et clé publique (armure ASCII), et les
+    plages (position, taille) à remplacer par des zéros pour recalculer l'empreinte signée.
+    Seuls l'en-tête ELF et les deux sections sont lus (`path`: chemin ou fichier ouvert).
+    """
+    try:
+        sections = read_elf_sections(path)
+    except OSError:
+        return None
+    if ".sha256_sig" not in sections:
+        return None
+    ranges = sorted(sections[n] for n in SIGNATURE_SECTIONS if n in sections)
+    with (open(path, "rb") if isinstance(path, str) else contextlib.nullcontext(path)) as f:
+        f.seek(sections[".sha256_sig"][0])
+        signature = f.read(sections[".sha256_sig"][1]).rstrip(b"\0")
+        key = b""
+        if ".sig_key" in sections:
+            f.seek(sections[".sig_key"][0])
+            key = f.read(sections[".sig_key"][1]).rstrip(b"\0")
+    if not signature:
+        return None
+    return {"signature": signature, "key": key, "ranges": ranges}
+
+
+class SignedDigest:
+    """SHA-256 calculé au fil de la copie, sections de signature remplacées par des zéros.
+
+    S'utilise comme `sink` de copy_file_chunked(): les blocs arrivent dans l'ordre du
+    fichier; seuls ceux qui recouvrent une section sont recopiés pour être masqués.
+    """
+
+    def __init__(self, ranges: list[tuple[int, int]]):
+        self.ranges = ranges
+        self.pos = 0
+        self._h = hashlib.sha256()
+
+    def update(self, chunk) -> None:
+        start, end = self.pos, self.pos + len(chunk)
+        masked = None
+        for off, size in self.ranges:
+            lo, hi = max(start, off), min(end, off + size)
+            if lo < hi:
+                if masked is None:
+                    masked = bytearray(chunk)
+                masked[lo - start : hi - start] = bytes(hi - lo)
+        self._h.update(chunk if masked is None else masked)
+        self.pos = end
+
+    def hexdigest(self) -> str:
+        return self._h.hexdigest()
+
+
+def verify_signature(info: dict, hexdigest: str, keyring: str | None = None) -> dict:
+    """Vérifie la signature détachée de l'empreinte (texte hexadécimal) avec gpgv.
+
+    `keyring` : trousseau local des clés de confiance (config « signature_keyring »).
+    La clé embarquée (.sig_key) n'est jamais utilisée pour la vérification: elle ne
+    sert qu'à afficher l'identité annoncée.
+    Retourne {status, signer, detail}; status vaut "valid", "bad", "unknown-key",
+    "no-keyring" ou "error".
+    """
+    keyring = os.path.expanduser(keyring or load_config()["signature_keyring"])
+    if not os.path.isfile(keyring):
+        return {"status": "no-keyring", "signer": None, "detail": keyring}
+    gpgv = shutil.which("gpgv") or shutil.which("gpgv2")
+    if not gpgv:
+        return {"status": "error", "signer": None, "detail": "gpgv introuvable"}
+    with tempfile.TemporaryDirectory(prefix="aliux-sig-") as td:
+        sig_path = os.path.join(td, "digest.sig")
+        data_path = os.path.join(td, "digest")
+        with open(sig_path, "wb") as f:
+            f.write(info["signature"])
+        with open(data_path, "w", encoding="ascii") as f:
+            f.write(hexdigest)
+        try:
+            proc = subprocess.run(
+                [gpgv, "--status-fd", "1", "--keyring", os.path.abspath(keyring), sig_path, data_path],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=30,
+            )
+        except Exception as e:
+            return {"status": "error", "signer": None, "detail": str(e)}
+    signer = None
+    status = "error"
+    for line in proc.stdout.splitlines():
+        parts = line.split(None, 3)
+        if len(parts) < 2 or parts[0] != "[GNUPG:]":
+            continue
+        if parts[1] == "GOODSIG":
+            signer = parts[3] if len(parts) > 3 else parts[2] if len(parts) > 2 else None
+        elif parts[1] == "VALIDSIG" and proc.returncode == 0:
+            status = "valid"
+        elif parts[1] == "BADSIG":
+            status = "bad"
+        elif parts[1] in ("NO_PUBKEY", "ERRSIG") and status != "bad":
+            status = "unknown-key"
+    detail = (proc.stderr or "").strip().splitlines()
+    return {"status": status, "signer": signer, "detail": detail[-1] if detail else ""}
+
+
+SIGNATURE_LABELS = {
+    "unsigned": "non signée",
+    "valid": "signature valide",
+    "bad": "SIGNATURE INVALIDE",
+    "unknown-key": "signée par une clé inconnue",
+    "no-keyring": "signée (aucun trousseau de confiance configuré)",
+    "error": "signature non vérifiable",
+}
+
+
+def check_signature_policy(result: dict, policy: str | None = None) -> None:
+    """Applique la politique « signature_policy » de la configuration.
+
+    - "off"     : aucune vérification;
+    - "warn"    : seule une signature invalide bloque l'installation (défaut);
+    - "require" : seules les AppImage à signature valide sont installées.
+    Lève SignatureError si l'installation doit être refusée.
+    """
+    policy = policy or load_config()["signature_policy"]
+    if policy == "off":
+        return
+    if result["status"] == "bad":
+        raise SignatureError("Signature invalide : l’AppImage a été modifiée après signature.")
+    if policy == "require" and result["status"] != "valid":
+        raise SignatureError(f"Signature exigée : AppImage {SIGNATURE_LABELS[result['status']]}.")
+
+
+class SignatureCheck:
+    """Vérification de signature d'une AppImage pendant sa copie (voir install_appimage()).
+
+    update(bloc) reçoit les blocs copiés; finish() vérifie la signature, la journalise et
+    applique la politique (SignatureError si l'AppImage est refusée).
+    Sans `src` (téléchargement), les sections de signature sont lues dans les
+    SIGNATURE_HEAD_BYTES premiers octets reçus, gardés en mémoire jusque-là.
+    """
+
+    def __init__(self, src: str | None, policy: str | None = None):
+        self.policy = policy or load_config()["signature_policy"]
+        self.info = read_signature_info(src) if src and self.policy != "off" else None
+        self.signed = SignedDigest(self.info["ranges"]) if self.info else None
+        self.result = {"status": "unsigned", "signer": None, "detail": ""}
+        self._head = bytearray() if src is None and self.policy != "off" else None
+
+    def _parse_head(self) -> None:
+        head, self._head = bytes(self._head), None
+        info = read_signature_info(io.BytesIO(head))
+        if info and all(off + size <= len(head) for off, size in info["ranges"]):
+            self.info = info
+            self.signed = SignedDigest(info["ranges"])
+            self.signed.update(head)
+        elif info:
+            self.result = {"status": "error", "signer": None, "detail": "sections de signature hors de l'en-tête"}
+
+    def update(self, chunk) -> None:
+        if self._head is not None:
+            self._head += chunk
+            if len(self._head) >= SIGNATURE_HEAD_BYTES:
+                self._parse_head()
+            return
+        if self.signed:
+            self.signed.update(chunk)
+
+    def finish(self, job: "Job", log) -> dict:
+        if self._head is not None:
+            self._parse_head()
+        if self.policy == "off":
+            return self.result
+        if self.info:
+            job.progress("Vérification de la signature…")
+            self.result = verify_signature(self.info, self.signed.hexdigest())
+        label = SIGNATURE_LABELS[self.result["status"]]
+        log(f"Signature : {label}" + (f" ({self.result['signer']})" if self.result["signer"] else ""))
+        check_signature_policy(self.result, self.policy)
+        return self.result
+
+
+# ---------------------------------------------------------------------------
+# Tâches de fond (exécuteur partagé, progression, annulation)
+# ---------------------------------------------------------------------------
+
+class JobCancelled(Exception):
+    """Levée dans une tâche de fond lorsque son annulation a été demandée."""
+
+
+class Job:
+    """Contexte transmis à une tâche de fond.
+
+    - progress(message, fraction) : remonte l'avancement (fraction 0..1 ou None);
+    - check() : lève JobCancelled si l'annulation a été demandée.
+    """
+
+    def __init__(self, label: str, on_progress=None):
+        self.label = label
+        self.cancel_event = threading.Event()
+        self.future: Future | None = None
+        self._on_progress = on_progress
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    def check(self) -> None:
+        if self.cancel_event.is_set():
+            raise JobCancelled(self.label)
+
+    def progress(self, message: str, fraction: float | None = None) -> None:
+        self.check()
+        if self._on_progress:
+            try:
+                self._on_progress(message, fraction)
+            except Exception:
+                pass
+
+
+# Priorités des tâches de fond (nice + classe d'E/S ioprio)
+_IOPRIO_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+_IOPRIO_WHO_PROCESS = 1
+# Numéro de l'appel système ioprio_set selon l'architecture
+_IOPRIO_SET_SYSCALL = {
+    "x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "armv7l": 314, "armv6l": 314,
+    "riscv64": 30, "ppc64le": 273, "ppc64": 273, "s390x": 282, "loongarch64": 30,
+}
+
+
+def background_priority() -> dict | None:
+    """Priorité des tâches de fond d'après la configuration (None: priorité normale)."""
+    cfg = load_config()
+    nice = int(cfg.get("background_nice") or 0)
+    ioclass = cfg.get("background_ioclass") or "none"
+    if nice <= 0 and ioclass == "none":
+        return None
+    return {"nice": nice, "ioclass": ioclass, "iolevel": int(cfg.get("background_iolevel") or 7)}
+
+
+def _ioprio_set(ioclass: str, level: int, tid: int = 0) -> bool:
+    nr = _IOPRIO_SET_SYSCALL.get(os.uname().machine)
+    cls = _IOPRIO_CLASSES.get(ioclass)
+    if nr is None or cls is None:
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        value = (cls << 13) | (0 if cls == 3 else max(0, min(7, level)))
+        return libc.syscall(nr, _IOPRIO_WHO_PROCESS, tid, value) == 0
+    except Exception:
+        return False
+
+
+def apply_thread_priority(priority: dict | None) -> None:
+    """Applique nice et ioprio au thread courant (Linux: réglages propres à chaque thread).
+
+    Les threads et processus enfants créés ensuite par ce thread en héritent (copie, extraction,
+    pools de hachage…). Le nice n'est jamais abaissé: sans privilège, un thread ralenti ne
+    peut pas revenir à la priorité normale, d'où des exécuteurs dédiés aux tâches de fond.
+    """
+    if not priority:
+        return
+    tid = threading.get_native_id()
+    try:
+        current = os.getpriority(os.PRIO_PROCESS, tid)
+        if priority["nice"] > current:
+            os.setpriority(os.PRIO_PROCESS, tid, priority["nice"])
+    except (OSError, AttributeError) as e:
+        LOG.debug("nice %s non appliqué : %s", priority["nice"], e)
+    if not _ioprio_set(priority["ioclass"], priority["iolevel"], tid):
+        LOG.debug("ioprio %s non appliqué", priority["ioclass"])
+
+
+class JobRunner:
+    """Exécuteur unique pour les opérations longues (installation, désinstallation…).
+
+    Les fonctions soumises reçoivent le Job en premier argument. `on_done(job)` est
+    appelé dans le thread de travail une fois la tâche terminée (job.future est prêt).
+    Avec `priority` (voir background_priority()), les threads de l'exécuteur tournent
+    avec un nice et une classe d'E/S réduits.
+    """
+
+    def __init__(self, max_workers: int | None = None, priority: dict | None = None):
+        workers = max_workers or min(8, (os.cpu_count() or 2) + 2)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="aliux-bg" if priority else "aliux-job",
+            initializer=apply_thread_priority,
+            initargs=(priority,),
+        )
+        self._lock = threading.Lock()
+        self._active: list[Job] = []
+
+    def submit(self, label: str, fn, *args, on_progress=None, on_done=None, **kwargs) -> Job:
+        job = Job(label, on_progress=on_progress)
+
+        def _run():
+            job.check()
+            return fn(job, *args, **kwargs)
+
+        def _finished(_fut):
+            with self._lock:
+                if job in self._active:
+                    self._active.remove(job)
+            if on_done:
+                try:
+                    on_done(job)
+                except Exception:
+                    LOG.exception("Rappel de fin de tâche en échec (%s)", job.label)
+
+        with self._lock:
+            self._active.append(job)
+        job.future = self._executor.submit(_run)
+        job.future.add_done_callback(_finished)
+        return job
+
+    def active(self) -> list[Job]:
+        with self._lock:
+            return list(self._active)
+
+    def cancel_all(self) -> None:
+        for job in self.active():
+            job.cancel()
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def format_bytes(n: float) -> str:
+    """1536 -> '1,5 Kio' (unités binaires, virgule décimale)."""
+    n = float(n)
+    for unit in ("o", "Kio", "Mio", "Gio", "Tio"):
+        if abs(n) < 1024 or unit == "Tio":
+            if unit == "o":
+                return f"{int(n)} o"
+            return f"{n:.1f} {unit}".replace(".", ",")
+        n /= 1024
+    return f"{n:.1f} Tio"
+
+
+def format_duration(seconds: float | None) -> str:
+    if seconds is None or seconds != seconds or seconds == float("inf"):
+        return "?"
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} s"
+    m, s = divmod(seconds, 60)
+    if m < 60:
+        return f"{m} min {s:02d} s"
+    h, m = divmod(m, 60)
+    return f"{h} h {m:02d} min"
+
+
+class TransferMeter:
+    """Débit lissé (moyenne exponentielle) et temps restant d'un transfert.
+
+    update(octets, total) peut être appelé à chaque bloc: `on_update(octets, total, débit, eta)`
+    n'est déclenché qu'au plus toutes les `min_interval` secondes (et à la fin), pour que
+    l'affichage ne ralentisse pas la copie.
+    """
+
+    def __init__(self, on_update, min_interval: float = 0.25, smoothing: float = 0.3):
+        self.on_update = on_update
+        self.min_interval = min_interval
+        self.smoothing = smoothing
+        self.rate: float | None = None
+        self._t0 = time.monotonic()
+        self._last_t = self._t0
+        self._last_done = 0
+
+    def update(self, done: int, total: int) -> None:
+        now = time.monotonic()
+        finished = total > 0 and done >= total
+        dt = now - self._last_t
+        if dt < self.min_interval and not finished:
+            return
+
+        if dt > 0:
+            inst = (done - self._last_done) / dt
+            self.rate = inst if self.rate is None else self.smoothing * inst + (1 - self.smoothing) * self.rate
+        self._last_t = now
+        self._last_done = done
+
+        rate = self.rate or 0.0
+        if finished:
+            elapsed = now - self._t0
+            rate = done / elapsed if elapsed > 0 else rate
+        eta = (total - done) / rate if rate > 0 and total else None
+        self.on_update(done, total, rate, eta)
+
+
+def transfer_progress(job: "Job | None", label: str):
+    """Callback octets -> progression de tâche (débit + temps restant).
+
+    L'annulation est vérifiée à chaque bloc; l'affichage est limité par TransferMeter.
+    """
+
+    def _update(done: int, total: int, rate: float, eta: float | None):
+        if job:
+            job.progress(
+                f"{label} {format_bytes(done)} / {format_bytes(total)} — "
+                f"{format_bytes(rate)}/s — reste {format_duration(eta)}",
+                done / total if total else None,
+            )
+
+    meter = TransferMeter(_update)
+
+    def _callback(done: int, total: int):
+        if job:
+            job.check()
+        meter.update(done, total)
+
+    return _callback
+
+
+# ---------------------------------------------------------------------------
+# Métriques (fichier texte pour le collecteur « textfile » de node_exporter)
+# ---------------------------------------------------------------------------
+
+METRICS_STATE_PATH = os.path.join(STATE_DIR, "metrics.json")
+# Au plus une réécriture du fichier de métriques par intervalle (s)
+METRICS_WRITE_INTERVAL = 15.0
+# Bornes (s) des histogrammes de durée
+METRICS_DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+METRICS_HELP = {
+    "aliux_operations_total": ("counter", "Opérations terminées, par type et résultat"),
+    "aliux_operation_duration_seconds": ("histogram", "Durée des opérations"),
+    "aliux_install_phase_duration_seconds": ("histogram", "Durée des étapes d'une installation"),
+    "aliux_copied_bytes_total": ("counter", "Octets d'AppImage copiés ou téléchargés"),
+    "aliux_cache_requests_total": ("counter", "Consultations des caches, par résultat"),
+    "aliux_cache_hit_ratio": ("gauge", "Part des consultations servies par le cache"),
+    "aliux_installed_apps": ("gauge", "Applications installées par Aliux"),
+    "aliux_installed_bytes": ("gauge", "Taille totale des AppImage installées"),
+    "aliux_metrics_write_timestamp_seconds": ("gauge", "Date de la dernière écriture de ce fichier"),
+}
+
+
+def _metric_labels(labels) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + body + "}"
+
+
+def _metric_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metrics:
+    """Compteurs et histogrammes exportés pour node_exporter.
+
+    - inc() / observe() accumulent en mémoire, sans E/S;
+    - write() ajoute ces valeurs aux totaux de METRICS_STATE_PATH, sous verrou: fenêtre,
+      ligne de commande et mode veille alimentent les mêmes compteurs, puis réécrit le
+      fichier « metrics_textfile » de façon atomique (fichier temporaire puis rename);
+    - flush() limite les écritures à une par METRICS_WRITE_INTERVAL: une demande trop
+      rapprochée est reportée par une minuterie, rien n'est perdu.
+
+    Sans « metrics_textfile » dans la configuration, rien n'est écrit.
+    """
+
+    def __init__(self, state_path: str = METRICS_STATE_PATH, interval: float = METRICS_WRITE_INTERVAL):
+        self.state_path = state_path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._histograms: dict[str, list] = {}  # [compte par borne…, +Inf, somme]
+        self._last_write = 0.0
+        self._timer: threading.Timer | None = None
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> str:
+        return json.dumps([name, sorted(labels.items())])
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            h = self._histograms.setdefault(key, [0] * (len(METRICS_DURATION_BUCKETS) + 2))
+            h[bisect.bisect_left(METRICS_DURATION_BUCKETS, seconds)] += 1
+            h[-1] += seconds
+
+    @contextlib.contextmanager
+    def timer(self, name: str, **labels):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - t0, **labels)
+
+    def track(self, operation: str):
+        """Décorateur: compte les appels (résultat ok / error / cancelled) et leur durée."""
+
+        def _decorator(fn):
+            @functools.wraps(fn)
+            def _wrapper(*args, **kwargs):
+                t0 = time.monotonic()
+                result = "error"
+                try:
+                    out = fn(*args, **kwargs)
+                    result = "ok"
+                    return out
+                except JobCancelled:
+                    result = "cancelled"
+                    raise
+                finally:
+                    self.inc("aliux_operations_total", operation=operation, result=result)
+                    self.observe("aliux_operation_duration_seconds", time.monotonic() - t0, operation=operation)
+                    self.flush()
+
+            return _wrapper
+
+        return _decorator
+
+    def cache(self, name: str, hit: bool) -> None:
+        self.inc("aliux_cache_requests_total", cache=name, result="hit" if hit else "miss")
+
+    def flush(self, force: bool = False) -> None:
+        """Écrit le fichier (force=True: tout de suite, ex. en quittant), sinon au plus une fois par intervalle."""
+        if not load_config().get("metrics_textfile"):
+            return
+        with self._lock:
+            wait = self._last_write + self.interval - time.monotonic()
+            if not force and wait > 0:
+                if self._timer is None:
+                    self._timer = threading.Timer(wait, self._deferred)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._last_write = time.monotonic()
+        try:
+            self.write()
+        except OSError as e:
+            LOG.warning("Métriques non écrites : %s", e)
+
+    def _deferred(self) -> None:
+        with self._lock:
+            self._timer = None
+        self.flush(force=True)
+
+    def write(self) -> None:
+        target = os.path.expanduser(load_config().get("metrics_textfile") or "")
+        if not target:
+            return
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            histograms, self._histograms = self._histograms, {}
+        try:
+            with index_lock("metrics"):
+                try:
+                    with open(self.state_path, "r", encoding="utf-8") as f:
+                        state = json.load(f)
+                except (OSError, ValueError):
+                    state = {}
+                totals = state.get("counters", {})
+                hists = state.get("histograms", {})
+                for key, value in counters.items():
+                    totals[key] = totals.get(key, 0) + value
+                for key, h in histograms.items():
+                    old = hists.get(key)
+                    hists[key] = [a + b for a, b in zip(old, h)] if old and len(old) == len(h) else h
+                with atomic_output(self.state_path) as f:
+                    f.write(json.dumps({"counters": totals, "histograms": hists}).encode("utf-8"))
+        except BaseException:
+            # Rien n'est perdu: les valeurs seront ajoutées à la prochaine écriture
+            with self._lock:
+                for key, value in counters.items():
+                    self._counters[key] = self._counters.get(key, 0) + value
+                for key, h in histograms.items():
+                    old = self._histograms.get(key)
+                    self._histograms[key] = [a + b for a, b in zip(old, h)] if old else h
+            raise
+        text = self.render(totals, hists)
+        ensure_dir(os.path.dirname(target))
+        tmp = f"{target}.{os.getpid()}.tmp"  # ignoré par node_exporter (extension .prom seulement)
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, target)
+
+    @staticmethod
+    def render(totals: dict, hists: dict) -> str:
+        """Texte au format d'exposition Prometheus (totaux, taux de succès des caches, applis installées)."""
+        series: dict[str, list[str]] = {}
+
+        def _add(name: str, labels, value: float) -> None:
+            series.setdefault(name, []).append(f"{name}{_metric_labels(labels)} {_metric_value(value)}")
+
+        cache_totals: dict[str, list[float]] = {}
+        for key, value in sorted(totals.items()):
+            name, labels = json.loads(key)
+            _add(name, labels, value)
+            if name == "aliux_cache_requests_total":
+                ld = dict(labels)
+                hm = cache_totals.setdefault(ld.get("cache", ""), [0.0, 0.0])
+                hm[0 if ld.get("result") == "hit" else 1] += value
+        for cache, (hits, misses) in sorted(cache_totals.items()):
+            if hits + misses:
+                _add("aliux_cache_hit_ratio", [["cache", cache]], round(hits / (hits + misses), 4))
+        for key, h in sorted(hists.items()):
+            name, labels = json.loads(key)
+            cumulative = 0
+            for bound, count in zip((*METRICS_DURATION_BUCKETS, "+Inf"), h[:-1]):
+                cumulative += count
+                le = bound if isinstance(bound, str) else f"{bound:g}"
+                series.setdefault(name, []).append(f"{name}_bucket{_metric_labels([*labels, ['le', le]])} {cumulative}")
+            series[name].append(f"{name}_sum{_metric_labels(labels)} {_metric_value(h[-1])}")
+            series[name].append(f"{name}_count{_metric_labels(labels)} {cumulative}")
+        installs = list_aliux_installs()
+        _add("aliux_installed_apps", [], len(installs))
+        _add("aliux_installed_bytes", [], sum(i.get("appimage_size") or 0 for i in installs))
+        _add("aliux_metrics_write_timestamp_seconds", [], round(time.time(), 3))
+
+        lines = []
+        for name, rows in series.items():
+            kind, help_text = METRICS_HELP.get(name, ("untyped", ""))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(rows)
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+# ---------------------------------------------------------------------------
+# Journal des transactions (installation / désinstallation)
+# ---------------------------------------------------------------------------
+
+JOURNAL_DIR = os.path.join(STATE_DIR, "journal")
+# À partir de ce nombre de fichiers préparés: un syncfs() par système de fichiers plutôt
+# qu'un fsync() par fichier (lots d'adoption, réécriture des lanceurs…)
+JOURNAL_SYNCFS_THRESHOLD = 8
+
+_TX_LOCK = threading.Lock()
+_TX_SEQ = [0]
+
+
+def _fsync_dir(path: str) -> None:
+    """fsync d'un dossier: rend durables les créations / renommages qu'il contient."""
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _fsync_path(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def sync_files(paths: list[str]) -> None:
+    """Rend durables les fichiers `paths` en groupant les synchronisations.
+
+    Quelques fichiers: un fsync() chacun. Au-delà de JOURNAL_SYNCFS_THRESHOLD: un seul
+    syncfs() par système de fichiers concerné (une validation du journal du FS pour le lot).
+    """
+    if len(paths) < JOURNAL_SYNCFS_THRESHOLD:
+        for p in paths:
+            _fsync_path(p)
+        return
+    by_dev: dict[int, list[str]] = {}
+    for p in paths:
+        by_dev.setdefault(os.stat(p).st_dev, []).append(p)
+    try:
+        syncfs = ctypes.CDLL(None, use_errno=True).syncfs
+    except (OSError, AttributeError):
+        syncfs = None
+    for group in by_dev.values():
+        fd = os.open(group[0], os.O_RDONLY)
+        try:
+            ok = syncfs is not None and syncfs(fd) == 0
+        finally:
+            os.close(fd)
+        if not ok:
+            for p in group:
+                _fsync_path(p)
+
+
+class Transaction:
+    """Modifications de fichiers appliquées en tout-ou-rien, précédées d'une entrée de journal.
+
+    - les nouveaux fichiers sont préparés à côté de leur destination (.aliux-tmp-<id>-*),
+      sans toucher à l'existant;
+    - commit(): synchronisation groupée des fichiers préparés, entrée « commit » (fsync) dans
+      JOURNAL_DIR, puis renommages et suppressions;
+    - abort() (ou exception dans le bloc `with`): suppression des fichiers préparés.
+
+    Après un arrêt brutal, recover_journal() annule une transaction non validée ou termine
+    une transaction validée (les deux opérations sont idempotentes).
+    """
+
+    def __init__(self, op: str, label: str = ""):
+        with _TX_LOCK:
+            _TX_SEQ[0] += 1
+            seq = _TX_SEQ[0]
+        self.id = f"{time.time_ns():x}-{os.getpid()}-{seq}"
+        self.op = op
+        self.label = label
+        self.prefix = f".aliux-tmp-{self.id}-"
+        self.renames: list[tuple[str, str]] = []  # (source, destination)
+        self.removals: list[str] = []
+        self.rmdirs: list[str] = []  # supprimés s'ils sont vides
+        self.dirs: list[str] = []  # dossiers où des fichiers sont préparés
+        self.created_dirs: list[str] = []
+        self._unsynced: list[str] = []
+        self._record = os.path.join(JOURNAL_DIR, f"{self.id}.json")
+        self._lock_fd: int | None = None
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.closed:
+            self.abort()
+        return False
+
+    # -- entrée de journal --------------------------------------------------
+
+    def _write_record(self, state: str) -> None:
+        record = {
+            "id": self.id, "op": self.op, "label": self.label, "state": state,
+            "prefix": self.prefix, "dirs": self.dirs, "created_dirs": self.created_dirs,
+            "renames": self.renames, "removals": self.removals, "rmdirs": self.rmdirs,
+        }
+        if self._lock_fd is None:
+            ensure_dir(JOURNAL_DIR)
+            self._lock_fd = os.open(self._record[:-5] + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        data = json.dumps(record).encode("utf-8")
+        if state == "commit":
+            with atomic_output(self._record) as f:
+                f.write(data)
+            _fsync_dir(JOURNAL_DIR)
+        else:
+            # Entrée « pending » non synchronisée: si elle est perdue, les .aliux-tmp-* restants
+            # sont de toute façon nettoyés par le ménage.
+            tmp = f"{self._record}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._record)
+
+    def _close(self) -> None:
+        self.closed = True
+        try:
+            os.remove(self._record)
+        except FileNotFoundError:
+            pass
+        if self._lock_fd is not None:
+            try:
+                os.remove(self._record[:-5] + ".lock")
+            except FileNotFoundError:
+                pass
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _note_dir(self, d: str) -> None:
+        if d not in self.dirs:
+            self.dirs.append(d)
+            self._write_record("pending")
+
+    # -- préparation --------------------------------------------------------
+
+    def mkdir(self, path: str) -> None:
+        """Crée `path` (et ses parents); supprimé à l'annulation s'il est resté vide."""
+        if os.path.isdir(path):
+            return
+        ensure_dir(path)
+        self.created_dirs.append(path)
+        self._write_record("pending")
+
+    def stem(self, dst_dir: str, name: str) -> str:
+        """Chemin préparé (sans extension) dans dst_dir, pour les fichiers écrits par un tiers."""
+        ensure_dir(dst_dir)
+        self._note_dir(dst_dir)
+        return os.path.join(dst_dir, self.prefix + name)
+
+    def _mkstemp(self, dst: str) -> tuple[int, str]:
+        dst_dir = os.path.dirname(dst)
+        ensure_dir(dst_dir)
+        self._note_dir(dst_dir)
+        return tempfile.mkstemp(prefix=self.prefix, dir=dst_dir)
+
+    def write(self, dst: str, data: bytes, mode: int = 0o644) -> str:
+        """Prépare dst avec le contenu `data` (synchronisé au commit, avec le reste du lot)."""
+        fd, tmp = self._mkstemp(dst)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        self._unsynced.append(tmp)
+        self.renames.append((tmp, dst))
+        return tmp
+
+    def copy(self, src: str, dst: str, progress=None, sink=None) -> str:
+        """Prépare une copie exécutable de src vers dst (copy_file_chunked: synchronisée).
+
+        Retourne le chemin préparé (utilisable avant le commit: signature, extraction…).
+        """
+        fd, tmp = self._mkstemp(dst)
+        try:
+            copy_file_chunked(src, fd, progress=progress, sink=sink)
+        finally:
+            os.close(fd)
+        shutil.copystat(src, tmp)
+        try:
+            set_executable(tmp)
+        except Exception:
+            pass
+        self.renames.append((tmp, dst))
+        return tmp
+
+    def download(self, url: str, dst: str, progress=None, sink=None, probe: dict | None = None) -> str:
+        """Prépare dst depuis une URL (download_file(), données transmises à `sink` au fil de l'eau).
+
+        Le fichier partiel (.aliux-part-*) est gardé à côté de dst hors transaction: une
+        installation interrompue reprend là où le téléchargement s'était arrêté.
+        """
+        dst_dir = os.path.dirname(dst)
+        part = os.path.join(dst_dir, f".aliux-part-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}")
+        download_file(url, part, progress=progress, sink=sink, probe=probe)
+        tmp = self.stem(dst_dir, os.path.basename(dst))
+        os.replace(part, tmp)
+        try:
+            set_executable(tmp)
+        except Exception:
+            pass
+        self.stage(tmp, dst, synced=True)
+        return tmp
+
+    def stage(self, tmp: str, dst: str, synced: bool = False) -> None:
+        """Ajoute au lot un fichier déjà écrit sous un chemin obtenu par stem()."""
+        if not synced:
+            self._unsynced.append(tmp)
+        self.renames.append((tmp, dst))
+
+    def rename(self, src: str, dst: str) -> None:
+        """Renommage (même système de fichiers) effectué au commit."""
+        self.renames.append((src, dst))
+
+    def remove(self, path: str) -> None:
+        self.removals.append(path)
+
+    def rmdir(self, path: str) -> None:
+        self.rmdirs.append(path)
+
+    def savepoint(self) -> tuple[int, ...]:
+        return (len(self.renames), len(self.removals), len(self.rmdirs), len(self._unsynced), len(self.created_dirs))
+
+    def rollback_to(self, point: tuple[int, ...]) -> None:
+        """Retire du lot (et supprime) ce qui a été préparé depuis savepoint()."""
+        for tmp, _dst in self.renames[point[0]:]:
+            if os.path.basename(tmp).startswith(self.prefix):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(tmp)
+        del self.renames[point[0]:]
+        del self.removals[point[1]:]
+        del self.rmdirs[point[2]:]
+        del self._unsynced[point[3]:]
+        for d in reversed(self.created_dirs[point[4]:]):
+            with contextlib.suppress(OSError):
+                os.rmdir(d)
+        del self.created_dirs[point[4]:]
+
+    # -- fin de transaction -------------------------------------------------
+
+    def commit(self) -> tuple[list[str], list[str]]:
+        """Valide puis applique la transaction; retourne (chemins supprimés, erreurs)."""
+        sync_files(self._unsynced)
+        for d in self.dirs:
+            _fsync_dir(d)
+        self._write_record("commit")
+        removed, errors = _apply_transaction(self.renames, self.removals, self.rmdirs)
+        self._close()
+        return (removed, errors)
+
+    def abort(self) -> None:
+        """Annule: supprime les fichiers préparés et les dossiers créés restés vides."""
+        _rollback_transaction(self.dirs, self.prefix, self.created_dirs)
+        self._close()
+
+
+def _apply_transaction(
+    renames: list, removals: list[str], rmdirs: list[str]
+) -> tuple[list[str], list[str]]:
+    """Renommages puis suppressions d'une transaction validée (rejouable sans risque)."""
+    removed: list[str] = []
+    errors: list[str] = []
+    touched: set[str] = set()
+    for src, dst in renames:
+        if os.path.lexists(src):
+            try:
+                os.replace(src, dst)
+                touched.update((os.path.dirname(src), os.path.dirname(dst)))
+            except OSError as e:
+                errors.append(f"{dst} : {e}")
+    for path in removals:
+        try:
+            os.remove(path)
+            removed.append(path)
+            touched.add(os.path.dirname(path))
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            errors.append(f"{path} : {e}")
+    for path in rmdirs:
+        try:
+            os.rmdir(path)
+            removed.append(path)
+            touched.add(os.path.dirname(path))
+        except OSError:
+            continue  # absent ou non vide
+    # Renommages durables avant la suppression de l'entrée de journal
+    for d in touched:
+        _fsync_dir(d)
+    return (removed, errors)
+
+
+def _rollback_transaction(dirs: list[str], prefix: str, created_dirs: list[str]) -> None:
+    for d in dirs:
+        try:
+            with os.scandir(d) as it:
+                names = [e.path for e in it if e.name.startswith(prefix)]
+        except OSError:
+            continue
+        for path in names:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+    for d in reversed(created_dirs):
+        with contextlib.suppress(OSError):
+            os.rmdir(d)
+
+
+def recover_journal(log=None) -> dict:
+    """Termine ou annule les transactions interrompues (arrêt brutal, processus tué).
+
+    - entrée « pending » : annulée (fichiers préparés supprimés, rien n'a été remplacé);
+    - entrée « commit »  : rejouée jusqu'au bout.
+    Les transactions d'un autre processus encore vivant (verrou tenu) sont ignorées.
+    Sans entrée de journal, ne coûte qu'un listdir(). Retourne {rolled_back, rolled_forward, errors}.
+    """
+    _log = log or LOG.info
+    out = {"rolled_back": [], "rolled_forward": [], "errors": []}
+    try:
+        names = sorted(n for n in os.listdir(JOURNAL_DIR) if n.endswith(".json"))
+    except FileNotFoundError:
+        return out
+    for name in names:
+        path = os.path.join(JOURNAL_DIR, name)
+        lock_path = path[:-5] + ".lock"
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue  # transaction en cours dans une autre instance
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    rec = json.load(f)
+            except FileNotFoundError:
+                rec = None  # terminée entre-temps
+            except (OSError, ValueError) as e:
+                rec = None
+                out["errors"].append(f"{path} : {e}")
+            if rec and rec.get("state") == "commit":
+                _removed, errors = _apply_transaction(rec["renames"], rec["removals"], rec["rmdirs"])
+                out["errors"].extend(errors)
+                out["rolled_forward"].append(rec)
+                _log(f"Journal : {rec['op']} « {rec['label']} » terminé(e) après interruption")
+            elif rec:
+                _rollback_transaction(rec["dirs"], rec["prefix"], rec["created_dirs"])
+                out["rolled_back"].append(rec)
+                _log(f"Journal : {rec['op']} « {rec['label']} » annulé(e) après interruption")
+            for p in (path, lock_path):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(p)
+        finally:
+            os.close(fd)
+    if out["rolled_forward"]:
+        refresh_desktop_database()
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Verrous inter-processus (fenêtre, ligne de commande, mode veille)
+# ---------------------------------------------------------------------------
+
+LOCK_DIR = os.path.join(STATE_DIR, "locks")
+APP_LOCK_POLL = 0.2
+
+
+@contextlib.contextmanager
+def app_lock(slug: str, job: Job | None = None):
+    """Verrou consultatif (flock) d'une appli: LOCK_DIR/<slug>.lock.
+
+    Deux processus ou deux tâches ne modifient jamais la même appli (dossier, lanceur,
+    icône) en même temps: la seconde attend son tour (annulable via `job`); des applis
+    différentes s'installent en parallèle. Le fichier de verrou n'est jamais supprimé
+    (le supprimer permettrait à deux processus de verrouiller deux fichiers différents).
+    """
+    ensure_dir(LOCK_DIR)
+    fd = os.open(os.path.join(LOCK_DIR, f"{slug}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        waiting = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if not waiting:
+                    waiting = True
+                    LOG.info("%s : en attente d'une autre opération sur cette appli", slug)
+                    if job:
+                        job.progress(f"En attente : « {slug} » est en cours de modification ailleurs…")
+            if job:
+                job.check()
+            time.sleep(APP_LOCK_POLL)
+        yield
+    finally:
+        os.close(fd)  # libère le verrou
+
+
+@contextlib.contextmanager
+def app_locks(slugs, job: Job | None = None):
+    """Verrous de plusieurs applis (lots), pris dans l'ordre alphabétique: pas d'interblocage."""
+    with contextlib.ExitStack() as stack:
+        for slug in sorted(set(slugs)):
+            stack.enter_context(app_lock(slug, job))
+        yield
+
+
+def item_slug(item: dict) -> str:
+    """Slug d'une appli installée: nom de son lanceur (<slug>.desktop), à défaut tiré du nom."""
+    dp = item.get("desktop_path") or ""
+    if dp.endswith(".desktop"):
+        return os.path.basename(dp)[: -len(".desktop")]
+    return slugify(item.get("name") or "")
+
+
+def app_layout_dir(appimage_path: str) -> str | None:
+    """Dossier propre de l'appli si elle suit la disposition Aliux (<racine>/<slug>/<slug>.AppImage).
+
+    None pour une AppImage posée ailleurs (ancienne version, ou adoptée en place dans
+    Téléchargements…): son dossier n'appartient pas à Aliux.
+    """
+    app_dir = os.path.dirname(appimage_path)
+    stem = re.sub(r"\.(?i:appimage)$", "", os.path.basename(appimage_path))
+    return app_dir if app_dir and os.path.basename(app_dir) == stem else None
+
+
+def index_lock(name: str):
+    """Verrou court sur un fichier partagé (caches, index, base des lanceurs, manifeste)."""
+    return file_lock(os.path.join(LOCK_DIR, f"{name}.lock"))
+
+
+def save_shared_index(path: str, entries: dict, keep=None) -> None:
+    """Enregistre un cache JSON {clé: entrée} partagé entre processus.
+
+    Sous index_lock(): les entrées écrites entre-temps par un autre processus sont gardées
+    (les nôtres priment); keep(clé) peut écarter des entrées (fichiers disparus…).
+    """
+    with index_lock(os.path.basename(path)):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                current = json.load(f)
+        except (OSError, ValueError):
+            current = {}
+        merged = {**(current if isinstance(current, dict) else {}), **entries}
+        if keep:
+            merged = {k: v for k, v in merged.items() if keep(k)}
+        ensure_dir(os.path.dirname(path))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(merged, f)
+        os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Installation (sans interface: utilisée par la fenêtre, la ligne de commande et le mode veille)
+# ---------------------------------------------------------------------------
+
+def app_paths(name: str, install_dir: str) -> dict:
+    """Emplacements d'une appli: 1 dossier par application dans install_dir."""
+    slug = slugify(name)
+    app_dir = os.path.join(install_dir, slug)
+    return {
+        "slug": slug,
+        "app_dir": app_dir,
+        "appimage_path": os.path.join(app_dir, f"{slug}.AppImage"),
+        "desktop_path": os.path.join(DESKTOP_DIR, f"{slug}.desktop"),
+    }
+
+
+def build_desktop_entry(
+    name: str, desc: str, categories: str, appimage_path: str, icon_path: str | None,
+    sha256: str | None = None, signature: str | None = None,
+) -> str:
+    exec_line = f'"{appimage_path}" %U'
+    icon_line = icon_path if icon_path else "application-x-executable"
+    return (
+        "[Desktop Entry]\n"
+        "Type=Application\n"
+        f"Name={name}\n"
+        f"Comment={desc}\n"
+        f"Exec={exec_line}\n"
+        f"Icon={icon_line}\n"
+        "Terminal=false\n"
+        f"Categories={categories}\n"
+        "StartupNotify=true\n"
+        f"{ALIUX_DESKTOP_TAG}={ALIUX_DESKTOP_TAG_VALUE}\n"
+        f"X-Aliux-AppImagePath={appimage_path}\n"
+        f"X-Aliux-IconPath={icon_path or ''}\n"
+        + (f"X-Aliux-SHA256={sha256}\n" if sha256 else "")
+        + (f"X-Aliux-Signature={signature}\n" if signature else "")
+    )
+
+
+def desktop_text_with_key(text: str, key: str, value: str | None) -> str:
+    """Texte d'un lanceur avec `key=value` défini (ou ajouté) dans le groupe [Desktop Entry].
+
+    value=None retire la clé.
+    """
+    lines = text.splitlines()
+    group = None
+    insert_at = None
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("[") and stripped.endswith("]"):
+            if group == "[Desktop Entry]" and insert_at is None:
+                insert_at = i
+            group = stripped
+            continue
+        if group == "[Desktop Entry]" and stripped.split("=", 1)[0].strip() == key:
+            if value is None:
+                del lines[i]
+            else:
+                lines[i] = f"{key}={value}"
+            break
+    else:
+        if value is not None:
+            lines.insert(insert_at if insert_at is not None else len(lines), f"{key}={value}")
+    return "\n".join(lines) + "\n"
+
+
+# Empreintes de l'AppImage d'origine d'une appli recompressée (voir recompress_appimage())
+ORIGINAL_DIGEST_KEYS = ("X-Aliux-OriginalSHA256", "X-Aliux-OriginalSHA1")
+
+
+def set_desktop_key(desktop_path: str, key: str, value: str | None) -> None:
+    """Définit (ou ajoute) `key=value` dans le groupe [Desktop Entry] d'un lanceur (écriture atomique)."""
+    with open(desktop_path, "r", encoding="utf-8") as f:
+        text = desktop_text_with_key(f.read(), key, value)
+    mode = stat.S_IMODE(os.stat(desktop_path).st_mode)
+    with atomic_output(desktop_path, mode=mode) as f:
+        f.write(text.encode("utf-8"))
+
+
+@METRICS.track("install")
+def install_appimage(
+    job: Job,
+    src: str,
+    name: str,
+    desc: str = "",
+    categories: str = "Utility;",
+    install_dir: str = DEFAULT_INSTALL_DIR,
+    manual_icon: str = "",
+    extract_icon: bool = True,
+    log=None,
+    refresh: bool = True,
+) -> dict:
+    """Installe une AppImage: copie, icône, lanceur .desktop, cache des lanceurs.
+
+    AppImage, icône et lanceur sont préparés puis mis en place en une seule transaction
+    journalisée (voir Transaction et recover_journal()). `src` peut être une URL http(s)
+    (miroir interne): téléchargement avec reprise, voir download_file().
+    Un fichier existant au même emplacement est remplacé (à l'appelant de demander
+    confirmation). `log(message)` reçoit les étapes (journal de la fenêtre, console…).
+    Avec refresh=False, le cache des lanceurs est laissé à l'appelant (installations en lot).
+    La signature embarquée éventuelle est vérifiée avant la mise en place (voir
+    check_signature_policy(): SignatureError si elle est refusée).
+    Retourne {name, slug, appimage_path, desktop_path, icon_path, sha256, signature}.
+    """
+    _log = log or LOG.info
+
+    if manual_icon and not os.path.isfile(manual_icon):
+        manual_icon = ""
+
+    # Source HTTP(S): taille et reprise possible connues avant de télécharger
+    probe = None
+    if is_http_url(src):
+        job.progress("Connexion au serveur…")
+        probe = http_probe(src)
+        size_txt = format_bytes(probe["length"]) if probe["length"] is not None else "taille inconnue"
+        _log(f"Téléchargement : {probe['url']} ({size_txt})")
+
+    # Vérification de l'espace disque avant toute écriture
+    job.progress("Vérification de l’espace disque…")
+    extract_icon = extract_icon and not manual_icon
+    # (l'icône est lue pendant la copie: pas de place à prévoir pour une extraction)
+    preflight_install(src, install_dir, extract=False, size=(probe["length"] or 0) if probe else None)
+
+    paths = app_paths(name, install_dir)
+    slug = paths["slug"]
+    dst_appimage = paths["appimage_path"]
+
+    ensure_dir(install_dir)
+    # Tout est préparé à côté des destinations puis mis en place d'un bloc (journal: voir
+    # Transaction): un arrêt brutal ne laisse jamais d'appli à moitié installée. Une autre
+    # opération sur la même appli (autre processus) est attendue (app_lock()).
+    tx = Transaction("install", name)
+    with app_lock(slug, job), tx:
+        tx.mkdir(paths["app_dir"])
+
+        job.progress("Copie de l’AppImage…")
+        _log(f"Copie vers : {dst_appimage}")
+        # Une seule lecture de la source: SHA-256 (contrôle ultérieur: verify_installs()),
+        # signature (en-tête gardé en mémoire) et tables du squashfs (icône, .desktop embarqué)
+        # calculées ou capturées au passage.
+        digest = hashlib.sha256()
+        check = SignatureCheck(None)
+        capture = SquashFSCapture() if extract_icon else None
+
+        def _sink(chunk):
+            digest.update(chunk)
+            check.update(chunk)
+            if capture:
+                capture.update(chunk)
+
+        with METRICS.timer("aliux_install_phase_duration_seconds", phase="download" if probe else "copy"):
+            if probe:
+                # Écrit une seule fois, directement à côté de la destination, empreintes au fil de l'eau
+                staged_appimage = tx.download(
+                    src, dst_appimage, progress=transfer_progress(job, "Téléchargement"), sink=_sink, probe=probe
+                )
+            else:
+                staged_appimage = tx.copy(src, dst_appimage, progress=transfer_progress(job, "Copie"), sink=_sink)
+        METRICS.inc("aliux_copied_bytes_total", os.path.getsize(staged_appimage), source="http" if probe else "local")
+        sha256 = digest.hexdigest()
+        signature = check.finish(job, _log)
+        _log("Permissions : exécutable (chmod +x)")
+
+        # Icône : priorité à l'icône manuelle
+        icon_dst = None
+
+        if manual_icon:
+            _log("Icône : utilisation du chemin d’icône sélectionné.")
+            ext = os.path.splitext(manual_icon)[1].lower()
+            if ext not in (".png", ".svg", ".ico", ".jpg", ".jpeg"):
+                ext = ".png"
+            icon_dst = os.path.join(ICON_DIR, f"{slug}{ext}")
+            with open(manual_icon, "rb") as f:
+                tx.write(icon_dst, f.read())
+            _log(f"Icône copiée : {icon_dst}")
+        elif extract_icon:
+            job.progress("Lecture de l’icône…")
+            meta = None
+            t_icon = time.monotonic()
+            try:
+                meta = capture.metadata(staged_appimage)
+            except SQUASHFS_READ_ERRORS as e:
+                _log(f"Icône : lecture directe impossible ({e}).")
+            if meta is not None:
+                if meta["icon_data"]:
+                    icon_dst = os.path.join(ICON_DIR, slug + meta["icon_ext"])
+                    tx.write(icon_dst, meta["icon_data"])
+                    _log(f"Icône lue dans l’AppImage : {icon_dst}")
+                else:
+                    _log("Icône : aucune icône exploitable trouvée dans l’AppImage.")
+            else:
+                # Repli (AppImage de type 1, compression non prise en charge…): extraction
+                extract_dir = choose_extract_dir(staged_appimage)
+                if not extract_dir:
+                    _log("⚠️ Espace insuffisant pour extraire l’AppImage : icône non extraite.")
+                else:
+                    job.progress("Extraction de l’icône…")
+                    _log(f"Extraction d’icône : tentative via --appimage-extract (dans {extract_dir})…")
+                    _suggested_name, staged_icon, _icon_hint = try_extract_appimage_metadata(
+                        staged_appimage, tmp_root=extract_dir, job=job, icon_stem=tx.stem(ICON_DIR, slug)
+                    )
+                    if staged_icon:
+                        icon_dst = os.path.join(ICON_DIR, slug + os.path.splitext(staged_icon)[1])
+                        tx.stage(staged_icon, icon_dst)
+                        _log(f"Icône extraite : {icon_dst}")
+                    else:
+                        _log("Icône : aucune icône exploitable trouvée dans l’AppImage.")
+            METRICS.observe("aliux_install_phase_duration_seconds", time.monotonic() - t_icon, phase="icon")
+        else:
+            _log("Icône : extraction désactivée.")
+
+        job.check()
+        desktop_path = paths["desktop_path"]
+        _log(f"Création du lanceur : {desktop_path}")
+        entry = build_desktop_entry(
+            name, desc, categories, dst_appimage, icon_dst,
+            sha256=sha256, signature=signature["status"] if check.policy != "off" else None,
+        )
+        tx.write(desktop_path, entry.encode("utf-8"))
+        with METRICS.timer("aliux_install_phase_duration_seconds", phase="commit"):
+            tx.commit()
+
+    cache = DigestCache()
+    cache.put(dst_appimage, sha256, os.stat(dst_appimage))
+    cache.save()
+
+    if refresh:
+        _log("Mise à jour du cache des lanceurs (optionnel)…")
+        refresh_desktop_database()
+
+    return {
+        "name": name,
+        "slug": slug,
+        "appimage_path": dst_appimage,
+        "desktop_path": desktop_path,
+        "icon_path": icon_dst,
+        "sha256": sha256,
+        "signature": signature,
+    }
+
+
+@METRICS.track("uninstall")
+def uninstall_aliux_app(job: Job | None, item: dict) -> tuple[list[str], list[str]]:
+    """Supprime le lanceur, l'AppImage (et son dossier si vide) puis l'icône d'une appli.
+
+    Une AppImage adoptée en place appartient à l'utilisateur: seuls son lanceur et son
+    icône sont supprimés, sauf si elle suit la disposition Aliux. Le dossier n'est retiré
+    que dans cette disposition. Les suppressions sont inscrites au journal avant d'être faites (terminées par
+    recover_journal() après un arrêt brutal). Retourne (chemins supprimés, erreurs).
+    Le cache des lanceurs n'est pas rafraîchi ici: l'appelant le fait une seule fois après
+    un lot de désinstallations.
+    """
+    ap = item.get("appimage_path")
+    app_dir = app_layout_dir(ap) if ap else None
+    keys = ["desktop_path", "icon_path"]
+    if not item.get("adopted") or app_dir:
+        keys.insert(1, "appimage_path")
+    tx = Transaction("uninstall", item.get("name") or "")
+    with app_lock(item_slug(item), job), tx:
+        for key in keys:
+            if job:
+                job.check()
+            path = item.get(key)
+            if path and os.path.lexists(path):
+                tx.remove(path)
+        # Supprimer le dossier de l'app si vide
+        if app_dir:
+            tx.rmdir(app_dir)
+        return tx.commit()
+
+
+# ---------------------------------------------------------------------------
+# Empreintes SHA-256 (avec cache par inode / taille / date)
+# ---------------------------------------------------------------------------
+
+DIGEST_CACHE_PATH = os.path.join(CACHE_DIR, "digests.json")
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class DigestCache:
+    """Cache des empreintes SHA-256: chemin -> (périphérique, inode, taille, mtime) + empreinte.
+
+    Un fichier dont l'identité n'a pas changé n'est pas relu.
+    """
+
+    def __init__(self, path: str = DIGEST_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries: dict[str, list] = data if isinstance(data, dict) else {}
+        except Exception:
+            self._entries = {}
+
+    @staticmethod
+    def _key(st: os.stat_result) -> list:
+        return [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns]
+
+    def get(self, path: str, st: os.stat_result | None = None) -> str | None:
+        try:
+            st = st or os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == self._key(st):
+                self.hits += 1
+                METRICS.cache("digest", True)
+                return entry[1]
+        return None
+
+    def put(self, path: str, digest: str, st: os.stat_result) -> None:
+        with self._lock:
+            self._entries[path] = [self._key(st), digest]
+            self._dirty = True
+
+    def digest(self, path: str, job: Job | None = None, progress=None, refresh: bool = False) -> str:
+        """Empreinte de `path` (depuis le cache si le fichier n'a pas changé, sauf refresh=True)."""
+        st = os.stat(path)
+        cached = None if refresh else self.get(path, st)
+        if cached:
+            return cached
+        with self._lock:
+            self.misses += 1
+        METRICS.cache("digest", False)
+        digest = sha256_file(path, job=job, progress=progress)
+        self.put(path, digest, st)
+        return digest
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            # Oublie les fichiers disparus
+            self._entries = {p: e for p, e in self._entries.items() if os.path.exists(p)}
+            entries = dict(self._entries)
+            self._dirty = False
+        save_shared_index(self.path, entries, keep=os.path.exists)
+
+
+def sha256_file(path: str, job: Job | None = None, progress=None) -> str:
+    """SHA-256 d'un fichier lu par mmap, par tranches de HASH_CHUNK_SIZE.
+
+    hashlib libère le GIL sur les gros blocs: plusieurs fichiers hachés dans des threads
+    occupent plusieurs cœurs. Les pages lues sont rendues au noyau au fur et à mesure.
+    `progress(octets_lus, total)` est appelé après chaque tranche.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        fd = f.fileno()
+        size = os.fstat(fd).st_size
+        if not size:
+            return h.hexdigest()
+        _fadvise(fd, 0, 0, "POSIX_FADV_SEQUENTIAL")
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mm)
+            try:
+                for off in range(0, size, HASH_CHUNK_SIZE):
+                    if job:
+                        job.check()
+                    n = min(HASH_CHUNK_SIZE, size - off)
+                    h.update(view[off : off + n])
+                    _fadvise(fd, off, n, "POSIX_FADV_DONTNEED")
+                    if progress:
+                        progress(off + n, size)
+            finally:
+                view.release()
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Occupation disque par application
+# ---------------------------------------------------------------------------
+
+DU_CACHE_PATH = os.path.join(CACHE_DIR, "du-cache.json")
+
+
+class DiskUsageCache:
+    """Cache de l'occupation disque par dossier, invalidé par la date de modification du dossier.
+
+    Pour chaque dossier: octets alloués de ses fichiers directs (st_blocks), fichiers à
+    liens multiples (inode, octets) pour ne les compter qu'une fois, et sous-dossiers.
+    Un dossier dont la mtime n'a pas bougé n'est pas relu (seul un stat est nécessaire).
+    Les AppImage étant remplacées par renommage, la mtime du dossier suffit à détecter
+    un changement.
+    """
+
+    def __init__(self, path: str = DU_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._dirs: dict[str, dict] = data if isinstance(data, dict) else {}
+        except Exception:
+            self._dirs = {}
+
+    def dir_entry(self, path: str) -> dict | None:
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return None
+        key = [st.st_dev, st.st_ino, st.st_mtime_ns]
+        with self._lock:
+            cached = self._dirs.get(path)
+            if cached and cached.get("key") == key:
+                self.hits += 1
+                METRICS.cache("disk_usage", True)
+                return cached
+
+        entry = {"key": key, "bytes": 0, "links": [], "dirs": []}
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            entry["dirs"].append(e.name)
+                            continue
+                        est = e.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    used = est.st_blocks * 512
+                    if est.st_nlink > 1:
+                        entry["links"].append([est.st_ino, used])
+                    else:
+                        entry["bytes"] += used
+        except OSError:
+            return None
+
+        METRICS.cache("disk_usage", False)
+        with self._lock:
+            self.misses += 1
+            self._dirs[path] = entry
+            self._dirty = True
+        return entry
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._dirs)
+            self._dirty = False
+        save_shared_index(self.path, entries)
+
+
+class _InodeSet:
+    """Inodes déjà comptés (partagé entre threads): un fichier à liens multiples compte une fois."""
+
+    def __init__(self):
+        self._seen: set[tuple[int, int]] = set()
+        self._lock = threading.Lock()
+
+    def first(self, dev: int, ino: int) -> bool:
+        with self._lock:
+            if (dev, ino) in self._seen:
+                return False
+            self._seen.add((dev, ino))
+            return True
+
+
+def _file_usage(path: str, seen: _InodeSet) -> int:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return 0
+    if st.st_nlink > 1 and not seen.first(st.st_dev, st.st_ino):
+        return 0
+    return st.st_blocks * 512
+
+
+def _tree_usage(path: str, cache: DiskUsageCache, seen: _InodeSet) -> int:
+    total = 0
+    stack = [path]
+    while stack:
+        d = stack.pop()
+        entry = cache.dir_entry(d)
+        if entry is None:
+            continue
+        dev = entry["key"][0]
+        total += entry["bytes"]
+        for ino, used in entry["links"]:
+            if seen.first(dev, ino):
+                total += used
+        stack.extend(os.path.join(d, n) for n in entry["dirs"])
+    return total
+
+
+def app_disk_usage(item: dict, cache: DiskUsageCache, seen: _InodeSet) -> dict:
+    """Occupation disque d'une appli (octets alloués).
+
+    - appimage  : le fichier AppImage installé;
+    - extracted : arborescences extraites dans le dossier de l'appli (ex: squashfs-root);
+    - older     : autres AppImage du dossier (anciennes versions);
+    - other     : reste du dossier de l'appli;
+    - icons     : icône installée.
+
+    Le dossier n'est parcouru que s'il suit la disposition Aliux (<slug>/<slug>.AppImage):
+    une AppImage posée ailleurs (ex: Téléchargements) ne compte que pour elle-même.
+    """
+    usage = {"appimage": 0, "extracted": 0, "older": 0, "other": 0, "icons": 0}
+    ap = item.get("appimage_path")
+    if ap:
+        usage["appimage"] = _file_usage(ap, seen)
+        app_dir = app_layout_dir(ap)
+        if app_dir:
+            try:
+                with os.scandir(app_dir) as it:
+                    entries = list(it)
+            except OSError:
+                entries = []
+            for e in entries:
+                if e.path == ap:
+                    continue
+                try:
+                    is_dir = e.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    usage["extracted"] += _tree_usage(e.path, cache, seen)
+                elif ".appimage" in e.name.lower() and not e.name.startswith(".aliux-tmp-"):
+                    usage["older"] += _file_usage(e.path, seen)
+                else:
+                    usage["other"] += _file_usage(e.path, seen)
+
+    ic = item.get("icon_path")
+    if ic:
+        usage["icons"] += _file_usage(ic, seen)
+
+    usage["total"] = sum(usage.values())
+    return usage
+
+
+def compute_disk_usage(installs: list[dict], job: Job | None = None, max_workers: int | None = None) -> dict[str, dict]:
+    """Occupation disque de chaque appli (clé: chemin du .desktop), calculée en parallèle."""
+    cache = DiskUsageCache()
+    seen = _InodeSet()
+    out: dict[str, dict] = {}
+    workers = max_workers or min(8, (os.cpu_count() or 2) * 2)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aliux-du") as pool:
+        futures = {pool.submit(app_disk_usage, item, cache, seen): item for item in installs}
+        for n, fut in enumerate(as_completed(futures), 1):
+            item = futures[fut]
+            try:
+                out[item["desktop_path"]] = fut.result()
+            except Exception as e:
+                LOG.warning("Occupation disque de %s : %s", item.get("name"), e)
+            if job:
+                job.progress(f"Occupation disque… {n}/{len(futures)}", n / len(futures))
+    try:
+        cache.save()
+    except OSError as e:
+        LOG.warning("Cache d'occupation disque non enregistré : %s", e)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Téléchargements HTTP (miroir interne): connexions partagées, reprise, segments
+# ---------------------------------------------------------------------------
+
+HTTP_TIMEOUT = 30
+HTTP_USER_AGENT = f"{APP_TITLE}/{APP_VERSION}"
+# Connexions inactives gardées ouvertes par serveur
+HTTP_POOL_MAX_IDLE = 8
+HTTP_READ_CHUNK = 1024 * 1024
+# Téléchargement en plusieurs segments parallèles à partir de cette taille
+DOWNLOAD_SEGMENT_MIN = 64 * 1024 * 1024
+# Fréquence d'enregistrement de l'avancement (fichier .json à côté du .aliux-part-*)
+DOWNLOAD_STATE_INTERVAL = 2.0
+DOWNLOAD_RETRIES = 3
+
+
+class DownloadError(RuntimeError):
+    """Téléchargement impossible (serveur injoignable, réponse inattendue…)."""
+
+
+def is_http_url(src: str) -> bool:
+    return src.startswith(("http://", "https://"))
+
+
+class _PooledResponse:
+    """Réponse HTTP dont la connexion retourne au pool une fois le corps lu en entier."""
+
+    def __init__(self, pool: "HTTPPool", origin: tuple, conn, resp, url: str):
+        self._pool = pool
+        self._origin = origin
+        self._conn = conn
+        self._resp = resp
+        self.url = url
+        self.status = resp.status
+
+    def getheader(self, name: str, default=None):
+        return self._resp.getheader(name, default)
+
+    def read(self, n: int | None = None) -> bytes:
+        return self._resp.read(n) if n is not None else self._resp.read()
+
+    def readinto(self, buf) -> int:
+        return self._resp.readinto(buf)
+
+    def discard(self) -> None:
+        """Ferme la connexion sans la rendre au pool (corps non lu)."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        if self._resp.isclosed() and not self._resp.will_close:
+            self._pool._release(self._origin, self._conn)
+        else:
+            self._conn.close()
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class HTTPPool:
+    """Connexions HTTP(S) persistantes (keep-alive), partagées entre les tâches, par serveur.
+
+    request() suit les redirections et réessaie une fois sur une connexion réutilisée que
+    le serveur aurait fermée entre-temps.
+    """
+
+    def __init__(self, max_idle: int = HTTP_POOL_MAX_IDLE):
+        self.max_idle = max_idle
+        self._idle: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, origin: tuple):
+        with self._lock:
+            idle = self._idle.get(origin)
+            if idle:
+                return idle.pop(), True
+        scheme, netloc = origin
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=HTTP_TIMEOUT), False
+
+    def _release(self, origin: tuple, conn) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method: str, url: str, headers: dict | None = None, max_redirects: int = 5) -> _PooledResponse:
+        for _redirect in range(max_redirects + 1):
+            parsed = urllib.parse.urlsplit(url)
+            if parsed.scheme not in ("http", "https"):
+                raise DownloadError(f"URL non prise en charge : {url}")
+            origin = (parsed.scheme, parsed.netloc)
+            path = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+            hdrs = {"User-Agent": HTTP_USER_AGENT, **(headers or {})}
+            for attempt in range(2):
+                conn, reused = self._acquire(origin)
+                try:
+                    conn.request(method, path, headers=hdrs)
+                    resp = conn.getresponse()
+                    break
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    if not reused or attempt:
+                        raise
+            if resp.status in (301, 302, 303, 307, 308):
+                resp.read()
+                _PooledResponse(self, origin, conn, resp, url).close()
+                url = urllib.parse.urljoin(url, resp.getheader("Location", ""))
+                continue
+            return _PooledResponse(self, origin, conn, resp, url)
+        raise DownloadError("Trop de redirections.")
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for c in conns:
+            with contextlib.suppress(Exception):
+                c.close()
+
+
+HTTP_POOL = HTTPPool()
+
+
+def http_probe(url: str, pool: HTTPPool | None = None) -> dict:
+    """Taille, prise en charge des requêtes Range et validateurs (ETag, Last-Modified) d'une URL.
+
+    Retourne {url (après redirections), length (None si inconnue), ranges, etag, last_modified}.
+    """
+    pool = pool or HTTP_POOL
+    # GET d'un seul octet plutôt que HEAD: certains miroirs répondent mal à HEAD
+    with pool.request("GET", url, headers={"Range": "bytes=0-0"}) as resp:
+        if resp.status == 206:
+            resp.read()
+            total = (resp.getheader("Content-Range") or "").rpartition("/")[2]
+            length = int(total) if total.isdigit() else None
+            ranges = length is not None
+        elif resp.status == 200:
+            cl = resp.getheader("Content-Length")
+            length = int(cl) if cl and cl.isdigit() else None
+            ranges = False
+            resp.discard()  # corps complet non lu: connexion non réutilisable
+        else:
+            raise DownloadError(f"{url} : HTTP {resp.status}")
+        return {
+            "url": resp.url,
+            "length": length,
+            "ranges": ranges,
+            "etag": resp.getheader("ETag"),
+            "last_modified": resp.getheader("Last-Modified"),
+        }
+
+
+class _HashFrontier:
+    """Transmet les octets téléchargés à `sink` dans l'ordre du fichier.
+
+    Les blocs écrits à la position courante passent directement au sink; ceux d'un segment
+    en avance sont repris (pread, pages encore en cache) dès que la position les atteint.
+    """
+
+    def __init__(self, fd: int, sink, segments: list[list[int]]):
+        self.fd = fd
+        self.sink = sink
+        self.segments = segments  # [début, fin (exclue), position atteinte]
+        self.pos = 0
+
+    def wrote(self, offset: int, data) -> None:
+        if offset == self.pos:
+            if self.sink:
+                self.sink(data)
+            self.pos += len(data)
+        self.catch_up()
+
+    def catch_up(self) -> None:
+        while True:
+            seg = next((s for s in self.segments if s[0] <= self.pos < s[2]), None)
+            if seg is None:
+                return
+            data = os.pread(self.fd, min(seg[2] - self.pos, HTTP_READ_CHUNK), self.pos)
+            if not data:
+                return
+            if self.sink:
+                self.sink(data)
+            self.pos += len(data)
+
+
+def _plan_segments(length: int, count: int) -> list[list[int]]:
+    count = max(1, min(count, length // DOWNLOAD_SEGMENT_MIN or 1))
+    step = -(-length // count)
+    return [[s, min(length, s + step), s] for s in range(0, length, step)] or [[0, 0, 0]]
+
+
+def download_file(
+    url: str,
+    part_path: str,
+    progress=None,
+    sink=None,
+    segments: int | None = None,
+    probe: dict | None = None,
+    pool: HTTPPool | None = None,
+) -> dict:
+    """Télécharge `url` dans part_path, en reprenant un téléchargement interrompu.
+
+    - reprise: l'avancement est enregistré dans part_path + ".json" (après fdatasync);
+      les requêtes Range portent If-Range: un fichier modifié sur le serveur (réponse 200)
+      lève DownloadError et efface cet état, le téléchargement suivant repart de zéro.
+      Sans validateur (ni ETag ni Last-Modified), rien ne garantit que le fichier n'a pas
+      changé entre deux lancements: les nouvelles tentatives et les segments utilisent de
+      simples Range, mais aucun état de reprise n'est gardé;
+    - segments: les gros fichiers (≥ 2 × DOWNLOAD_SEGMENT_MIN) sont téléchargés en
+      `segments` plages parallèles sur les connexions du pool partagé;
+    - sink(bloc) reçoit le contenu dans l'ordre du fichier (empreintes calculées au fil de
+      l'eau); à la reprise, la partie déjà présente lui est d'abord relue;
+    - progress(octets, total) peut lever une exception (ex: JobCancelled) pour interrompre.
+
+    Le fichier est synchronisé à la fin. Retourne {url, length, resumed (octets repris)}.
+    """
+    pool = pool or HTTP_POOL
+    probe = probe or http_probe(url, pool)
+    length = probe["length"]
+    state_path = f"{part_path}.json"
+    validators = {k: probe[k] for k in ("etag", "last_modified")}
+    if_range = validators["etag"] or validators["last_modified"]
+    resumable = probe["ranges"] and bool(if_range)
+    if segments is None:
+        segments = int(load_config().get("download_segments") or 1)
+
+    state = None
+    if resumable:
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if (
+                state.get("url") != url or state.get("length") != length or state.get("validators") != validators
+                or os.path.getsize(part_path) != length
+            ):
+                state = None
+        except (OSError, ValueError):
+            state = None
+
+    ensure_dir(os.path.dirname(part_path))
+    fd = os.open(part_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if state:
+            segs = state["segments"]
+        else:
+            os.ftruncate(fd, 0)
+            if length is not None:
+                os.ftruncate(fd, length)
+            segs = _plan_segments(length, segments) if probe["ranges"] else [[0, length or 0, 0]]
+        resumed = sum(s[2] - s[0] for s in segs)
+        lock = threading.Lock()
+        stop = threading.Event()
+        changed = threading.Event()  # fichier modifié sur le serveur: état de reprise inutilisable
+        frontier = _HashFrontier(fd, sink, segs)
+        last_save = [time.monotonic()]
+
+        def _save_state() -> None:
+            os.fdatasync(fd)
+            with atomic_output(state_path) as f:
+                f.write(json.dumps({"url": url, "length": length, "validators": validators, "segments": segs}).encode())
+
+        def _done_bytes() -> int:
+            return sum(s[2] - s[0] for s in segs)
+
+        def _fetch(seg: list[int]) -> None:
+            buf = bytearray(HTTP_READ_CHUNK)
+            view = memoryview(buf)
+            errors = 0
+            while not stop.is_set() and (length is None or seg[2] < seg[1]):
+                headers = {}
+                if probe["ranges"]:
+                    headers["Range"] = f"bytes={seg[2]}-{seg[1] - 1}"
+                    if if_range:
+                        headers["If-Range"] = if_range
+                try:
+                    with pool.request("GET", probe["url"], headers=headers) as resp:
+                        if resp.status == 200 and probe["ranges"]:
+                            if not if_range:
+                                raise DownloadError(f"{url} : le serveur a ignoré la plage demandée.")
+                            changed.set()
+                            raise DownloadError("Le fichier a changé sur le serveur : téléchargement à reprendre.")
+                        if resp.status not in (200, 206):
+                            raise DownloadError(f"HTTP {resp.status}")
+                        while not stop.is_set():
+                            n = resp.readinto(view[: HTTP_READ_CHUNK if length is None else min(HTTP_READ_CHUNK, seg[1] - seg[2])])
+                            if n <= 0:
+                                break
+                            os.pwrite(fd, view[:n], seg[2])
+                            with lock:
+                                offset = seg[2]
+                                seg[2] += n
+                                if length is None:
+                                    seg[1] = seg[2]
+                                frontier.wrote(offset, view[:n])
+                                if progress:
+                                    progress(_done_bytes(), length or _done_bytes())
+                                if resumable and time.monotonic() - last_save[0] >= DOWNLOAD_STATE_INTERVAL:
+                                    last_save[0] = time.monotonic()
+                                    _save_state()
+                        if length is None or stop.is_set():
+                            return
+                        if seg[2] < seg[1]:
+                            raise http.client.IncompleteRead(b"", seg[1] - seg[2])
+                except (OSError, http.client.HTTPException) as e:
+                    errors += 1
+                    if errors > DOWNLOAD_RETRIES or not probe["ranges"]:
+                        raise DownloadError(f"{url} : {e}") from e
+                    LOG.info("Téléchargement %s : nouvelle tentative (%s)", url, e)
+
+        todo = [s for s in segs if length is None or s[2] < s[1]]
+        with lock:
+            frontier.catch_up()  # reprise: partie déjà téléchargée
+        try:
+            if len(todo) <= 1:
+                for seg in todo:
+                    _fetch(seg)
+            else:
+                with ThreadPoolExecutor(max_workers=len(todo), thread_name_prefix="aliux-dl") as ex:
+                    futures = [ex.submit(_fetch, s) for s in todo]
+                    try:
+                        for fut in as_completed(futures):
+                            fut.result()
+                    except BaseException:
+                        stop.set()
+                        raise
+        except BaseException:
+            if changed.is_set():
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(state_path)
+            elif resumable:
+                with lock:
+                    _save_state()
+            raise
+
+        if length is None:
+            length = segs[0][2]
+        with lock:
+            frontier.catch_up()
+        if frontier.pos != length:
+            raise DownloadError(f"{url} : téléchargement incomplet ({frontier.pos}/{length} octets).")
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(state_path)
+    return {"url": probe["url"], "length": length, "resumed": resumed}
+
+
+# ---------------------------------------------------------------------------
+# Mises à jour différentielles (informations .upd_info + zsync)
+# ---------------------------------------------------------------------------
+
+# Nombre max. de blocs manquants regroupés dans une même requête Range
+ZSYNC_MAX_RUN_BLOCKS = 1024
+# Somme glissante octet par octet (~0,6 µs/octet en Python): seulement sur cette longueur
+# au début et à la fin de chaque zone sans correspondance, et après chaque bloc trouvé
+ZSYNC_ROLL_WINDOW = 512 * 1024
+# ... et sur un bloc tous les ZSYNC_PROBE_SPACING octets à l'intérieur de ces zones
+ZSYNC_PROBE_SPACING = 256 * 1024
+
+
+class UpdateError(RuntimeError):
+    """Mise à jour impossible (pas d'informations, serveur injoignable, contrôle en échec…)."""
+
+
+def read_update_info(appimage_path: str) -> str | None:
+    """Informations de mise à jour embarquées (.upd_info), ex: 'zsync|https://…/app.AppImage.zsync'."""
+    raw = read_elf_section(appimage_path, ".upd_info")
+    if not raw:
+        return None
+    txt = raw.split(b"\0", 1)[0].decode("utf-8", errors="replace").strip()
+    return txt or None
+
+
+def _http_get(url: str, headers: dict | None = None) -> bytes:
+    req = urllib.request.Request(url, headers={"User-Agent": HTTP_USER_AGENT, **(headers or {})})
+    with urllib.request.urlopen(req, timeout=HTTP_TIMEOUT) as resp:
+        return resp.read()
+
+
+def resolve_zsync_url(update_info: str) -> str:
+    """URL du fichier de contrôle .zsync à partir de .upd_info.
+
+    Formats pris en charge: 'zsync|URL' et 'gh-releases-zsync|user|dépôt|tag|motif'.
+    """
+    parts = update_info.split("|")
+    kind = parts[0]
+    if kind == "zsync" and len(parts) >= 2:
+        return parts[1]
+    if kind == "gh-releases-zsync" and len(parts) >= 5:
+        user, repo, tag, pattern = parts[1:5]
+        api = f"https://api.github.com/repos/{user}/{repo}/releases/"
+        api += "latest" if tag == "latest" else f"tags/{urllib.parse.quote(tag)}"
+        try:
+            release = json.loads(_http_get(api, {"Accept": "application/vnd.github+json"}))
+        except Exception as e:
+            raise UpdateError(f"GitHub injoignable : {e}") from e
+        for asset in release.get("assets", []):
+            if fnmatch.fnmatch(asset.get("name", ""), pattern):
+                return asset["browser_download_url"]
+        raise UpdateError(f"Aucun fichier « {pattern} » dans la publication {tag}.")
+    raise UpdateError(f"Type de mise à jour non pris en charge : {kind}")
+
+
+def parse_zsync(data: bytes) -> dict:
+    """Fichier de contrôle zsync: en-têtes texte, ligne vide, puis sommes de contrôle par bloc
+    (rsum tronquée sur `rsum_bytes` + MD4 tronqué sur `checksum_bytes`).
+    """
+    sep = data.find(b"\n\n")
+    if sep < 0:
+        raise UpdateError("Fichier zsync invalide (en-têtes).")
+    headers: dict[str, str] = {}
+    for line in data[:sep].decode("utf-8", errors="replace").splitlines():
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip()] = v.strip()
+
+    try:
+        blocksize = int(headers["Blocksize"])
+        length = int(headers["Length"])
+        seq_matches, rsum_bytes, checksum_bytes = (int(x) for x in headers.get("Hash-Lengths", "1,4,16").split(","))
+    except (KeyError, ValueError) as e:
+        raise UpdateError(f"Fichier zsync invalide : {e}") from e
+
+    nblocks = (length + blocksize - 1) // blocksize
+    body = data[sep + 2 :]
+    rec = rsum_bytes + checksum_bytes
+    if len(body) < nblocks * rec:
+        raise UpdateError("Fichier zsync tronqué.")
+    checksums = []
+    for i in range(nblocks):
+        chunk = body[i * rec : (i + 1) * rec]
+        checksums.append((int.from_bytes(chunk[:rsum_bytes], "big"), bytes(chunk[rsum_bytes:])))
+
+    return {
+        "headers": headers,
+        "filename": headers.get("Filename", ""),
+        "url": headers.get("URL", ""),
+        "sha1": headers.get("SHA-1", "").lower(),
+        "blocksize": blocksize,
+        "length": length,
+        "seq_matches": seq_matches,
+        "rsum_bytes": rsum_bytes,
+        "checksum_bytes": checksum_bytes,
+        "checksums": checksums,
+    }
+
+
+def _md4_py(data: bytes) -> bytes:
+    """MD4 (RFC 1320) en Python pur: OpenSSL 3 ne fournit plus MD4 par défaut."""
+    mask = 0xFFFFFFFF
+
+    def rol(v: int, s: int) -> int:
+        v &= mask
+        return ((v << s) | (v >> (32 - s))) & mask
+
+    msg = bytearray(data)
+    bit_len = (8 * len(data)) & 0xFFFFFFFFFFFFFFFF
+    msg.append(0x80)
+    msg.extend(b"\0" * ((56 - len(msg) % 64) % 64))
+    msg += struct.pack("<Q", bit_len)
+
+    a, b, c, d = 0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476
+    for off in range(0, len(msg), 64):
+        x = struct.unpack_from("<16I", msg, off)
+        aa, bb, cc, dd = a, b, c, d
+        for i in (0, 4, 8, 12):
+            a = rol(a + ((b & c) | (~b & d)) + x[i], 3)
+            d = rol(d + ((a & b) | (~a & c)) + x[i + 1], 7)
+            c = rol(c + ((d & a) | (~d & b)) + x[i + 2], 11)
+            b = rol(b + ((c & d) | (~c & a)) + x[i + 3], 19)
+        for i in (0, 1, 2, 3):
+            a = rol(a + ((b & c) | (b & d) | (c & d)) + x[i] + 0x5A827999, 3)
+            d = rol(d + ((a & b) | (a & c) | (b & c)) + x[i + 4] + 0x5A827999, 5)
+            c = rol(c + ((d & a) | (d & b) | (a & b)) + x[i + 8] + 0x5A827999, 9)
+            b = rol(b + ((c & d) | (c & a) | (d & a)) + x[i + 12] + 0x5A827999, 13)
+        for i in (0, 2, 1, 3):
+            a = rol(a + (b ^ c ^ d) + x[i] + 0x6ED9EBA1, 3)
+            d = rol(d + (a ^ b ^ c) + x[i + 8] + 0x6ED9EBA1, 9)
+            c = rol(c + (d ^ a ^ b) + x[i + 4] + 0x6ED9EBA1, 11)
+            b = rol(b + (c ^ d ^ a) + x[i + 12] + 0x6ED9EBA1, 15)
+        a, b, c, d = (a + aa) & mask, (b + bb) & mask, (c + cc) & mask, (d + dd) & mask
+    return struct.pack("<4I", a, b, c, d)
+
+
+@functools.lru_cache(maxsize=None)
+def _md4_impl():
+    """hashlib, sinon MD4() de libcrypto via ctypes (API bas niveau, toujours exportée par
+    OpenSSL 3: ~5 µs par bloc de 4 Kio contre ~2 ms pour _md4_py), sinon _md4_py.
+    """
+    try:
+        hashlib.new("md4")
+        return lambda data: hashlib.new("md4", data).digest()
+    except ValueError:
+        pass
+    try:
+        fn = ctypes.CDLL(ctypes.util.find_library("crypto") or "libcrypto.so.3").MD4
+    except (OSError, AttributeError):
+        return _md4_py
+    fn.restype = ctypes.c_void_p
+    fn.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p]
+
+    def _md4_libcrypto(data: bytes) -> bytes:
+        out = ctypes.create_string_buffer(16)
+        fn(bytes(data), len(data), out)
+        return out.raw
+
+    return _md4_libcrypto
+
+
+def md4(data: bytes) -> bytes:
+    return _md4_impl()(data)
+
+
+def zsync_rsum(block: bytes) -> tuple[int, int]:
+    """Somme glissante zsync (a, b) d'un bloc, sur 16 bits chacune."""
+    # b = Σ (n - i)·c_i, c'est-à-dire la somme des sommes partielles
+    return (sum(block) & 0xFFFF, sum(itertools.accumulate(block)) & 0xFFFF)
+
+
+def zsync_match_blocks(seed, ctrl: dict, job: Job | None = None) -> dict[int, int]:
+    """Cherche dans `seed` (bytes / mmap du fichier installé) les blocs du fichier cible.
+
+    La somme glissante n'est pas calculée à chaque position du fichier (trop lent en
+    Python: une dizaine de minutes par Gio sans correspondance). Dans l'ordre:
+    1. positions alignées sur les blocs (parties du fichier non décalées);
+    2. depuis chaque bloc trouvé, blocs voisins attendus (t±1 à ±blocksize): une zone
+       décalée d'un seul tenant est parcourue bloc par bloc;
+    3. somme glissante au début et à la fin de chaque zone encore sans correspondance, sur
+       ZSYNC_ROLL_WINDOW octets prolongés après chaque bloc trouvé: c'est là que les données
+       reprennent après une insertion ou une suppression;
+    4. à l'intérieur des zones restantes, somme glissante sur un bloc tous les
+       ZSYNC_PROBE_SPACING octets: une zone décalée entourée de deux modifications (plus
+       longues que la fenêtre) est trouvée si elle dépasse cet espacement.
+    Les étapes 3 et 4 sont répétées tant qu'elles trouvent de nouveaux blocs.
+    Avec seq_matches=2 (zsyncmake, gros fichiers: sommes tronquées à 2 octets), comme zsync,
+    un bloc t n'est retenu que si le bloc suivant du seed a aussi la somme glissante du bloc
+    t+1: les deux sommes sont comparées avant tout MD4, puis les MD4 tronqués des deux blocs.
+    Retourne {numéro de bloc cible: position dans seed}.
+    """
+    bs = ctrl["blocksize"]
+    rmask = (1 << (8 * ctrl["rsum_bytes"])) - 1
+    cb = ctrl["checksum_bytes"]
+    checksums = ctrl["checksums"]
+    nblocks = len(checksums)
+    seq = ctrl.get("seq_matches", 1) > 1
+    index: dict[int, list[int]] = {}
+    for t, (r, _c) in enumerate(checksums):
+        index.setdefault(r, []).append(t)
+
+    found: dict[int, int] = {}
+    n = len(seed)
+    if n < bs or not checksums:
+        return found
+    positions: list[int] = []  # débuts (triés) des blocs trouvés dans seed
+    scanned = [0]
+
+    def _key(a: int, b: int) -> int:
+        return ((a << 16) | b) & rmask
+
+    def _record(t: int, p: int) -> None:
+        found[t] = p
+        bisect.insort(positions, p)
+
+    def _next_key(p: int) -> int | None:
+        return _key(*zsync_rsum(seed[p + bs : p + 2 * bs])) if seq and p + 2 * bs <= n else None
+
+    def _match_at(p: int, key: int, next_key) -> int | None:
+        """Blocs cibles présents en p (next_key: somme du bloc suivant, ou fonction la calculant)."""
+        cands = index.get(key)
+        if not cands:
+            return None
+        strong = strong2 = None
+        first = None
+        for t in cands:
+            if t in found:
+                continue
+            pair = seq and t + 1 < nblocks
+            if pair:
+                if callable(next_key):
+                    next_key = next_key(p)
+                if checksums[t + 1][0] != next_key:
+                    continue  # le bloc suivant ne suit pas: pas de MD4
+            if strong is None:
+                strong = md4(bytes(seed[p : p + bs]))[:cb]
+            if checksums[t][1] != strong:
+                continue
+            if pair:
+                if strong2 is None:
+                    strong2 = md4(bytes(seed[p + bs : p + 2 * bs]))[:cb]
+                if checksums[t + 1][1] != strong2:
+                    continue
+                if t + 1 not in found:
+                    _record(t + 1, p + bs)
+            _record(t, p)
+            first = t if first is None else first
+        return first
+
+    def _follow(t: int, p: int) -> int:
+        """Blocs voisins attendus autour du bloc t trouvé en p; retourne la fin de la suite."""
+        end = p + bs
+        for step in (1, -1):
+            u, q = t + step, p + step * bs
+            while 0 <= u < nblocks and q >= 0 and q + bs <= n:
+                if u not in found:
+                    block = seed[q : q + bs]
+                    if _key(*zsync_rsum(block)) != checksums[u][0] or md4(bytes(block))[:cb] != checksums[u][1]:
+                        break
+                    _record(u, q)
+                elif found[u] != q:
+                    break
+                if step > 0:
+                    end = q + bs
+                u += step
+                q += step * bs
+        return end
+
+    def _roll(i: int, stop: int, limit: int) -> int:
+        """Somme glissante sur les débuts de bloc [i, stop), prolongée après chaque bloc
+        trouvé de ZSYNC_ROLL_WINDOW octets, sans dépasser `limit`. Retourne la position
+        atteinte."""
+
+        def _window(pos: int) -> tuple[int, int, int | None, int | None]:
+            a, b = zsync_rsum(seed[pos : pos + bs])
+            if seq and pos + 2 * bs <= n:
+                return (a, b, *zsync_rsum(seed[pos + bs : pos + 2 * bs]))
+            return (a, b, None, None)
+
+        a, b, a2, b2 = _window(i)
+        while i < stop:
+            t = _match_at(i, _key(a, b), _key(a2, b2) if a2 is not None else None)
+            if t is not None:
+                end = _follow(t, i)
+                stop = min(limit, max(stop, end + ZSYNC_ROLL_WINDOW))
+                if end >= stop or end + bs > n:
+                    return end
+                i = end
+                a, b, a2, b2 = _window(i)
+                continue
+            if i + bs >= n:
+                return n
+            x = seed[i]
+            y = seed[i + bs]
+            a = (a - x + y) & 0xFFFF
+            b = (b - bs * x + a) & 0xFFFF
+            if a2 is not None:
+                if i + 2 * bs < n:
+                    y2 = seed[i + 2 * bs]
+                    a2 = (a2 - y + y2) & 0xFFFF
+                    b2 = (b2 - bs * y + a2) & 0xFFFF
+                else:
+                    a2 = b2 = None  # le bloc suivant sort du fichier
+            i += 1
+            scanned[0] += 1
+            if job and not scanned[0] % (1024 * 1024):
+                job.progress(f"Recherche des blocs réutilisables… {format_bytes(i)} / {format_bytes(n)}", i / n)
+        return i
+
+    # 1) et 2): positions alignées, puis blocs voisins
+    for p in range(0, n - bs + 1, bs):
+        if job and not p % (64 * 1024 * 1024):
+            job.progress(f"Recherche des blocs réutilisables… {format_bytes(p)} / {format_bytes(n)}", p / n)
+        if positions and positions[min(bisect.bisect_left(positions, p), len(positions) - 1)] == p:
+            continue
+        a, b = zsync_rsum(seed[p : p + bs])
+        t = _match_at(p, _key(a, b), _next_key)
+        if t is not None:
+            _follow(t, p)
+
+    # 3) somme glissante aux deux bouts des zones sans correspondance
+    # (une nouvelle suite trouvée crée de nouveaux bouts: on recommence jusqu'à stabilité)
+    def _gaps() -> list[tuple[int, int]]:
+        gaps = []
+        covered = 0
+        for p in positions:
+            if p - covered >= bs:
+                gaps.append((covered, p))
+            covered = max(covered, p + bs)
+        if n - covered >= bs:
+            gaps.append((covered, n))
+        return gaps
+
+    heads_done: set[int] = set()
+    tails_done: set[int] = set()
+    probes_done: set[int] = set()
+    while True:
+        before = len(found)
+        for g0, g1 in _gaps():
+            last = g1 - bs + 1  # dernier début de bloc possible + 1
+            reached = g0
+            if g0 not in heads_done:
+                heads_done.add(g0)
+                reached = _roll(g0, min(last, g0 + ZSYNC_ROLL_WINDOW), last)
+            if g1 not in tails_done:
+                tails_done.add(g1)
+                start = max(reached, last - ZSYNC_ROLL_WINDOW)
+                if start < last:
+                    _roll(start, last, last)
+        if len(found) > before:
+            continue
+        # 4) sondage de l'intérieur des zones (grille fixe: pas de sonde refaite)
+        for g0, g1 in _gaps():
+            last = g1 - bs + 1
+            for pos in range(-(-g0 // ZSYNC_PROBE_SPACING) * ZSYNC_PROBE_SPACING, last, ZSYNC_PROBE_SPACING):
+                if pos not in probes_done:
+                    probes_done.add(pos)
+                    _roll(pos, min(last, pos + bs), last)
+        if len(found) == before:
+            return found
+
+
+class _RangeClient:
+    """Requêtes Range sur une URL, via les connexions persistantes partagées (HTTP_POOL)."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def get_range(self, start: int, end: int) -> bytes:
+        """Octets [start, end] inclus."""
+        try:
+            with HTTP_POOL.request("GET", self.url, headers={"Range": f"bytes={start}-{end}"}) as resp:
+                self.url = resp.url  # redirections résolues une fois pour toutes
+                data = resp.read()
+        except DownloadError as e:
+            raise UpdateError(str(e)) from e
+        if resp.status != 206:
+            raise UpdateError(f"Requête Range refusée (HTTP {resp.status}).")
+        if len(data) != end - start + 1:
+            raise UpdateError("Réponse Range incomplète.")
+        return data
+
+    def close(self) -> None:
+        pass
+
+
+def zsync_update_file(
+    job: Job, installed: str, zsync_url: str, dst: str | None = None, ctrl: dict | None = None,
+    use_seed: bool = True,
+) -> dict:
+    """Met à jour `installed` d'après le fichier .zsync à `zsync_url`.
+
+    - blocs réutilisés depuis le fichier installé (somme glissante + MD4);
+    - blocs manquants téléchargés par requêtes Range regroupées (connexion persistante);
+    - résultat écrit dans l'ordre (SHA-1 calculé au fil de l'eau), vérifié puis installé par
+      remplacement atomique sur `dst` (par défaut: `installed`).
+
+    `ctrl`: fichier de contrôle déjà lu (parse_zsync()), sinon téléchargé. use_seed=False:
+    aucun bloc n'est cherché dans `installed` (AppImage recompressée: rien à réutiliser).
+    Retour: {status: "up-to-date"|"updated", length, reused, downloaded, sha256 (si "updated")}.
+    """
+    dst = dst or installed
+    if ctrl is None:
+        job.progress("Téléchargement du fichier de contrôle…")
+        try:
+            ctrl = parse_zsync(_http_get(zsync_url))
+        except UpdateError:
+            raise
+        except Exception as e:
+            raise UpdateError(f"Fichier zsync injoignable : {e}") from e
+    target_url = urllib.parse.urljoin(zsync_url, ctrl["url"] or ctrl["filename"])
+    bs, length = ctrl["blocksize"], ctrl["length"]
+    nblocks = len(ctrl["checksums"])
+
+    with open(installed, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        seed = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        try:
+            if size == length and ctrl["sha1"] and hashlib.sha1(seed).hexdigest() == ctrl["sha1"]:
+                return {"status": "up-to-date", "length": length, "reused": length, "downloaded": 0}
+            found = zsync_match_blocks(seed, ctrl, job) if use_seed else {}
+
+            client = _RangeClient(target_url)
+            sha1 = hashlib.sha1()
+            sha256 = hashlib.sha256()
+            reused = downloaded = 0
+            mode = os.stat(installed).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+            try:
+                with atomic_output(dst, mode=mode) as out:
+                    t = 0
+                    while t < nblocks:
+                        job.check()
+                        start = t * bs
+                        if t in found:
+                            off = found[t]
+                            data = bytes(seed[off : off + min(bs, length - start)])
+                            reused += len(data)
+                            t += 1
+                        else:
+                            run = 1
+                            while t + run < nblocks and t + run not in found and run < ZSYNC_MAX_RUN_BLOCKS:
+                                run += 1
+                            end = min(length, (t + run) * bs) - 1
+                            data = client.get_range(start, end)
+                            downloaded += len(data)
+                            t += run
+                        out.write(data)
+                        sha1.update(data)
+                        sha256.update(data)
+                        job.progress(
+                            f"Mise à jour : {format_bytes(reused)} réutilisés, {format_bytes(downloaded)} téléchargés",
+                            t / nblocks,
+                        )
+                    if ctrl["sha1"] and sha1.hexdigest() != ctrl["sha1"]:
+                        raise UpdateError("Somme SHA-1 incorrecte après reconstruction.")
+            finally:
+                client.close()
+        finally:
+            if isinstance(seed, mmap.mmap):
+                seed.close()
+
+    return {
+        "status": "updated", "length": length, "reused": reused, "downloaded": downloaded,
+        "sha256": sha256.hexdigest(),
+    }
+
+
+def update_app(job: Job, item: dict, check_only: bool = False) -> dict:
+    """Mise à jour différentielle d'une appli installée (voir zsync_update_file()).
+
+    check_only=True: indique seulement si une mise à jour est disponible (status
+    "up-to-date" ou "available").
+    """
+    ap = item.get("appimage_path")
+    if not ap or not os.path.isfile(ap):
+        raise UpdateError("AppImage introuvable.")
+    info = read_update_info(ap)
+    if not info:
+        return {"status": "no-update-info"}
+    zsync_url = resolve_zsync_url(info)
+
+    ctrl = None
+    if check_only or item.get("original_sha1"):
+        ctrl = parse_zsync(_http_get(zsync_url))
+        if item.get("original_sha1") and ctrl["sha1"]:
+            # AppImage recompressée: son SHA-1 n'est plus celui publié, on compare l'original
+            if item["original_sha1"] == ctrl["sha1"]:
+                return {"status": "up-to-date", "length": ctrl["length"]}
+            if check_only:
+                return {"status": "available", "length": ctrl["length"]}
+
+    if check_only:
+        if os.path.getsize(ap) == ctrl["length"] and ctrl["sha1"]:
+            h = hashlib.sha1()
+            with open(ap, "rb") as f:
+                for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b""):
+                    job.check()
+                    h.update(chunk)
+            if h.hexdigest() == ctrl["sha1"]:
+                return {"status": "up-to-date"}
+        return {"status": "available", "length": ctrl["length"]}
+
+    with app_lock(item_slug(item), job):
+        # AppImage recompressée: aucun bloc commun avec la version publiée
+        result = zsync_update_file(job, ap, zsync_url, ctrl=ctrl, use_seed=not item.get("original_sha1"))
+        if result["status"] == "updated" and item.get("desktop_path"):
+            set_desktop_key(item["desktop_path"], "X-Aliux-SHA256", result["sha256"])
+            if item.get("original_sha256"):
+                for key in ORIGINAL_DIGEST_KEYS:
+                    set_desktop_key(item["desktop_path"], key, None)
+    if result["status"] == "updated":
+        result["recompressed"] = _recompress_after_update(job, item, result["sha256"])
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Export / rejeu d'un ensemble d'applications (manifeste)
+# ---------------------------------------------------------------------------
+
+MANIFEST_FORMAT = "aliux-manifest"
+MANIFEST_VERSION = 1
+
+
+def category_label(categories: str) -> str:
+    """Catégories freedesktop -> libellé Aliux (CATEGORY_MAP), « Utilitaire » à défaut."""
+    for label, value in CATEGORY_MAP.items():
+        if value == categories:
+            return label
+    return "Utilitaire"
+
+
+def export_manifest(job: Job, manifest_path: str) -> dict:
+    """Écrit le manifeste des applis installées (nom, catégorie, commentaire, icône, SHA-256)."""
+    cache = DigestCache()
+    apps = []
+    installs = [i for i in list_aliux_installs() if i.get("appimage_path") and os.path.isfile(i["appimage_path"])]
+    for n, item in enumerate(installs, 1):
+        job.progress(f"Empreinte {n}/{len(installs)} : {item['name']}", n / max(1, len(installs)))
+        ap = item["appimage_path"]
+        icon = None
+        ic = item.get("icon_path")
+        if ic and os.path.isfile(ic):
+            with open(ic, "rb") as f:
+                icon = {"ext": os.path.splitext(ic)[1].lower() or ".png", "data": base64.b64encode(f.read()).decode("ascii")}
+        apps.append(
+            {
+                "name": item["name"],
+                "category": category_label(item.get("categories", "")),
+                "categories": item.get("categories", ""),
+                "comment": item.get("comment", ""),
+                "filename": os.path.basename(ap),
+                "size": os.path.getsize(ap),
+                "sha256": cache.digest(ap, job=job),
+                "icon": icon,
+            }
+        )
+    cache.save()
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "version": MANIFEST_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "apps": apps,
+    }
+    with index_lock("manifest"), atomic_output(manifest_path) as f:
+        f.write(json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8"))
+    return manifest
+
+
+def load_manifest(manifest_path: str) -> dict:
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or manifest.get("format") != MANIFEST_FORMAT:
+        raise ValueError(f"{manifest_path} n'est pas un manifeste Aliux.")
+    if manifest.get("version", 0) > MANIFEST_VERSION:
+        raise ValueError(f"Version de manifeste non prise en charge : {manifest.get('version')}")
+    return manifest
+
+
+class SourceIndex:
+    """Index d'un dossier source pour retrouver des fichiers par empreinte.
+
+    Construit une fois (os.scandir récursif) par taille de fichier: seuls les fichiers
+    dont la taille correspond à une entrée recherchée sont hachés, chacun une seule fois.
+    """
+
+    def __init__(self, root: str, cache: DigestCache):
+        self.cache = cache
+        self.by_size: dict[int, list[str]] = {}
+        self._digests: dict[str, str] = {}
+        self._lock = threading.Lock()
+        stack = [root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for e in it:
+                        try:
+                            if e.is_dir(follow_symlinks=False):
+                                stack.append(e.path)
+                            elif e.is_file():
+                                self.by_size.setdefault(e.stat().st_size, []).append(e.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def find(self, size: int, sha256: str, job: Job | None = None) -> str | None:
+        for path in self.by_size.get(size, []):
+            with self._lock:
+                digest = self._digests.get(path)
+            if digest is None:
+                try:
+                    digest = self.cache.digest(path, job=job)
+                except OSError:
+                    continue
+                with self._lock:
+                    self._digests[path] = digest
+            if digest == sha256:
+                return path
+        return None
+
+
+def _replay_one(job: Job, entry: dict, index: SourceIndex, install_dir: str, installed: dict, log) -> str:
+    """Installe une entrée du manifeste; retourne 'installed' | 'skipped' | 'missing'."""
+    name = entry["name"]
+    current = installed.get(slugify(name))
+    if current and current.get("appimage_path") and os.path.isfile(current["appimage_path"]):
+        if index.cache.digest(current["appimage_path"], job=job) == entry["sha256"]:
+            log(f"=  {name} : déjà installée et identique")
+            return "skipped"
+
+    src = index.find(entry["size"], entry["sha256"], job=job)
+    if not src:
+        log(f"?  {name} : aucun fichier d'empreinte {entry['sha256'][:12]}… dans la source")
+        return "missing"
+
+    icon_tmp = None
+    try:
+        icon = entry.get("icon")
+        if icon and icon.get("data"):
+            fd, icon_tmp = tempfile.mkstemp(prefix="aliux-icon-", suffix=icon.get("ext", ".png"))
+            with os.fdopen(fd, "wb") as f:
+                f.write(base64.b64decode(icon["data"]))
+        categories = entry.get("categories") or CATEGORY_MAP.get(entry.get("category", ""), "Utility;")
+        install_appimage(
+            job,
+            src,
+            name,
+            desc=entry.get("comment", ""),
+            categories=categories,
+            install_dir=install_dir,
+            manual_icon=icon_tmp or "",
+            extract_icon=icon_tmp is None,
+            log=lambda _m: None,
+            refresh=False,
+        )
+    finally:
+        if icon_tmp:
+            try:
+                os.remove(icon_tmp)
+            except OSError:
+                pass
+    log(f"✅ {name} : installée depuis {src}")
+    return "installed"
+
+
+def replay_manifest(
+    job: Job, manifest_path: str, source_dir: str, install_dir: str = DEFAULT_INSTALL_DIR,
+    workers: int | None = None, log=None,
+) -> dict:
+    """Rejoue un manifeste: retrouve chaque AppImage dans source_dir par son empreinte et
+    installe les applis manquantes ou différentes, en parallèle.
+
+    Retourne {installed, skipped, missing, failed} (listes de noms).
+    """
+    _log = log or LOG.info
+    manifest = load_manifest(manifest_path)
+    cache = DigestCache()
+    job.progress("Indexation du dossier source…")
+    index = SourceIndex(source_dir, cache)
+    installed = {slugify(i["name"]): i for i in list_aliux_installs()}
+
+    result: dict[str, list[str]] = {"installed": [], "skipped": [], "missing": [], "failed": []}
+    apps = manifest.get("apps", [])
+    with ThreadPoolExecutor(max_workers=workers or min(4, os.cpu_count() or 2), thread_name_prefix="aliux-replay") as pool:
+        futures = {
+            pool.submit(_replay_one, job, entry, index, install_dir, installed, _log): entry for entry in apps
+        }
+        for n, fut in enumerate(as_completed(futures), 1):
+            entry = futures[fut]
+            try:
+                result[fut.result()].append(entry["name"])
+            except JobCancelled:
+                raise
+            except Exception as e:
+                _log(f"❌ {entry['name']} : {e}")
+                result["failed"].append(entry["name"])
+            job.progress(f"Rejeu {n}/{len(apps)}", n / max(1, len(apps)))
+
+    refresh_desktop_database()
+    cache.save()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Vérification de l'intégrité des applis installées
+# ---------------------------------------------------------------------------
+
+def verify_installs(
+    job: Job, installs: list[dict] | None = None, full: bool = False, record: bool = False,
+    workers: int | None = None,
+) -> list[dict]:
+    """Compare l'empreinte SHA-256 de chaque AppImage à celle enregistrée à l'installation.
+
+    Les fichiers sont hachés en parallèle (un thread par cœur, lecture mmap). Un fichier dont
+    (périphérique, inode, taille, mtime) n'a pas changé depuis le dernier calcul n'est pas
+    relu, sauf full=True. record=True enregistre l'empreinte actuelle des anciennes
+    installations qui n'en ont pas.
+
+    Retourne des dict {name, path, status, expected, actual, error}; status vaut
+    "ok", "modified", "missing", "unrecorded", "recorded" ou "error".
+    """
+    installs = list_aliux_installs() if installs is None else installs
+    cache = DigestCache()
+    results: list[dict] = []
+    todo = []
+    for item in installs:
+        ap = item.get("appimage_path")
+        res = {"name": item["name"], "path": ap, "status": None, "expected": item.get("sha256"),
+               "actual": None, "error": None}
+        results.append(res)
+        if not ap or not os.path.isfile(ap):
+            res["status"] = "missing"
+        elif not res["expected"] and not record:
+            res["status"] = "unrecorded"
+        else:
+            todo.append((item, res))
+
+    total = sum(os.path.getsize(res["path"]) for _item, res in todo) or 1
+    meter = transfer_progress(job, "Vérification")
+    done = [0]
+    progress_lock = threading.Lock()
+
+    def _hash(item: dict, res: dict) -> None:
+        last = [0]
+
+        def _cb(n: int, _size: int):
+            with progress_lock:
+                done[0] += n - last[0]
+                last[0] = n
+                meter(done[0], total)
+
+        res["actual"] = cache.digest(res["path"], job=job, progress=_cb, refresh=full)
+        if not res["expected"]:
+            # Même verrou que l'installation, la mise à jour et la désinstallation; le lanceur
+            # est relu: une réinstallation entre-temps a pu enregistrer une autre empreinte.
+            with app_lock(item_slug(item), job):
+                try:
+                    res["expected"] = parse_desktop_file(item["desktop_path"]).get("X-Aliux-SHA256")
+                except FileNotFoundError:
+                    res["status"] = "missing"
+                    return
+                if not res["expected"]:
+                    set_desktop_key(item["desktop_path"], "X-Aliux-SHA256", res["actual"])
+                    res["status"] = "recorded"
+                    return
+            res["status"] = "ok" if res["actual"] == res["expected"] else "modified"
+        else:
+            res["status"] = "ok" if res["actual"] == res["expected"] else "modified"
+
+    if todo:
+        with ThreadPoolExecutor(
+            max_workers=workers or os.cpu_count() or 2, thread_name_prefix="aliux-verify"
+        ) as pool:
+            futures = {pool.submit(_hash, item, res): res for item, res in todo}
+            try:
+                for fut in as_completed(futures):
+                    try:
+                        fut.result()
+                    except JobCancelled:
+                        raise
+                    except Exception as e:
+                        res = futures[fut]
+                        res["status"], res["error"] = "error", str(e)
+            except JobCancelled:
+                for f in futures:
+                    f.cancel()
+                raise
+            finally:
+                cache.save()
+    LOG.info("Vérification : cache d'empreintes %d réussite(s), %d calcul(s)", cache.hits, cache.misses)
+    return results
+
+
+_VERIFY_LABELS = {
+    "ok": "intacte",
+    "modified": "MODIFIÉE",
+    "missing": "introuvable",
+    "unrecorded": "sans empreinte",
+    "recorded": "empreinte enregistrée",
+    "error": "erreur",
+}
+
+
+# ---------------------------------------------------------------------------
+# Déplacement du dossier d'installation
+# ---------------------------------------------------------------------------
+
+RELOCATE_STATE_PATH = os.path.join(STATE_DIR, "relocate.json")
+
+# Étapes d'un déplacement (dans l'ordre); sauvegardées après chaque étape pour la reprise.
+_RELOCATE_STEPS = ("pending", "moved", "rewritten", "done")
+
+
+def _save_relocate_state(state: dict) -> None:
+    with atomic_output(RELOCATE_STATE_PATH) as f:
+        f.write(json.dumps(state, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def load_relocate_state() -> dict | None:
+    """État d'un déplacement interrompu (None s'il n'y en a pas)."""
+    try:
+        with open(RELOCATE_STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def plan_relocation(target_dir: str) -> list[dict]:
+    """Liste les déplacements nécessaires pour regrouper les applis dans target_dir.
+
+    Une appli installée dans son propre dossier (<racine>/<slug>/<slug>.AppImage) est
+    déplacée avec son dossier; une appli d'une ancienne version (AppImage posée
+    directement dans la racine) est déplacée seule. Une AppImage adoptée en place reste
+    où l'utilisateur l'a mise.
+    """
+    target = os.path.realpath(os.path.expanduser(target_dir))
+    moves = []
+    for item in list_aliux_installs():
+        ap = item.get("appimage_path")
+        if not ap or not os.path.isfile(ap):
+            continue
+        app_dir = app_layout_dir(ap)
+        if item.get("adopted") and not app_dir:
+            continue
+        if app_dir:
+            kind, src = "dir", app_dir
+        else:
+            kind, src = "file", ap
+        if os.path.realpath(os.path.dirname(src)) == target:
+            continue
+        dst = os.path.join(target, os.path.basename(src))
+        moves.append(
+            {
+                "name": item["name"],
+                "desktop_path": item["desktop_path"],
+                "kind": kind,
+                "src": src,
+                "dst": dst,
+                "old_path": ap,
+                "new_path": os.path.join(dst, os.path.basename(ap)) if kind == "dir" else dst,
+                "step": "pending",
+            }
+        )
+    return moves
+
+
+def _copy_preserving(src: str, dst: str, progress=None) -> None:
+    """Copie atomique d'un fichier (mode et dates conservés), via un .aliux-tmp-* voisin."""
+    dst_dir = os.path.dirname(dst)
+    ensure_dir(dst_dir)
+    fd, tmp_path = tempfile.mkstemp(prefix=".aliux-tmp-", dir=dst_dir)
+    try:
+        try:
+            copy_file_chunked(src, fd, progress=progress)
+        finally:
+            os.close(fd)
+        shutil.copystat(src, tmp_path)
+        os.replace(tmp_path, dst)
+    finally:
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except Exception:
+            pass
+
+
+def _relocate_copy(move: dict, progress) -> None:
+    """Copie (autre système de fichiers) d'un dossier d'appli ou d'une AppImage seule."""
+    if move["kind"] == "file":
+        _copy_preserving(move["src"], move["dst"], progress=progress)
+        return
+    for root, dirs, files in os.walk(move["src"]):
+        rel = os.path.relpath(root, move["src"])
+        out = os.path.normpath(os.path.join(move["dst"], rel))
+        ensure_dir(out)
+        for fn in files:
+            if fn.startswith(".aliux-tmp-"):
+                continue
+            s = os.path.join(root, fn)
+            if os.path.islink(s):
+                d = os.path.join(out, fn)
+                if os.path.lexists(d):
+                    os.remove(d)
+                os.symlink(os.readlink(s), d)
+            else:
+                _copy_preserving(s, os.path.join(out, fn), progress=progress)
+
+
+def _rewrite_launchers(moves: list[dict]) -> list[str]:
+    """Réécrit d'un bloc les lanceurs (Exec=, TryExec=, X-Aliux-AppImagePath=).
+
+    Une seule transaction pour tout le lot: nouveaux fichiers préparés à côté des anciens,
+    synchronisation groupée, puis os.replace(): un lanceur est toujours soit l'ancien,
+    soit le nouveau. Retourne les erreurs.
+    """
+    errors: list[str] = []
+    with Transaction("relocate", f"{len(moves)} lanceur(s)") as tx:
+        for move in moves:
+            dp = move["desktop_path"]
+            try:
+                with open(dp, "r", encoding="utf-8") as f:
+                    text = f.read()
+                mode = stat.S_IMODE(os.stat(dp).st_mode)
+            except OSError as e:
+                errors.append(f"{dp} : {e}")
+                continue
+            new_text = text.replace(move["old_path"], move["new_path"])
+            if new_text != text:
+                tx.write(dp, new_text.encode("utf-8"), mode=mode)
+        errors.extend(tx.commit()[1])
+    return errors
+
+
+def relocate_installs(
+    job: Job, target_dir: str | None = None, workers: int | None = None, log=None
+) -> dict:
+    """Déplace les applis installées vers target_dir et met à jour leurs lanceurs.
+
+    - même système de fichiers : os.rename() du dossier de l'appli (instantané);
+    - sinon : copies en parallèle, réécriture des lanceurs, puis suppression des originaux;
+    - les lanceurs sont réécrits en un seul lot, suivi d'un seul rafraîchissement du cache.
+
+    L'avancement est enregistré dans RELOCATE_STATE_PATH: sans target_dir (ou avec le
+    même), un déplacement interrompu reprend là où il s'était arrêté. Un seul déplacement à
+    la fois; les applis concernées restent verrouillées (app_lock()) jusqu'à la fin.
+    Retourne {target, moved, errors}.
+    """
+    _log = log or LOG.info
+    with contextlib.ExitStack() as stack:
+        try:
+            stack.enter_context(file_lock(os.path.join(LOCK_DIR, "relocate.lock"), blocking=False))
+        except BlockingIOError:
+            raise RuntimeError("Un déplacement est déjà en cours (autre fenêtre ou commande).") from None
+        state = _relocation_state(target_dir, _log)
+        if not state["moves"]:
+            return {"target": state["target"], "moved": [], "errors": []}
+        stack.enter_context(app_locks([item_slug(m) for m in state["moves"]], job))
+        return _run_relocation(job, state, workers, _log)
+
+
+def _relocation_state(target_dir: str | None, _log) -> dict:
+    """État du déplacement: reprise de RELOCATE_STATE_PATH ou nouveau plan vers target_dir."""
+    state = load_relocate_state()
+    if state:
+        if target_dir and os.path.realpath(os.path.expanduser(target_dir)) != state["target"]:
+            raise RuntimeError(
+                f"Un déplacement vers {state['target']} a été interrompu : reprenez-le d'abord."
+            )
+        _log(f"Reprise du déplacement vers {state['target']}")
+    else:
+        if not target_dir:
+            raise RuntimeError("Aucun déplacement à reprendre.")
+        target = os.path.realpath(os.path.expanduser(target_dir))
+        state = {"target": target, "moves": plan_relocation(target)}
+        if not state["moves"]:
+            return state
+        for move in state["moves"]:
+            if os.path.lexists(move["dst"]):
+                raise RuntimeError(f"{move['dst']} existe déjà.")
+        ensure_dir(target)
+        _save_relocate_state(state)
+    return state
+
+
+def _run_relocation(job: Job, state: dict, workers: int | None, _log) -> dict:
+    target = state["target"]
+    moves = state["moves"]
+    state_lock = threading.Lock()
+    errors: list[str] = []
+
+    def _mark(move: dict, step: str) -> None:
+        with state_lock:
+            move["step"] = step
+            _save_relocate_state(state)
+
+    target_dev, avail = disk_free(target)
+
+    # 1) Renommages (même FS) et copies (autre FS)
+    to_copy = []
+    for move in moves:
+        if move["step"] != "pending":
+            continue
+        if not os.path.lexists(move["src"]):
+            if os.path.lexists(move["dst"]):
+                _mark(move, "moved")  # renommé juste avant l'interruption
+            else:
+                # Supprimée à la main depuis le plan: ignorée (la reprise ne bloque pas dessus)
+                errors.append(f"{move['name']} : {move['src']} introuvable, ignorée.")
+                _mark(move, "skipped")
+        elif os.stat(move["src"]).st_dev == target_dev:
+            os.rename(move["src"], move["dst"])
+            _log(f"➡️ {move['name']} : {move['dst']}")
+            _mark(move, "moved")
+        else:
+            to_copy.append(move)
+
+    if to_copy:
+        total = sum(tree_size(m["src"]) for m in to_copy)
+        if total > avail:
+            raise InsufficientSpaceError(
+                f"Espace insuffisant dans {target} : {format_bytes(total)} nécessaires, "
+                f"{format_bytes(avail)} disponibles."
+            )
+        meter = transfer_progress(job, "Déplacement")
+        copied = [0]
+        progress_lock = threading.Lock()
+
+        def _file_progress():
+            last = [0]
+
+            def _cb(done: int, _total: int):
+                with progress_lock:
+                    copied[0] += done - last[0]
+                    last[0] = done if done < _total else 0
+                    meter(copied[0], total)
+
+            return _cb
+
+        def _copy(move: dict) -> None:
+            _relocate_copy(move, _file_progress())
+            _mark(move, "moved")
+
+        with ThreadPoolExecutor(
+            max_workers=workers or min(4, len(to_copy)), thread_name_prefix="aliux-relocate"
+        ) as pool:
+            futures = {pool.submit(_copy, m): m for m in to_copy}
+            for fut in as_completed(futures):
+                move = futures[fut]
+                try:
+                    fut.result()
+                    _log(f"➡️ {move['name']} : {move['dst']} (copie)")
+                except JobCancelled:
+                    for f in futures:
+                        f.cancel()
+                    raise
+                except Exception as e:
+                    errors.append(f"{move['name']} : {e}")
+
+    # 2) Lanceurs: un seul lot
+    ready = [m for m in moves if m["step"] == "moved"]
+    if ready:
+        job.progress("Mise à jour des lanceurs…")
+        errors.extend(_rewrite_launchers(ready))
+        with state_lock:
+            for m in ready:
+                m["step"] = "rewritten"
+            _save_relocate_state(state)
+
+    # 3) Suppression des originaux (copies entre systèmes de fichiers)
+    for move in moves:
+        if move["step"] != "rewritten":
+            continue
+        job.check()
+        try:
+            if os.path.isdir(move["src"]) and not os.path.islink(move["src"]):
+                shutil.rmtree(move["src"])
+            elif os.path.lexists(move["src"]):
+                os.remove(move["src"])
+        except OSError as e:
+            errors.append(f"{move['src']} : {e}")
+            continue
+        move["step"] = "done"
+
+    refresh_desktop_database()
+    moved = [m["name"] for m in moves if m["step"] == "done"]
+    if all(m["step"] in ("done", "skipped") for m in moves):
+        try:
+            os.remove(RELOCATE_STATE_PATH)
+        except OSError:
+            pass
+    else:
+        _save_relocate_state(state)
+    return {"target": target, "moved": moved, "errors": errors}
+
+
+# ---------------------------------------------------------------------------
+# Ménage: fichiers temporaires laissés par un crash, icônes et dossiers orphelins
+# ---------------------------------------------------------------------------
+
+# Ancienneté minimale d'un reste avant suppression (une copie peut être en cours)
+HOUSEKEEPING_MIN_AGE = 3600
+# Téléchargements interrompus (.aliux-part-*): gardés une semaine pour pouvoir reprendre
+HOUSEKEEPING_PART_MAX_AGE = 7 * 86400
+
+# Fichiers d'ICON_DIR appartenant à Aliux lui-même
+_SELF_ICON_NAMES = {"aliux.png"}
+
+
+@contextlib.contextmanager
+def file_lock(path: str, blocking: bool = True):
+    """Verrou consultatif inter-processus (flock exclusif) sur `path`.
+
+    En mode non bloquant, lève BlockingIOError si le verrou est déjà pris.
+    """
+    ensure_dir(os.path.dirname(path))
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+# Fichier verrouillé (flock) tant qu'un dossier de travail aliux-extract-* est utilisé
+WORK_DIR_BUSY = ".aliux-busy"
+
+
+@contextlib.contextmanager
+def work_tempdir(dir: str | None = None):
+    """Dossier temporaire aliux-extract-* (extraction, recompression) marqué « en cours ».
+
+    Un verrou est tenu sur WORK_DIR_BUSY pendant toute l'utilisation: le ménage ne supprime
+    pas un dossier vivant, même quand l'opération dure plus que HOUSEKEEPING_MIN_AGE.
+    """
+    with tempfile.TemporaryDirectory(prefix="aliux-extract-", dir=dir) as td:
+        with file_lock(os.path.join(td, WORK_DIR_BUSY)):
+            yield td
+
+
+def work_dir_busy(path: str) -> bool:
+    """Vrai si un processus utilise encore le dossier de travail `path` (voir work_tempdir())."""
+    busy = os.path.join(path, WORK_DIR_BUSY)
+    if not os.path.exists(busy):
+        return False
+    try:
+        with file_lock(busy, blocking=False):
+            return False
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+
+
+def tree_size(path: str) -> int:
+    """Taille (octets) d'un fichier ou d'une arborescence, sans suivre les liens."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return 0
+    if not stat.S_ISDIR(st.st_mode):
+        return st.st_size
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+def _launcher_references() -> tuple[set[str], set[str]]:
+    """Chemins (AppImage, icônes) référencés par les lanceurs de DESKTOP_DIR."""
+    appimages: set[str] = set()
+    icons: set[str] = set()
+    if not os.path.isdir(DESKTOP_DIR):
+        return (appimages, icons)
+    with os.scandir(DESKTOP_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".desktop"):
+                continue
+            try:
+                data = parse_desktop_file(entry.path)
+            except Exception:
+                continue
+            if data.get("X-Aliux-AppImagePath"):
+                appimages.add(os.path.realpath(data["X-Aliux-AppImagePath"]))
+            m = re.search(r'"([^"]+\.AppImage)"', data.get("Exec", ""))
+            if m:
+                appimages.add(os.path.realpath(m.group(1)))
+            for key in ("Icon", "X-Aliux-IconPath"):
+                v = data.get(key, "")
+                if v.startswith("/"):
+                    icons.add(os.path.realpath(v))
+    return (appimages, icons)
+
+
+def _install_roots() -> set[str]:
+    """Dossiers d'installation connus (par défaut + ceux des applis installées).
+
+    Seules comptent les applis dans la disposition Aliux: le dossier d'une AppImage posée
+    ailleurs (ex: ~/Téléchargements, dont le parent est $HOME) n'est pas une racine.
+    """
+    roots = {DEFAULT_INSTALL_DIR}
+    for item in list_aliux_installs():
+        app_dir = app_layout_dir(item.get("appimage_path") or "")
+        if app_dir:
+            roots.add(os.path.dirname(app_dir))
+    return {r for r in roots if r and os.path.isdir(r)}
+
+
+def scan_leftovers(min_age: float = HOUSEKEEPING_MIN_AGE) -> list[dict]:
+    """Recherche (os.scandir) les restes à nettoyer.
+
+    Types (`kind`):
+    - "tmp-copy"    : .aliux-tmp-* laissé par une copie atomique interrompue;
+    - "partial-download" : .aliux-part-* (et son .json) d'un téléchargement abandonné;
+    - "extract-dir" : aliux-extract-* laissé par une extraction tuée (les dossiers encore
+                      utilisés, voir work_tempdir(), sont ignorés quel que soit leur âge);
+    - "orphan-icon" : icône d'ICON_DIR qu'aucun lanceur ne référence (et plus vieille que min_age:
+                      une installation en cours pose l'icône avant le lanceur);
+    - "orphan-app"  : dossier <slug>/<slug>.AppImage sans lanceur.
+
+    Retourne une liste de dict {kind, path, bytes}.
+    """
+    now = time.time()
+    uid = os.getuid()
+    out: list[dict] = []
+    referenced_apps, referenced_icons = _launcher_references()
+
+    def _old(st: os.stat_result) -> bool:
+        return now - st.st_mtime >= min_age
+
+    def _add(kind: str, path: str) -> None:
+        out.append({"kind": kind, "path": path, "bytes": tree_size(path)})
+
+    for root in sorted(_install_roots()):
+        try:
+            with os.scandir(root) as it:
+                app_dirs = [e for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError:
+            continue
+        for app_dir in app_dirs:
+            try:
+                with os.scandir(app_dir.path) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            tmp_bytes = 0
+            for e in entries:
+                if e.name.startswith(".aliux-tmp-") and e.is_file(follow_symlinks=False):
+                    try:
+                        if _old(e.stat(follow_symlinks=False)):
+                            _add("tmp-copy", e.path)
+                            tmp_bytes += out[-1]["bytes"]
+                    except OSError:
+                        continue
+                elif e.name.startswith(".aliux-part-") and e.is_file(follow_symlinks=False):
+                    try:
+                        if now - e.stat(follow_symlinks=False).st_mtime >= max(min_age, HOUSEKEEPING_PART_MAX_AGE):
+                            _add("partial-download", e.path)
+                            tmp_bytes += out[-1]["bytes"]
+                    except OSError:
+                        continue
+
+            # Disposition créée par Aliux: <racine>/<slug>/<slug>.AppImage
+            main = os.path.join(app_dir.path, f"{app_dir.name}.AppImage")
+            if app_dir.name != "Aliux" and os.path.isfile(main) and os.path.realpath(main) not in referenced_apps:
+                _add("orphan-app", app_dir.path)
+                out[-1]["bytes"] -= tmp_bytes  # déjà compté ci-dessus
+
+    for tmp_root in extraction_dir_candidates():
+        try:
+            with os.scandir(tmp_root) as it:
+                for e in it:
+                    if not e.name.startswith("aliux-extract-") or not e.is_dir(follow_symlinks=False):
+                        continue
+                    st = e.stat(follow_symlinks=False)
+                    if st.st_uid == uid and _old(st) and not work_dir_busy(e.path):
+                        _add("extract-dir", e.path)
+        except OSError:
+            continue
+
+    # Fichiers préparés par une transaction interrompue sans entrée de journal
+    for d in (ICON_DIR, DESKTOP_DIR):
+        try:
+            with os.scandir(d) as it:
+                for e in it:
+                    if e.name.startswith(".aliux-tmp-") and e.is_file(follow_symlinks=False):
+                        if _old(e.stat(follow_symlinks=False)):
+                            _add("tmp-copy", e.path)
+        except OSError:
+            continue
+
+    if os.path.isdir(ICON_DIR):
+        with os.scandir(ICON_DIR) as it:
+            for e in it:
+                if e.name in _SELF_ICON_NAMES or e.name.startswith(".aliux-tmp-") or not e.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    if os.path.realpath(e.path) not in referenced_icons and _old(e.stat(follow_symlinks=False)):
+                        _add("orphan-icon", e.path)
+                except OSError:
+                    continue
+
+    return out
+
+
+def clean_leftovers(items: list[dict], include_orphan_apps: bool = False) -> tuple[list[dict], list[str]]:
+    """Supprime les restes trouvés par scan_leftovers(); retourne (supprimés, erreurs).
+
+    Les dossiers d'applis orphelines ne sont supprimés que sur demande explicite. Une icône
+    orpheline n'est supprimée que sous le verrou de son appli (app_lock()), après avoir
+    vérifié à nouveau qu'aucun lanceur ne la référence (installation faite entre-temps).
+    """
+    removed: list[dict] = []
+    errors: list[str] = []
+    for item in items:
+        if item["kind"] == "orphan-app" and not include_orphan_apps:
+            continue
+        path = item["path"]
+        try:
+            if item["kind"] == "orphan-icon":
+                with app_lock(os.path.splitext(os.path.basename(path))[0]):
+                    if os.path.realpath(path) in _launcher_references()[1]:
+                        continue
+                    os.remove(path)
+            elif item["kind"] == "extract-dir" and work_dir_busy(path):
+                continue  # encore utilisé (vérifié juste avant la suppression)
+            elif os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            removed.append(item)
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            errors.append(f"{path} : {e}")
+    return (removed, errors)
+
+
+def run_housekeeping(
+    job: Job | None = None, dry_run: bool = False, include_orphan_apps: bool = False
+) -> dict | None:
+    """Passe de ménage complète, protégée par un verrou (une seule passe à la fois).
+
+    Retourne {found, removed, errors, reclaimable, reclaimed} ou None si une autre passe
+    est déjà en cours (autre instance d'Aliux).
+    """
+    try:
+        with file_lock(os.path.join(STATE_DIR, "housekeeping.lock"), blocking=False):
+            if job:
+                job.progress("Ménage : recherche des restes…")
+            found = scan_leftovers()
+            removed: list[dict] = []
+            errors: list[str] = []
+            if not dry_run:
+                removed, errors = clean_leftovers(found, include_orphan_apps=include_orphan_apps)
+    except BlockingIOError:
+        return None
+
+    return {
+        "found": found,
+        "removed": removed,
+        "errors": errors,
+        "reclaimable": sum(i["bytes"] for i in found),
+        "reclaimed": sum(i["bytes"] for i in removed),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Adoption des AppImage déjà présentes sur le disque
+# ---------------------------------------------------------------------------
+
+APPIMAGE_META_CACHE_PATH = os.path.join(CACHE_DIR, "appimage-meta.json")
+APPIMAGE_META_ICON_DIR = os.path.join(CACHE_DIR, "meta-icons")
+
+
+class AppImageMetadataCache:
+    """Métadonnées lues dans le squashfs (voir read_appimage_metadata()), par fichier.
+
+    Clé: (périphérique, inode, taille, mtime). L'icône est gardée à part dans
+    APPIMAGE_META_ICON_DIR; une AppImage inchangée n'est pas relue.
+    """
+
+    def __init__(self, path: str = APPIMAGE_META_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._entries: dict[str, dict] = data if isinstance(data, dict) else {}
+        except Exception:
+            self._entries = {}
+
+    @staticmethod
+    def _key(st: os.stat_result) -> list:
+        return [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns]
+
+    def metadata(self, path: str) -> dict:
+        """Métadonnées de l'AppImage (icon_path: copie de l'icône dans le cache, ou None)."""
+        st = os.stat(path)
+        key = self._key(st)
+        with self._lock:
+            entry = self._entries.get(path)
+            if (
+                entry and entry["key"] == key and "version" in entry["meta"]
+                and (not entry["meta"]["icon_path"] or os.path.isfile(entry["meta"]["icon_path"]))
+            ):
+                self.hits += 1
+                METRICS.cache("metadata", True)
+                return dict(entry["meta"])
+        METRICS.cache("metadata", False)
+        meta = read_appimage_metadata(path)
+        icon_path = None
+        if meta["icon_data"]:
+            ensure_dir(APPIMAGE_META_ICON_DIR)
+            digest = hashlib.sha1(json.dumps([path] + key).encode("utf-8")).hexdigest()
+            icon_path = os.path.join(APPIMAGE_META_ICON_DIR, digest + meta["icon_ext"])
+            with atomic_output(icon_path) as f:
+                f.write(meta["icon_data"])
+        meta = {k: v for k, v in meta.items() if k != "icon_data"}
+        meta["icon_path"] = icon_path
+        with self._lock:
+            self.misses += 1
+            self._entries[path] = {"key": key, "meta": meta}
+            self._dirty = True
+        return dict(meta)
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            self._entries = {p: e for p, e in self._entries.items() if os.path.exists(p)}
+            entries = dict(self._entries)
+            self._dirty = False
+        save_shared_index(self.path, entries, keep=os.path.exists)
+
+
+def adopt_dirs() -> list[str]:
+    """Dossiers parcourus par défaut: config « adopt_dirs », sinon ~/Applications et Téléchargements."""
+    dirs = load_config().get("adopt_dirs") or [DEFAULT_INSTALL_DIR, xdg_download_dir()]
+    return [os.path.expanduser(d) for d in dirs]
+
+
+def discover_appimages(dirs: list[str], recursive: bool = False) -> list[str]:
+    """AppImage (reconnues à leurs octets magiques) sans lanceur dans `dirs`."""
+    referenced, _icons = _launcher_references()
+    found: list[str] = []
+    seen: set[str] = set()
+    stack = list(dirs)
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for e in entries:
+            if e.name.startswith(".aliux-tmp-"):
+                continue
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    if recursive and not e.name.startswith("."):
+                        stack.append(e.path)
+                    continue
+                if not e.is_file(follow_symlinks=False):
+                    continue
+            except OSError:
+                continue
+            real = os.path.realpath(e.path)
+            if real in referenced or real in seen or not is_appimage_file(e.path):
+                continue
+            seen.add(real)
+            found.append(e.path)
+    return sorted(found)
+
+
+def _adopt_slug(name: str, taken: set[str]) -> str:
+    base = slugify(name)
+    slug, n = base, 2
+    while slug in taken or os.path.exists(os.path.join(DESKTOP_DIR, f"{slug}.desktop")):
+        slug, n = f"{base}-{n}", n + 1
+    taken.add(slug)
+    return slug
+
+
+def adopt_appimages(
+    job: Job,
+    dirs: list[str] | None = None,
+    recursive: bool = False,
+    move: bool = False,
+    install_dir: str = DEFAULT_INSTALL_DIR,
+    dry_run: bool = False,
+    workers: int | None = None,
+    log=None,
+) -> dict:
+    """Crée les lanceurs (et icônes) des AppImage sans lanceur trouvées dans `dirs`.
+
+    Les AppImage sont analysées en parallèle sans être exécutées (lecture du squashfs,
+    résultats en cache) puis tous les lanceurs sont écrits d'un bloc, avec un seul
+    rafraîchissement du cache des lanceurs. Les fichiers restent en place (lanceur marqué
+    X-Aliux-Adopted=true: la désinstallation ne les supprime pas), sauf move=True
+    (déplacés dans install_dir/<slug>/).
+    Retourne {adopted: [dict], errors: [str]}.
+    """
+    _log = log or LOG.info
+    job.progress("Recherche des AppImage…")
+    paths = discover_appimages(dirs or adopt_dirs(), recursive=recursive)
+    cache = AppImageMetadataCache()
+    analysed: list[tuple[str, dict]] = []
+    errors: list[str] = []
+
+    def _analyse(path: str) -> dict:
+        try:
+            return cache.metadata(path)
+        except SQUASHFS_READ_ERRORS as e:
+            _log(f"⚠️ {os.path.basename(path)} : métadonnées illisibles ({e}), nom tiré du fichier")
+            return {"name": None, "comment": "", "categories": "", "icon_path": None}
+
+    if paths:
+        with ThreadPoolExecutor(
+            max_workers=workers or min(8, os.cpu_count() or 2), thread_name_prefix="aliux-adopt"
+        ) as pool:
+            futures = {pool.submit(_analyse, p): p for p in paths}
+            for n, fut in enumerate(as_completed(futures), 1):
+                analysed.append((futures[fut], fut.result()))
+                job.progress(f"Analyse {n}/{len(paths)}", n / len(paths))
+        cache.save()
+    analysed.sort()
+
+    taken: set[str] = set()
+    plan = []
+    for path, meta in analysed:
+        name = meta["name"] or re.sub(r"\.(?i:appimage)$", "", os.path.basename(path)).strip()
+        slug = _adopt_slug(name, taken)
+        target = os.path.join(install_dir, slug, f"{slug}.AppImage") if move else path
+        plan.append({"path": path, "target": target, "name": name, "slug": slug, "meta": meta})
+    if dry_run:
+        return {"adopted": plan, "errors": errors}
+
+    # Un seul lot: une transaction, une synchronisation groupée pour tous les lanceurs et icônes
+    adopted = []
+    with app_locks([item["slug"] for item in plan], job), Transaction("adopt", f"{len(plan)} AppImage") as tx:
+        for n, item in enumerate(plan, 1):
+            job.progress(f"Lanceurs {n}/{len(plan)}", n / max(1, len(plan)))
+            point = tx.savepoint()
+            desktop_path = os.path.join(DESKTOP_DIR, f"{item['slug']}.desktop")
+            try:
+                if os.path.exists(desktop_path):
+                    # Installée par un autre processus depuis l'analyse
+                    raise FileExistsError(desktop_path)
+                if move:
+                    tx.mkdir(os.path.dirname(item["target"]))
+                    if os.path.lexists(item["target"]):
+                        raise FileExistsError(item["target"])
+                    if os.stat(item["path"]).st_dev == os.stat(os.path.dirname(item["target"])).st_dev:
+                        tx.rename(item["path"], item["target"])
+                    else:
+                        tx.copy(item["path"], item["target"], progress=transfer_progress(job, "Copie"))
+                        tx.remove(item["path"])
+                else:
+                    set_executable(item["target"])
+                icon_dst = None
+                if item["meta"]["icon_path"]:
+                    icon_dst = os.path.join(ICON_DIR, item["slug"] + os.path.splitext(item["meta"]["icon_path"])[1])
+                    with open(item["meta"]["icon_path"], "rb") as f:
+                        tx.write(icon_dst, f.read())
+                entry = build_desktop_entry(
+                    item["name"], item["meta"]["comment"], item["meta"]["categories"] or "Utility;",
+                    item["target"], icon_dst,
+                )
+                if not move:
+                    # Fichier de l'utilisateur: la désinstallation ne le supprimera pas
+                    entry = desktop_text_with_key(entry, "X-Aliux-Adopted", "true")
+                tx.write(desktop_path, entry.encode("utf-8"))
+                adopted.append(item)
+            except JobCancelled:
+                raise
+            except Exception as e:
+                tx.rollback_to(point)
+                errors.append(f"{item['path']} : {e}")
+        errors.extend(tx.commit()[1])
+    for item in adopted:
+        _log(f"✅ {item['name']} : {item['target']}")
+    if adopted:
+        refresh_desktop_database()
+    LOG.info("Adoption : cache des métadonnées %d réussite(s), %d lecture(s)", cache.hits, cache.misses)
+    return {"adopted": adopted, "errors": errors}
+
+
+# ---------------------------------------------------------------------------
+# Dépôt local d'AppImage (dossier partagé): index incrémental et mises à jour
+# ---------------------------------------------------------------------------
+
+# Version dans un nom de fichier: « Krita-5.2.1-x86_64.AppImage », « app_v1.4.0-rc2.AppImage »
+_FILENAME_VERSION_RE = re.compile(
+    r"(?:^|[-_ ])v?(\d+(?:\.\d+)+(?:[-.~+]?(?:alpha|beta|rc|pre|dev)\.?\d*)?)(?=[-_. ]|$)", re.IGNORECASE
+)
+_FILENAME_ARCH_RE = re.compile(r"[-_.](?:x86[-_]64|amd64|aarch64|arm64|armhf|i[36]86)\b.*$", re.IGNORECASE)
+
+
+def version_from_filename(filename: str) -> str:
+    """Version lue dans le nom d'une AppImage ("" si aucune)."""
+    m = _FILENAME_VERSION_RE.search(re.sub(r"\.(?i:appimage)$", "", filename))
+    return m.group(1) if m else ""
+
+
+def name_from_filename(filename: str) -> str:
+    """Nom d'appli tiré du nom de fichier (sans extension, version ni architecture)."""
+    stem = re.sub(r"\.(?i:appimage)$", "", filename)
+    stem = _FILENAME_ARCH_RE.sub("", stem)
+    m = _FILENAME_VERSION_RE.search(stem)
+    if m:
+        stem = stem[: m.start()]
+    return stem.strip(" -_") or filename
+
+
+def version_key(version: str) -> tuple:
+    """Clé de comparaison de versions: « 1.10 » > « 1.9 », « 1.2 » > « 1.2-rc1 » < « 1.2.1 »."""
+    parts = [(1, int(p)) if p.isdigit() else (0, p) for p in re.findall(r"\d+|[a-z]+", version.lower())]
+    return tuple(parts) + ((0.5, ""),)
+
+
+def repo_dir() -> str | None:
+    d = load_config().get("repo_dir")
+    return os.path.expanduser(d) if d else None
+
+
+class RepoIndex:
+    """Index d'un dossier d'AppImage: nom, version, taille et SHA-256 de chaque fichier.
+
+    refresh() compare le résultat de stat() (inode, taille, mtime) à l'index enregistré
+    (CACHE_DIR/repo-<empreinte du chemin>.json): seuls les fichiers nouveaux ou modifiés
+    sont lus (octets magiques, .desktop embarqué, empreinte), en parallèle.
+    """
+
+    def __init__(self, root: str, path: str | None = None):
+        self.root = os.path.realpath(os.path.expanduser(root))
+        digest = hashlib.sha1(self.root.encode("utf-8")).hexdigest()[:12]
+        self.path = path or os.path.join(CACHE_DIR, f"repo-{digest}.json")
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.entries: dict[str, dict] = data["entries"] if data.get("root") == self.root else {}
+        except Exception:
+            self.entries = {}
+
+    @staticmethod
+    def _key(st: os.stat_result) -> list:
+        # Pas de st_dev: le numéro de périphérique d'un partage change d'un montage à l'autre
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+    def _scan(self) -> dict[str, os.stat_result]:
+        found: dict[str, os.stat_result] = {}
+        stack = [self.root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for e in entries:
+                if e.name.startswith("."):
+                    continue
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        stack.append(e.path)
+                    elif e.is_file():
+                        found[os.path.relpath(e.path, self.root)] = e.stat()
+                except OSError:
+                    continue
+        return found
+
+    def _analyse(self, rel: str, st: os.stat_result, job: Job) -> dict:
+        path = os.path.join(self.root, rel)
+        entry = {"key": self._key(st), "appimage": is_appimage_file(path)}
+        if not entry["appimage"]:
+            return entry
+        try:
+            meta = read_appimage_metadata(path)
+        except SQUASHFS_READ_ERRORS as e:
+            LOG.info("Dépôt : %s : métadonnées illisibles (%s)", rel, e)
+            meta = {"name": None, "version": ""}
+        filename = os.path.basename(rel)
+        entry.update(
+            {
+                "name": meta["name"] or name_from_filename(filename),
+                "version": meta["version"] or version_from_filename(filename),
+                "size": st.st_size,
+                "mtime": st.st_mtime,
+                "sha256": sha256_file(path, job=job),
+            }
+        )
+        return entry
+
+    def refresh(self, job: Job, workers: int | None = None) -> dict:
+        """Met l'index à jour; retourne {added, changed, removed, unchanged} (chemins relatifs)."""
+        job.progress("Dépôt : parcours…")
+        current = self._scan()
+        stats = {"added": [], "changed": [], "removed": [], "unchanged": 0}
+        todo = []
+        for rel, st in current.items():
+            old = self.entries.get(rel)
+            if old is None:
+                stats["added"].append(rel)
+                todo.append((rel, st))
+            elif old["key"] != self._key(st):
+                stats["changed"].append(rel)
+                todo.append((rel, st))
+            else:
+                stats["unchanged"] += 1
+        for rel in [r for r in self.entries if r not in current]:
+            stats["removed"].append(rel)
+            del self.entries[rel]
+
+        if todo:
+            with ThreadPoolExecutor(
+                max_workers=workers or min(8, os.cpu_count() or 2), thread_name_prefix="aliux-repo"
+            ) as pool:
+                futures = {pool.submit(self._analyse, rel, st, job): rel for rel, st in todo}
+                for n, fut in enumerate(as_completed(futures), 1):
+                    rel = futures[fut]
+                    try:
+                        self.entries[rel] = fut.result()
+                    except JobCancelled:
+                        for f in futures:
+                            f.cancel()
+                        raise
+                    except OSError as e:
+                        LOG.warning("Dépôt : %s : %s", rel, e)
+                    job.progress(f"Dépôt : analyse {n}/{len(todo)}", n / len(todo))
+        if todo or stats["removed"]:
+            self.save()
+        return stats
+
+    def save(self) -> None:
+        with index_lock(os.path.basename(self.path)), atomic_output(self.path) as f:
+            f.write(json.dumps({"root": self.root, "entries": self.entries}).encode("utf-8"))
+
+    def apps(self) -> list[dict]:
+        """AppImage du dépôt: {name, version, size, sha256, mtime, path}, triées par nom puis version."""
+        out = [
+            {**{k: e[k] for k in ("name", "version", "size", "sha256", "mtime")}, "path": os.path.join(self.root, rel)}
+            for rel, e in self.entries.items()
+            if e.get("appimage")
+        ]
+        out.sort(key=lambda a: (a["name"].casefold(), version_key(a["version"])))
+        return out
+
+    def latest(self) -> dict[str, dict]:
+        """Version la plus récente de chaque appli, par slug du nom."""
+        best: dict[str, dict] = {}
+        for app in self.apps():
+            slug = slugify(app["name"])
+            cur = best.get(slug)
+            if cur is None or (version_key(app["version"]), app["mtime"]) > (version_key(cur["version"]), cur["mtime"]):
+                best[slug] = app
+        return best
+
+
+def installed_version(item: dict, cache: AppImageMetadataCache | None = None) -> str:
+    """Version d'une appli installée: X-Aliux-Version du lanceur, sinon .desktop embarqué."""
+    if item.get("version"):
+        return item["version"]
+    ap = item.get("appimage_path")
+    if not ap or not os.path.isfile(ap):
+        return ""
+    try:
+        return (cache or AppImageMetadataCache()).metadata(ap).get("version") or ""
+    except SQUASHFS_READ_ERRORS:
+        return ""
+
+
+def repo_updates(index: RepoIndex, installs: list[dict] | None = None) -> list[dict]:
+    """Applis installées dont le dépôt propose une version plus récente.
+
+    Rapprochement par nom (slug); la version installée est retrouvée par empreinte (celle de
+    l'original pour une appli recompressée) quand le fichier installé est dans le dépôt, sinon
+    lue dans le lanceur ou l'AppImage. Sans version connue d'un côté, une empreinte différente suffit.
+    Retourne [{item, installed, available: dict (entrée du dépôt)}].
+    """
+    latest = index.latest()
+    by_digest = {a["sha256"]: a for a in index.apps()}
+    cache = AppImageMetadataCache()
+    out = []
+    for item in installs if installs is not None else list_aliux_installs():
+        avail = latest.get(slugify(item["name"]))
+        digest = item.get("original_sha256") or item.get("sha256")
+        if not avail or (digest and digest == avail["sha256"]):
+            continue
+        known = by_digest.get(digest or "")
+        current = known["version"] if known else installed_version(item, cache)
+        if current and avail["version"] and version_key(avail["version"]) <= version_key(current):
+            continue
+        out.append({"item": item, "installed": current, "available": avail})
+    cache.save()
+    return out
+
+
+def check_repo_updates(job: Job, installs: list[dict] | None = None) -> list[dict]:
+    """Actualise l'index du dépôt configuré (« repo_dir ») et retourne repo_updates(); [] sans dépôt."""
+    root = repo_dir()
+    if not root or not os.path.isdir(root):
+        return []
+    index = RepoIndex(root)
+    index.refresh(job)
+    return repo_updates(index, installs)
+
+
+@METRICS.track("update")
+def update_from_repo(job: Job, item: dict, entry: dict, log=None) -> dict:
+    """Remplace l'AppImage installée par celle du dépôt (même emplacement, même lanceur).
+
+    AppImage et lanceur (X-Aliux-SHA256, X-Aliux-Version) sont mis en place ensemble
+    (Transaction); la signature est vérifiée comme à l'installation.
+    Retourne {status: "updated", version, sha256}.
+    """
+    _log = log or LOG.info
+    ap = item.get("appimage_path")
+    if not ap or not os.path.isfile(ap):
+        raise UpdateError("AppImage introuvable.")
+    digest = hashlib.sha256()
+    check = SignatureCheck(entry["path"])
+
+    def _sink(chunk):
+        digest.update(chunk)
+        check.update(chunk)
+
+    with app_lock(item_slug(item), job), Transaction("update", item["name"]) as tx:
+        tx.copy(entry["path"], ap, progress=transfer_progress(job, "Copie"), sink=_sink)
+        sha256 = digest.hexdigest()
+        if sha256 != entry["sha256"]:
+            raise UpdateError("Le fichier du dépôt a changé pendant la copie : actualisez l’index.")
+        check.finish(job, _log)
+        dp = item.get("desktop_path")
+        if dp and os.path.isfile(dp):
+            with open(dp, "r", encoding="utf-8") as f:
+                text = desktop_text_with_key(f.read(), "X-Aliux-SHA256", sha256)
+            if entry["version"]:
+                text = desktop_text_with_key(text, "X-Aliux-Version", entry["version"])
+            for key in ORIGINAL_DIGEST_KEYS:
+                text = desktop_text_with_key(text, key, None)
+            tx.write(dp, text.encode("utf-8"), mode=stat.S_IMODE(os.stat(dp).st_mode))
+        tx.commit()
+    cache = DigestCache()
+    cache.put(ap, sha256, os.stat(ap))
+    cache.save()
+    return {
+        "status": "updated", "version": entry["version"], "sha256": sha256,
+        "recompressed": _recompress_after_update(job, item, sha256, log=log),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Mode veille: installation automatique des AppImage arrivant dans des dossiers
+# ---------------------------------------------------------------------------
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+
+WATCH_SEEN_PATH = os.path.join(STATE_DIR, "watch-seen.json")
+
+
+def is_appimage_file(path: str) -> bool:
+    """Reconnaît une AppImage à ses octets magiques (ELF + 'AI' type 1 ou 2)."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(11)
+    except OSError:
+        return False
+    return len(head) == 11 and head[:4] == b"\x7fELF" and head[8:10] == b"AI" and head[10] in (1, 2)
+
+
+class InotifyWatcher:
+    """Surveillance inotify (via ctypes, sans dépendance).
+
+    Seuls IN_CLOSE_WRITE (fin d'écriture) et IN_MOVED_TO (fichier renommé dans le dossier,
+    cas des navigateurs qui téléchargent en .part) sont suivis. wait() bloque dans select():
+    aucune consommation CPU au repos.
+    """
+
+    def __init__(self, dirs: list[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._fd = fd
+        self._dirs: dict[int, str] = {}
+        try:
+            for d in dirs:
+                wd = libc.inotify_add_watch(fd, os.fsencode(d), IN_CLOSE_WRITE | IN_MOVED_TO)
+                if wd < 0:
+                    err = ctypes.get_errno()
+                    raise OSError(err, f"inotify_add_watch : {os.strerror(err)}", d)
+                self._dirs[wd] = d
+        except Exception:
+            os.close(fd)
+            raise
+
+    def wait(self, timeout: float | None) -> list[str]:
+        """Chemins modifiés (liste vide si le délai expire)."""
+        ready, _w, _x = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        out: list[str] = []
+        off = 0
+        while off + 16 <= len(data):
+            wd, mask, _cookie, length = struct.unpack_from("iIII", data, off)
+            name = data[off + 16 : off + 16 + length].rstrip(b"\0")
+            off += 16 + length
+            if mask & IN_Q_OVERFLOW:
+                # Évènements perdus: rescanner tous les dossiers
+                out.extend(_list_appimage_names(list(self._dirs.values())))
+                continue
+            d = self._dirs.get(wd)
+            if d and name:
+                out.append(os.path.join(d, os.fsdecode(name)))
+        return out
+
+    def close(self) -> None:
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+def _list_appimage_names(dirs: list[str]) -> list[str]:
+    out = []
+    for d in dirs:
+        try:
+            with os.scandir(d) as it:
+                out.extend(e.path for e in it if e.name.lower().endswith(".appimage"))
+        except OSError:
+            continue
+    return out
+
+
+class PollingWatcher:
+    """Repli sans inotify: scrutation périodique (os.scandir) et comparaison (taille, mtime)."""
+
+    def __init__(self, dirs: list[str], interval: float):
+        self.dirs = dirs
+        self.interval = interval
+        self._stop = threading.Event()
+        self._snap = self._snapshot()
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        snap = {}
+        for p in _list_appimage_names(self.dirs):
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            snap[p] = (st.st_size, st.st_mtime_ns)
+        return snap
+
+    def wait(self, timeout: float | None) -> list[str]:
+        delay = self.interval if timeout is None else min(timeout, self.interval)
+        if self._stop.wait(delay):
+            return []
+        new = self._snapshot()
+        changed = [p for p, sig in new.items() if self._snap.get(p) != sig]
+        self._snap = new
+        return changed
+
+    def close(self) -> None:
+        self._stop.set()
+
+
+class FolderWatcher:
+    """Attend qu'une AppImage ait fini d'arriver puis la confie à `on_ready(chemin)`.
+
+    Anti-rebond: après un évènement, le fichier doit garder la même taille et la même
+    date de modification pendant `settle` secondes. Les fichiers déjà traités (même taille,
+    même mtime) sont mémorisés dans WATCH_SEEN_PATH et ignorés ensuite. Avec `existing`, les
+    AppImage déjà présentes au démarrage sont traitées comme si elles venaient d'arriver.
+    """
+
+    def __init__(
+        self, dirs: list[str], on_ready, settle: float = 3.0, poll: bool = False, poll_interval: float = 5.0,
+        existing: bool = False,
+    ):
+        self.dirs = [d for d in dirs if os.path.isdir(d)]
+        self.on_ready = on_ready
+        self.settle = settle
+        self.existing = existing
+        self._stop = threading.Event()
+        self._seen = self._load_seen()
+        self.mode = "scrutation"
+        self.watcher = None
+        if not poll:
+            try:
+                self.watcher = InotifyWatcher(self.dirs)
+                self.mode = "inotify"
+            except (OSError, AttributeError) as e:
+                LOG.warning("inotify indisponible (%s) : passage en scrutation.", e)
+        if self.watcher is None:
+            self.watcher = PollingWatcher(self.dirs, poll_interval)
+
+    def _load_seen(self) -> dict[str, list[int]]:
+        try:
+            with open(WATCH_SEEN_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _save_seen(self) -> None:
+        save_shared_index(WATCH_SEEN_PATH, self._seen)
+
+    def mark_existing_seen(self) -> None:
+        """Ignore les AppImage déjà présentes au démarrage."""
+        for p in _list_appimage_names(self.dirs):
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            self._seen[p] = [st.st_size, st.st_mtime_ns]
+        self._save_seen()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.watcher.close()
+
+    def run(self) -> None:
+        pending: dict[str, tuple[int, int, float]] = {}  # chemin -> (taille, mtime, échéance)
+        if self.existing:
+            # Ni inotify ni la scrutation ne signalent les fichiers déjà là
+            for path in _list_appimage_names(self.dirs):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                pending[path] = (st.st_size, st.st_mtime_ns, time.monotonic() + self.settle)
+        while not self._stop.is_set():
+            now = time.monotonic()
+            timeout = max(0.0, min(due for _s, _m, due in pending.values()) - now) if pending else None
+            for path in self.watcher.wait(timeout):
+                if not path.lower().endswith(".appimage"):
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    pending.pop(path, None)
+                    continue
+                pending[path] = (st.st_size, st.st_mtime_ns, time.monotonic() + self.settle)
+
+            now = time.monotonic()
+            for path, (size, mtime, due) in list(pending.items()):
+                if due > now:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    del pending[path]
+                    continue
+                if (st.st_size, st.st_mtime_ns) != (size, mtime):
+                    # Le fichier grossit encore: on attend un nouveau délai
+                    pending[path] = (st.st_size, st.st_mtime_ns, now + self.settle)
+                    continue
+                del pending[path]
+                if self._seen.get(path) == [size, mtime] or not is_appimage_file(path):
+                    continue
+                self._seen[path] = [size, mtime]
+                self._save_seen()
+                self.on_ready(path)
+
+
+def watch_install(job: Job, path: str, install_dir: str = DEFAULT_INSTALL_DIR, log=None) -> dict:
+    """Installe une AppImage détectée par le mode veille (nom issu de ses métadonnées).
+
+    Le nom est lu dans le squashfs (quelques blocs de métadonnées, voir on_choose_file());
+    l'extraction n'est qu'un repli pour les squashfs illisibles.
+    """
+    base_noext = re.sub(r"\.(?i:appimage)$", "", os.path.basename(path)).strip()
+    name = base_noext
+    job.progress("Analyse AppImage…")
+    cache = AppImageMetadataCache()
+    try:
+        name = cache.metadata(path)["name"] or base_noext
+        cache.save()
+    except SQUASHFS_READ_ERRORS:
+        tmp_root = choose_extract_dir(path)
+        if tmp_root:
+            suggested_name, _icon, _hint = try_extract_appimage_metadata(path, tmp_root=tmp_root, job=job)
+            name = suggested_name or base_noext
+    return install_appimage(job, path, name, install_dir=install_dir, log=log)
+
+
+# ---------------------------------------------------------------------------
+# Mesure du temps de lancement des applis installées
+# ---------------------------------------------------------------------------
+
+BENCH_HISTORY_PATH = os.path.join(STATE_DIR, "bench-history.jsonl")
+BENCH_POLL_SECONDS = 0.01
+# « Prêt » sans fenêtre détectable: moins de BENCH_SETTLE_CPU secondes CPU consommées
+# par le groupe de processus pendant BENCH_SETTLE_SECONDS.
+BENCH_SETTLE_SECONDS = 0.5
+BENCH_SETTLE_CPU = 0.02
+
+
+def _fuse_mountpoints() -> set[str]:
+    """Points de montage des AppImage de type 2 (/tmp/.mount_*) actuellement montés."""
+    points = set()
+    try:
+        with open("/proc/self/mountinfo", "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) > 4 and "/.mount_" in fields[4]:
+                    points.add(fields[4])
+    except OSError:
+        pass
+    return points
+
+
+def _group_processes(pgid: int) -> dict[int, float]:
+    """Processus du groupe pgid -> temps CPU consommé (secondes)."""
+    tick = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    out: dict[int, float] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                data = f.read().decode("ascii", "replace")
+        except OSError:
+            continue
+        # Le nom (2e champ) peut contenir des espaces: on repart de la dernière parenthèse.
+        fields = data[data.rfind(")") + 2:].split()
+        try:
+            if int(fields[2]) == pgid:
+                out[int(entry)] = (int(fields[11]) + int(fields[12])) / tick
+        except (IndexError, ValueError):
+            continue
+    return out
+
+
+def _window_pids() -> set[int] | None:
+    """PID des fenêtres X visibles (wmctrl -lp), None si l'outil ou l'affichage manque."""
+    if not os.environ.get("DISPLAY") or not shutil.which("wmctrl"):
+        return None
+    try:
+        out = subprocess.run(
+            ["wmctrl", "-lp"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=2
+        ).stdout
+    except Exception:
+        return None
+    pids = set()
+    for line in out.splitlines():
+        parts = line.split(None, 3)
+        if len(parts) >= 3 and parts[2].isdigit():
+            pids.add(int(parts[2]))
+    return pids
+
+
+def _drop_file_cache(path: str) -> None:
+    """Retire le fichier du cache de pages (pages propres) pour un lancement « à froid »."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fdatasync(fd)
+        _fadvise(fd, 0, 0, "POSIX_FADV_DONTNEED")
+    finally:
+        os.close(fd)
+
+
+def bench_launch_once(appimage_path: str, cold: bool, timeout: float = 30.0, job: Job | None = None) -> dict:
+    """Lance l'AppImage une fois et mesure:
+
+    - mount : délai jusqu'à l'apparition du montage FUSE /tmp/.mount_* (None si absent,
+      ex. AppImage extraite ou APPIMAGE_EXTRACT_AND_RUN);
+    - ready : délai jusqu'à la première fenêtre d'un processus du groupe (wmctrl), ou à
+      défaut jusqu'à ce que le groupe cesse de consommer du CPU (méthode « cpu »);
+      la fin du processus compte aussi comme « prêt » (méthode « exit »).
+
+    Le groupe de processus est ensuite terminé et le démontage attendu.
+    """
+    if cold:
+        _drop_file_cache(appimage_path)
+    before = _fuse_mountpoints()
+    use_windows = _window_pids() is not None
+    t0 = time.monotonic()
+    proc = subprocess.Popen(
+        [appimage_path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    mount_s = ready_s = None
+    method = "timeout"
+    settle_start = settle_cpu = None
+    try:
+        while time.monotonic() - t0 < timeout:
+            if job:
+                job.check()
+            now = time.monotonic()
+            if mount_s is None and _fuse_mountpoints() - before:
+                mount_s = now - t0
+            if proc.poll() is not None:
+                ready_s, method = now - t0, "exit"
+                break
+            group = _group_processes(proc.pid)
+            if use_windows:
+                if (_window_pids() or set()) & set(group):
+                    ready_s, method = now - t0, "window"
+                    break
+            else:
+                cpu = sum(group.values())
+                if settle_start is None or cpu - settle_cpu > BENCH_SETTLE_CPU:
+                    settle_start, settle_cpu = now, cpu
+                elif now - settle_start >= BENCH_SETTLE_SECONDS:
+                    ready_s, method = settle_start - t0, "cpu"
+                    break
+            time.sleep(BENCH_POLL_SECONDS if mount_s is None else 0.05)
+    finally:
+        _kill_process_group(proc)
+        deadline = time.monotonic() + 5.0
+        while _fuse_mountpoints() - before and time.monotonic() < deadline:
+            time.sleep(0.05)
+    return {"cold": cold, "mount": mount_s, "ready": ready_s, "method": method}
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Percentile q (0..100) par interpolation linéaire."""
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * q / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def bench_stats(values: list[float]) -> dict | None:
+    if not values:
+        return None
+    return {
+        "n": len(values),
+        "min": min(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "max": max(values),
+    }
+
+
+class BackgroundLoad:
+    """Charge synthétique (écriture + relecture + SHA-256 de fichiers temporaires) pour
+    mesurer l'effet des tâches de fond sur le lancement des applis.
+
+    load="normal": priorité normale; load="background": priorité des tâches de fond
+    (voir background_priority()).
+    """
+
+    CHUNK = 32 * 1024 * 1024
+
+    def __init__(self, load: str, workers: int | None = None):
+        self.priority = background_priority() if load == "background" else None
+        self.workers = workers or os.cpu_count() or 2
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def _run(self) -> None:
+        apply_thread_priority(self.priority)
+        block = os.urandom(1024 * 1024) * (self.CHUNK // (1024 * 1024))
+        fd, path = tempfile.mkstemp(prefix="aliux-load-", dir=CACHE_DIR)
+        try:
+            while not self._stop.is_set():
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.write(fd, block)
+                os.fsync(fd)
+                _fadvise(fd, 0, 0, "POSIX_FADV_DONTNEED")
+                data = os.pread(fd, self.CHUNK, 0)
+                for _ in range(4):
+                    hashlib.sha256(data).digest()
+        finally:
+            os.close(fd)
+            os.remove(path)
+
+    def __enter__(self):
+        ensure_dir(CACHE_DIR)
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"aliux-load-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        time.sleep(0.5)  # laisser la charge s'installer
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+
+
+def bench_app(
+    job: Job, item: dict, cold_runs: int = 3, warm_runs: int = 5, timeout: float = 30.0, load: str | None = None
+) -> dict:
+    """Mesure le lancement d'une appli: cold_runs à froid puis warm_runs à chaud.
+
+    `load` ("normal" ou "background"): mesure sous une charge synthétique (BackgroundLoad)
+    pour comparer l'effet des priorités des tâches de fond.
+    Le résultat (statistiques par phase, compression du squashfs…) est ajouté à
+    BENCH_HISTORY_PATH pour comparer les mesures dans le temps.
+    """
+    ap = item["appimage_path"]
+    if not ap or not os.path.isfile(ap):
+        raise FileNotFoundError(ap or item["name"])
+    runs = []
+    plan = [True] * cold_runs + [False] * warm_runs
+    with BackgroundLoad(load) if load else contextlib.nullcontext():
+        for n, cold in enumerate(plan, 1):
+            job.progress(
+                f"{item['name']} : lancement {n}/{len(plan)} ({'froid' if cold else 'chaud'})", (n - 1) / len(plan)
+            )
+            runs.append(bench_launch_once(ap, cold, timeout=timeout, job=job))
+
+    sb = read_squashfs_superblock(ap)
+    result = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "name": item["name"],
+        "appimage_path": ap,
+        "size": os.path.getsize(ap),
+        "compression": sb["compression"] if sb else None,
+        "load": load,
+        "runs": runs,
+    }
+    for phase, cold in (("cold", True), ("warm", False)):
+        sel = [r for r in runs if r["cold"] == cold]
+        result[phase] = {
+            "mount": bench_stats([r["mount"] for r in sel if r["mount"] is not None]),
+            "ready": bench_stats([r["ready"] for r in sel if r["ready"] is not None]),
+            "methods": sorted({r["method"] for r in sel}),
+        }
+    ensure_dir(os.path.dirname(BENCH_HISTORY_PATH))
+    with open(BENCH_HISTORY_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return result
+
+
+def load_bench_history(names: list[str] | None = None) -> list[dict]:
+    out = []
+    wanted = {n.casefold() for n in names or []}
+    try:
+        with open(BENCH_HISTORY_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if not wanted or rec.get("name", "").casefold() in wanted:
+                    out.append(rec)
+    except OSError:
+        pass
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Recompression des AppImage (zstd / lz4)
+# ---------------------------------------------------------------------------
+
+# Options mksquashfs par format: décompression rapide à chaque lancement
+RECOMPRESS_CODECS = {
+    "zstd": ["-comp", "zstd", "-Xcompression-level", "19"],
+    "lz4": ["-comp", "lz4", "-Xhc"],
+}
+# Durée maximale de chaque étape (unsquashfs, mksquashfs)
+RECOMPRESS_TIMEOUT = 3600.0
+
+
+class RecompressError(RuntimeError):
+    """Recompression impossible (outils absents, AppImage de type 1, échec de mksquashfs…)."""
+
+
+def recompress_available() -> bool:
+    return bool(shutil.which("unsquashfs") and shutil.which("mksquashfs"))
+
+
+def _run_squashfs_tool(job: Job, args: list[str], cwd: str | None = None, name: str | None = None) -> None:
+    """Lance unsquashfs/mksquashfs (ou le runtime de l'AppImage) dans son propre groupe
+    (annulable); lève RecompressError.
+    """
+    with tempfile.TemporaryFile() as err:
+        proc = subprocess.Popen(
+            args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=err, start_new_session=True, cwd=cwd
+        )
+        t0 = time.monotonic()
+        try:
+            while proc.poll() is None:
+                job.check()
+                if time.monotonic() - t0 > RECOMPRESS_TIMEOUT:
+                    raise RecompressError(f"{name or args[0]} : délai dépassé")
+                time.sleep(0.2)
+        except BaseException:
+            _kill_process_group(proc)
+            raise
+        if proc.returncode != 0:
+            err.seek(0)
+            lines = err.read().decode("utf-8", "replace").strip().splitlines()
+            raise RecompressError(f"{name or args[0]} a échoué : {lines[-1] if lines else f'code {proc.returncode}'}")
+
+
+def _hash_original(job: Job, path: str) -> tuple[str, str]:
+    """(SHA-256, SHA-1) de l'AppImage, en une lecture (SHA-1: contrôle des fichiers .zsync)."""
+    sha256, sha1 = hashlib.sha256(), hashlib.sha1()
+    meter = transfer_progress(job, "Empreinte")
+    total = os.path.getsize(path) or 1
+    done = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+            sha1.update(chunk)
+            done += len(chunk)
+            meter(done, total)
+    return sha256.hexdigest(), sha1.hexdigest()
+
+
+def _check_runtime_reads(job: Job, path: str, codec: str, workdir: str, has_diricon: bool = True) -> None:
+    """Extrait .DirIcon de `path` avec son propre runtime: les anciens runtimes de type 2 ne
+    lisent ni zstd ni lz4. Lève RecompressError si le fichier recompressé serait inutilisable.
+    """
+    job.progress("Contrôle avec le runtime de l’AppImage…")
+    check_dir = tempfile.mkdtemp(prefix="runtime-check-", dir=workdir)
+    try:
+        _run_squashfs_tool(job, [path, "--appimage-extract", ".DirIcon"], cwd=check_dir, name="runtime")
+    except RecompressError as e:
+        raise RecompressError(f"le runtime de cette AppImage ne lit pas le format {codec} ({e})") from e
+    if has_diricon and not os.path.lexists(os.path.join(check_dir, "squashfs-root", ".DirIcon")):
+        raise RecompressError(f"le runtime de cette AppImage ne lit pas le format {codec}.")
+
+
+@METRICS.track("recompress")
+def recompress_appimage(
+    job: Job, item: dict, codec: str = "zstd", bench: bool = False, cold_runs: int = 3, warm_runs: int = 5,
+    log=None,
+) -> dict:
+    """Recompresse le squashfs d'une appli installée (unsquashfs puis mksquashfs) en `codec`.
+
+    Le runtime d'origine (en-tête ELF, sections de mise à jour) est conservé tel quel; avant
+    la mise en place, il doit savoir relire le fichier recompressé (_check_runtime_reads()). Les
+    empreintes de l'original sont enregistrées dans le lanceur (X-Aliux-OriginalSHA256/SHA1)
+    pour les mises à jour (dépôt, zsync); X-Aliux-SHA256 devient celle du fichier recompressé,
+    que « aliux verify » contrôle. La signature embarquée éventuelle ne couvre plus le fichier:
+    X-Aliux-Signature garde le résultat de la vérification faite à l'installation.
+
+    bench=True: temps de lancement mesuré avant et après (bench_app(), historique conservé).
+    Retourne {status: "recompressed" | "unchanged", codec, compression, size_before, size_after,
+    sha256, original_sha256, bench_before, bench_after}.
+    """
+    _log = log or LOG.info
+    if codec not in RECOMPRESS_CODECS:
+        raise RecompressError(f"format non pris en charge : {codec}")
+    if not recompress_available():
+        raise RecompressError("unsquashfs et mksquashfs sont requis (paquet squashfs-tools).")
+    ap = item.get("appimage_path")
+    if not ap or not os.path.isfile(ap):
+        raise RecompressError("AppImage introuvable.")
+    offset = appimage_payload_offset(ap)
+    sb = read_squashfs_superblock(ap, offset) if offset is not None else None
+    if not sb:
+        raise RecompressError("AppImage de type 2 (squashfs) attendue.")
+    result = {
+        "status": "unchanged", "codec": codec, "compression": sb["compression"],
+        "size_before": os.path.getsize(ap), "size_after": os.path.getsize(ap),
+        "sha256": item.get("sha256"), "original_sha256": item.get("original_sha256") or item.get("sha256"),
+        "bench_before": None, "bench_after": None,
+    }
+    if sb["compression"] == codec:
+        return result
+
+    st0 = os.stat(ap)
+    if item.get("original_sha256"):
+        original = (item["original_sha256"], item.get("original_sha1"))
+    else:
+        original = _hash_original(job, ap)
+        if item.get("sha256") and original[0] != item["sha256"]:
+            raise RecompressError("AppImage modifiée depuis l'installation (voir « aliux verify »).")
+    result["original_sha256"] = original[0]
+
+    if bench:
+        result["bench_before"] = bench_app(job, item, cold_runs=cold_runs, warm_runs=warm_runs)
+
+    workdir = choose_extract_dir(ap)
+    if not workdir:
+        raise InsufficientSpaceError("Espace temporaire insuffisant pour recompresser l’AppImage.")
+    ensure_dir(workdir)
+    with app_lock(item_slug(item), job), work_tempdir(workdir) as td:
+        st = os.stat(ap)
+        if (st.st_ino, st.st_size, st.st_mtime_ns) != (st0.st_ino, st0.st_size, st0.st_mtime_ns):
+            raise RecompressError("AppImage remplacée entre-temps (mise à jour en cours ?) : recommencez.")
+        root = os.path.join(td, "squashfs-root")
+        payload = os.path.join(td, "payload.squashfs")
+        job.progress(f"Décompression ({sb['compression']})…")
+        _run_squashfs_tool(job, ["unsquashfs", "-no-progress", "-offset", str(offset), "-d", root, ap])
+        job.progress(f"Compression ({codec})…")
+        _run_squashfs_tool(
+            job,
+            ["mksquashfs", root, payload, "-noappend", "-no-progress", "-all-root", "-b", str(sb["block_size"])]
+            + RECOMPRESS_CODECS[codec],
+        )
+        new_sb = read_squashfs_superblock(payload, 0)
+        if not new_sb or new_sb["compression"] != codec:
+            raise RecompressError("mksquashfs n'a pas produit le squashfs attendu.")
+
+        with open(ap, "rb") as f:
+            runtime = f.read(offset)
+        digest = hashlib.sha256(runtime)
+        with Transaction("recompress", item["name"]) as tx:
+            tmp = tx.stem(os.path.dirname(ap), os.path.basename(ap))
+            with open(tmp, "wb") as out:
+                out.write(runtime)
+                out.flush()
+                copy_file_chunked(payload, out.fileno(), progress=transfer_progress(job, "Écriture"),
+                                  sink=digest.update)
+            os.chmod(tmp, stat.S_IMODE(os.stat(ap).st_mode))
+            _check_runtime_reads(job, tmp, codec, td, has_diricon=os.path.lexists(os.path.join(root, ".DirIcon")))
+            tx.stage(tmp, ap, synced=True)
+            sha256 = digest.hexdigest()
+            size_after = os.path.getsize(tmp)
+            dp = item.get("desktop_path")
+            if dp and os.path.isfile(dp):
+                with open(dp, "r", encoding="utf-8") as f:
+                    text = desktop_text_with_key(f.read(), "X-Aliux-SHA256", sha256)
+                for key, value in zip(ORIGINAL_DIGEST_KEYS, original):
+                    text = desktop_text_with_key(text, key, value)
+                tx.write(dp, text.encode("utf-8"), mode=stat.S_IMODE(os.stat(dp).st_mode))
+            tx.commit()
+
+    cache = DigestCache()
+    cache.put(ap, sha256, os.stat(ap))
+    cache.save()
+    result.update(status="recompressed", size_after=size_after, sha256=sha256)
+    _log(
+        f"Recompression {item['name']} : {sb['compression']} {format_bytes(result['size_before'])} → "
+        f"{codec} {format_bytes(size_after)}"
+    )
+    if bench:
+        result["bench_after"] = bench_app(job, item, cold_runs=cold_runs, warm_runs=warm_runs)
+    return result
+
+
+def recompress_after_install(job: Job, info: dict, log=None) -> dict | None:
+    """Recompression configurée (« recompress ») d'une appli qui vient d'être installée."""
+    codec = load_config().get("recompress")
+    if not codec or not recompress_available():
+        return None
+    return recompress_appimage(job, info, codec=codec, log=log)
+
+
+def _recompress_after_update(job: Job, item: dict, sha256: str, log=None) -> dict | None:
+    """Recompression configurée de la nouvelle version (sinon une mise à jour la défait).
+
+    Un échec est journalisé sans faire échouer la mise à jour, déjà en place.
+    """
+    info = {**item, "sha256": sha256, "original_sha256": None, "original_sha1": None}
+    try:
+        return recompress_after_install(job, info, log=log)
+    except JobCancelled:
+        raise
+    except Exception as e:
+        (log or LOG.warning)(f"⚠️ Recompression de {item['name']} après mise à jour : {e}")
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Vignettes des icônes (aperçu avant installation, liste des applis)
+# ---------------------------------------------------------------------------
+
+THUMB_DIR = os.path.join(CACHE_DIR, "thumbs")
+THUMB_CACHE_MAX_BYTES = 8 * 1024 * 1024
+THUMB_LIST_SIZE = 20
+THUMB_PREVIEW_SIZE = 48
+# Vignettes écrites entre deux contrôles de la taille du cache
+THUMB_EVICT_EVERY = 64
+
+
+class ThumbnailCache:
+    """Petites vignettes PNG des icônes, rangées dans THUMB_DIR.
+
+    - clé: chemin de l'icône, mtime, taille du fichier et taille de la vignette (nom du
+      fichier = SHA-1 de la clé): une icône modifiée donne une nouvelle vignette;
+    - décodage et mise à l'échelle (Pillow) dans le thread appelant, c'est-à-dire une tâche
+      de fond: la boucle Tk ne charge qu'un PNG de quelques centaines d'octets;
+    - éviction LRU: une vignette servie est « touchée » (mtime); au-delà de max_bytes, les
+      moins récemment servies sont supprimées.
+
+    Sans Pillow (ou pour une icône SVG), get() retourne None: pas de vignette.
+    """
+
+    def __init__(self, root: str = THUMB_DIR, max_bytes: int = THUMB_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._written = 0
+
+    def _thumb_path(self, src: str, size: int) -> str | None:
+        try:
+            st = os.stat(src)
+        except OSError:
+            return None
+        key = json.dumps([os.path.realpath(src), st.st_mtime_ns, st.st_size, size])
+        return os.path.join(self.root, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png")
+
+    def get(self, src: str | None, size: int) -> str | None:
+        """Chemin de la vignette `size`×`size` (au plus) de l'icône src, créée au besoin."""
+        thumb = self._thumb_path(src, size) if src else None
+        if thumb is None:
+            return None
+        try:
+            os.utime(thumb)
+            with self._lock:
+                self.hits += 1
+            METRICS.cache("thumbnail", True)
+            return thumb
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return None
+        if not PIL_OK:
+            return None
+        with self._lock:
+            self.misses += 1
+        METRICS.cache("thumbnail", False)
+        try:
+            with Image.open(src) as img:
+                img.draft("RGBA", (size, size))  # JPEG: décodage directement à taille réduite
+                small = img.convert("RGBA")
+            small.thumbnail((size, size), Image.Resampling.LANCZOS)
+            ensure_dir(self.root)
+            tmp = f"{thumb}.{os.getpid()}-{threading.get_ident()}.tmp"
+            small.save(tmp, "PNG")
+            os.replace(tmp, thumb)
+        except Exception as e:
+            LOG.info("Vignette de %s : %s", src, e)
+            return None
+        with self._lock:
+            self._written += 1
+            evict = self._written % THUMB_EVICT_EVERY == 0
+        if evict:
+            self.evict()
+        return thumb
+
+    def get_many(self, job: Job, sources: dict, size: int) -> dict:
+        """{clé: icône} -> {clé: vignette} pour les icônes qui en ont une."""
+        out = {}
+        for key, src in sources.items():
+            job.check()
+            thumb = self.get(src, size)
+            if thumb:
+                out[key] = thumb
+        self.evict()
+        return out
+
+    def evict(self) -> int:
+        """Supprime les vignettes les moins récemment servies au-delà de max_bytes; retourne leur nombre."""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.root) as it:
+                for e in it:
+                    if e.name.endswith(".png"):
+                        try:
+                            st = e.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        entries.append((st.st_mtime, st.st_size, e.path))
+                        total += st.st_size
+        except OSError:
+            return 0
+        removed = 0
+        if total > self.max_bytes:
+            entries.sort()
+            for _mtime, size, path in entries:
+                if total <= self.max_bytes * 3 // 4:
+                    break
+                with contextlib.suppress(OSError):
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+        return removed
+
+
+THUMBNAILS = ThumbnailCache()
+
+
+# ---------------------------------------------------------------------------
+# Watchdog de la boucle Tk (détection des gels de l'interface)
+# ---------------------------------------------------------------------------
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, "") or default)
+    except ValueError:
+        return default
+
+
+WATCHDOG_INTERVAL_MS = _env_int("ALIUX_WATCHDOG_INTERVAL_MS", 100)
+WATCHDOG_STALL_MS = _env_int("ALIUX_STALL_MS", 250)
+
+# Bornes (ms) de l'histogramme de retard des battements
+WATCHDOG_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class MainLoopWatchdog:
+    """Surveille la réactivité de la boucle Tk.
+
+    - un battement est programmé via after() toutes les `interval_ms`;
+      son retard (heure réelle - heure prévue) alimente un histogramme;
+    - un thread de fond vérifie que les battements arrivent: si la boucle est
+      bloquée depuis plus de `stall_ms`, la pile Python du thread principal est
+      capturée (une fois par blocage) et journalisée.
+
+    `on_stall(rapport)` est appelé dans le thread Tk, dès que la boucle repart.
+    """
+
+    def __init__(
+        self,
+        root: tk.Misc,
+        interval_ms: int = WATCHDOG_INTERVAL_MS,
+        stall_ms: int = WATCHDOG_STALL_MS,
+        on_stall=None,
+    ):
+        self.root = root
+        self.interval_ms = max(10, interval_ms)
+        self.stall_ms = max(self.interval_ms, stall_ms)
+        self.on_stall = on_stall
+
+        self.buckets_ms = WATCHDOG_BUCKETS_MS
+        self.counts = [0] * (len(self.buckets_ms) + 1)  # dernier compteur: > borne max
+        self.ticks = 0
+        self.stalls = 0
+        self.total_late_ms = 0.0
+        self.max_late_ms = 0.0
+
+        self._lock = threading.Lock()
+        self._expected = 0.0
+        self._pending: list[str] = []
+        self._main_ident: int | None = None
+        self._after_id: str | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Démarre la surveillance (à appeler depuis le thread Tk)."""
+        self._main_ident = threading.get_ident()
+        self._schedule()
+        threading.Thread(target=self._sample_loop, name="aliux-watchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _schedule(self) -> None:
+        with self._lock:
+            self._expected = time.monotonic() + self.interval_ms / 1000.0
+        self._after_id = self.root.after(self.interval_ms, self._beat)
+
+    def _record(self, late_ms: float) -> None:
+        idx = len(self.buckets_ms)
+        for i, bound in enumerate(self.buckets_ms):
+            if late_ms <= bound:
+                idx = i
+                break
+        self.counts[idx] += 1
+        self.ticks += 1
+        self.total_late_ms += late_ms
+        self.max_late_ms = max(self.max_late_ms, late_ms)
+
+    def _beat(self) -> None:
+        if self._stop.is_set():
+            return
+        late_ms = max(0.0, (time.monotonic() - self._expected) * 1000.0)
+        with self._lock:
+            self._record(late_ms)
+            if late_ms >= self.stall_ms:
+                self.stalls += 1
+            reports, self._pending = self._pending, []
+
+        if late_ms >= self.stall_ms:
+            LOG.warning("Boucle Tk débloquée après %.0f ms de retard", late_ms)
+        if self.on_stall:
+            for report in reports:
+                try:
+                    self.on_stall(report)
+                except Exception:
+                    pass
+        self._schedule()
+
+    def _sample_loop(self) -> None:
+        reported_for = None
+        period = min(self.stall_ms, self.interval_ms) / 2000.0
+        while not self._stop.wait(period):
+            with self._lock:
+                expected = self._expected
+            overdue_ms = (time.monotonic() - expected) * 1000.0
+            if overdue_ms < self.stall_ms or reported_for == expected:
+                continue
+            reported_for = expected
+
+            frame = sys._current_frames().get(self._main_ident)  # type: ignore[arg-type]
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            report = f"Interface bloquée depuis {overdue_ms:.0f} ms. Pile du thread principal :\n{stack}"
+            LOG.warning(report)
+            with self._lock:
+                self._pending.append(report)
+
+    def histogram(self) -> list[tuple[float, int]]:
+        """Retourne [(borne_ms, nombre)], la dernière borne étant +inf."""
+        with self._lock:
+            counts = list(self.counts)
+        bounds = [float(b) for b in self.buckets_ms] + [float("inf")]
+        return list(zip(bounds, counts))
+
+    def summary(self) -> str:
+        with self._lock:
+            ticks = self.ticks
+            mean = self.total_late_ms / ticks if ticks else 0.0
+            peak = self.max_late_ms
+            stalls = self.stalls
+        lines = [
+            f"Latence boucle Tk : {ticks} battements, moyenne {mean:.1f} ms, "
+            f"max {peak:.0f} ms, {stalls} blocage(s) > {self.stall_ms} ms"
+        ]
+        for bound, count in self.histogram():
+            if not count:
+                continue
+            label = f"<= {bound:.0f} ms" if bound != float("inf") else f"> {self.buckets_ms[-1]} ms"
+            lines.append(f"  {label:>12} : {count}")
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Fenêtre « Applications installées » (recherche, tri, désinstallation)
+# ---------------------------------------------------------------------------
+
+class InstalledAppsDialog(tk.Toplevel):
+    """Liste des applications installées par Aliux.
+
+    - chaque ligne est identifiée par le chemin de son .desktop (deux applis peuvent
+      porter le même nom);
+    - la liste est chargée en tâche de fond puis insérée par paquets: la fenêtre
+      s'ouvre immédiatement, même avec des centaines d'applis;
+    - la recherche filtre au fil de la frappe sur un index en minuscules préparé au
+      chargement; une saisie qui prolonge la précédente ne re-filtre que les résultats
+      déjà retenus; les lignes masquées sont détachées (detach/move), pas recréées;
+    - tri par nom, taille ou date d'installation (clic sur l'en-tête);
+    - occupation disque (AppImage, extraction, anciennes versions, icône) calculée en
+      tâche de fond après l'affichage, avec le total;
+    - désinstallation de plusieurs applis en parallèle, la liste se met à jour au fur
+      et à mesure.
+    """
+
+    COLUMNS = (
+        ("name", "Nom", 220),
+        ("size", "Taille", 90),
+        ("disk", "Disque", 90),
+        ("date", "Installée le", 100),
+        ("path", "AppImage", 340),
+    )
+    INSERT_BATCH = 200
+
+    def __init__(self, app: "AliuxApp"):
+        super().__init__(app)
+        self.app = app
+        self.title("Applications installées")
+        self.transient(app)
+        self.geometry("820x460")
+        self.minsize(600, 320)
+
+        self.items: dict[str, dict] = {}
+        self._haystack: dict[str, str] = {}
+        self._order: list[str] = []
+        self._matches: list[str] | None = None
+        self._last_query = ""
+        self._sort_key = "name"
+        self._sort_desc = False
+        self._filter_after: str | None = None
+        self._loaded = False
+        self._repo_updates: dict[str, dict] = {}
+        self._thumbs: dict[str, tk.PhotoImage] = {}
+
+        self._jobs: list[Job] = []
+        self._pending = 0
+        self._errors = 0
+        self._cancelled = 0
+
+        self._build()
+        self.protocol("WM_DELETE_WINDOW", self._on_cancel)
+        self.grab_set()
+
+        app.jobs.submit(
+            "Liste des applications",
+            lambda _job: list_aliux_installs(),
+            on_done=lambda job: self.app.after(0, lambda: self._on_loaded(job)),
+        )
+
+    # ---- Construction
+    def _build(self):
+        frm = ttk.Frame(self, padding=12)
+        frm.pack(fill="both", expand=True)
+
+        top = ttk.Frame(frm)
+        top.pack(fill="x")
+        ttk.Label(top, text="Rechercher :").pack(side="left")
+        self.var_search = tk.StringVar()
+        ent = ttk.Entry(top, textvariable=self.var_search)
+        ent.pack(side="left", fill="x", expand=True, padx=(8, 0))
+        ent.focus_set()
+        self.var_search.trace_add("write", lambda *_: self._schedule_filter())
+
+        body = ttk.Frame(frm)
+        body.pack(fill="both", expand=True, pady=(8, 8))
+        style = ttk.Style(self)
+        style.configure("Treeview", rowheight=max(int(style.lookup("Treeview", "rowheight") or 0), THUMB_LIST_SIZE + 4))
+        self.tree = ttk.Treeview(
+            body, columns=[c[0] for c in self.COLUMNS], show="tree headings", selectmode="extended"
+        )
+        self.tree.column("#0", width=THUMB_LIST_SIZE + 16, minwidth=THUMB_LIST_SIZE + 16, stretch=False)
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title, command=lambda k=key: self._on_sort(k))
+            self.tree.column(key, width=width, stretch=(key == "path"), anchor="e" if key in ("size", "disk") else "w")
+        vsb = ttk.Scrollbar(body, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=vsb.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        vsb.pack(side="right", fill="y")
+        self.tree.bind("<<TreeviewSelect>>", lambda _e: self._refresh_info())
+
+        self.lbl_info = ttk.Label(frm, text="Chargement…", justify="left")
+        self.lbl_info.pack(anchor="w", pady=(0, 10))
+
+        btn_row = ttk.Frame(frm)
+        btn_row.pack(fill="x")
+        ttk.Button(btn_row, text="Fermer", command=self._on_cancel).pack(side="right")
+        self.btn_uninstall = ttk.Button(btn_row, text="Désinstaller", command=self._on_uninstall, state="disabled")
+        self.btn_uninstall.pack(side="right", padx=(0, 10))
+        self.btn_update = ttk.Button(btn_row, text="Mettre à jour", command=self._on_update, state="disabled")
+        self.btn_update.pack(side="left")
+        self.btn_verify = ttk.Button(btn_row, text="Vérifier", command=self._on_verify, state="disabled")
+        self.btn_verify.pack(side="left", padx=(10, 0))
+        self._update_headings()
+
+    # ---- Chargement
+    def _on_loaded(self, job: Job):
+        if not self.winfo_exists():
+            return
+        try:
+            installs = job.future.result()
+        except Exception as e:
+            self.lbl_info.configure(text=f"Erreur : {e}")
+            return
+
+        if not installs:
+            self.lbl_info.configure(text="Aucune application installée par Aliux n’a été trouvée.")
+            return
+
+        for item in installs:
+            iid = item["desktop_path"]
+            self.items[iid] = item
+            self._haystack[iid] = " ".join(
+                str(item.get(k) or "") for k in ("name", "appimage_path", "desktop_path")
+            ).casefold()
+        self._order = self._sorted(list(self.items))
+        self._insert_batch(0)
+
+        self.app.jobs.submit(
+            "Vignettes",
+            THUMBNAILS.get_many,
+            {iid: item.get("icon_path") for iid, item in self.items.items()},
+            THUMB_LIST_SIZE,
+            on_done=lambda job: self.app.after(0, lambda: self._on_thumbs(job)),
+        )
+        self.app.jobs.submit(
+            "Occupation disque",
+            compute_disk_usage,
+            list(installs),
+            on_done=lambda job: self.app.after(0, lambda: self._on_usage(job)),
+        )
+        if repo_dir():
+            self.app.bg_jobs.submit(
+                "Dépôt",
+                check_repo_updates,
+                list(installs),
+                on_done=lambda job: self.app.after(0, lambda: self._on_repo(job)),
+            )
+
+    def _on_thumbs(self, job: Job):
+        if not self.winfo_exists():
+            return
+        try:
+            thumbs = job.future.result()
+        except Exception as e:
+            LOG.warning("Vignettes : %s", e)
+            return
+        for iid, thumb in thumbs.items():
+            try:
+                self._thumbs[iid] = tk.PhotoImage(file=thumb)
+            except tk.TclError:
+                continue
+            if self.tree.exists(iid):
+                self.tree.item(iid, image=self._thumbs[iid])
+
+    def _on_repo(self, job: Job):
+        try:
+            updates = job.future.result()
+        except Exception as e:
+            LOG.warning("Dépôt : %s", e)
+            return
+        for u in updates:
+            self._repo_updates[u["item"]["desktop_path"]] = u
+            self.app.log(
+                f"⬆ Dépôt : {u['item']['name']} {u['installed'] or '?'} → {u['available']['version'] or '?'}"
+            )
+
+    def _on_usage(self, job: Job):
+        if not self.winfo_exists():
+            return
+        try:
+            usage = job.future.result()
+        except Exception as e:
+            LOG.warning("Occupation disque : %s", e)
+            return
+        for iid, u in usage.items():
+            item = self.items.get(iid)
+            if item is None:
+                continue
+            item["usage"] = u
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=self._row_values(item))
+        if self._sort_key == "disk":
+            self._on_sort("disk", toggle=False)
+        self._refresh_info()
+
+    def _insert_batch(self, start: int):
+        if not self.winfo_exists():
+            return
+        for iid in self._order[start : start + self.INSERT_BATCH]:
+            if iid in self.items and not self.tree.exists(iid):
+                self.tree.insert("", "end", iid=iid, values=self._row_values(self.items[iid]))
+                if iid in self._thumbs:
+                    self.tree.item(iid, image=self._thumbs[iid])
+        if start + self.INSERT_BATCH < len(self._order):
+            self.after(1, lambda: self._insert_batch(start + self.INSERT_BATCH))
+            return
+        self._loaded = True
+        self.btn_uninstall.configure(state="normal")
+        self.btn_update.configure(state="normal")
+        self.btn_verify.configure(state="normal")
+        if self.var_search.get().strip():
+            self._apply_filter()
+        children = self.tree.get_children()
+        if children and not self.tree.selection():
+            self.tree.selection_set(children[0])
+        self._refresh_info()
+
+    def _row_values(self, item: dict) -> tuple:
+        size = item.get("appimage_size")
+        usage = item.get("usage")
+        ts = item.get("installed_at") or 0
+        return (
+            item.get("name", ""),
+            format_bytes(size) if size is not None else "—",
+            format_bytes(usage["total"]) if usage else "…",
+            time.strftime("%d/%m/%Y", time.localtime(ts)) if ts else "—",
+            item.get("appimage_path") or "",
+        )
+
+    # ---- Tri et filtre
+    def _sorted(self, iids: list[str]) -> list[str]:
+        if self._sort_key == "size":
+            key = lambda i: self.items[i].get("appimage_size") or 0  # noqa: E731
+        elif self._sort_key == "disk":
+            key = lambda i: (self.items[i].get("usage") or {}).get("total", 0)  # noqa: E731
+        elif self._sort_key == "date":
+            key = lambda i: self.items[i].get("installed_at") or 0  # noqa: E731
+        elif self._sort_key == "path":
+            key = lambda i: (self.items[i].get("appimage_path") or "").casefold()  # noqa: E731
+        else:
+            key = lambda i: (self.items[i].get("name") or "").casefold()  # noqa: E731
+        return sorted(iids, key=key, reverse=self._sort_desc)
+
+    def _update_headings(self):
+        for key, title, _w in self.COLUMNS:
+            arrow = (" ▼" if self._sort_desc else " ▲") if key == self._sort_key else ""
+            self.tree.heading(key, text=title + arrow)
+
+    def _on_sort(self, key: str, toggle: bool = True):
+        if key == self._sort_key:
+            if toggle:
+                self._sort_desc = not self._sort_desc
+        else:
+            self._sort_key, self._sort_desc = key, False
+        self._update_headings()
+        self._order = self._sorted(self._order)
+        if self._matches is not None:
+            self._matches = self._sorted(self._matches)
+        self._show(self._matches if self._matches is not None else self._order)
+
+    def _schedule_filter(self):
+        # Regroupe les frappes rapprochées
+        if self._filter_after is not None:
+            self.after_cancel(self._filter_after)
+        self._filter_after = self.after(60, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_after = None
+        if not self._loaded:
+            return
+        query = self.var_search.get().strip().casefold()
+        if not query:
+            self._matches = None
+            self._last_query = ""
+            self._show(self._order)
+            return
+        pool = self._matches if (self._matches is not None and query.startswith(self._last_query)) else self._order
+        self._matches = [iid for iid in pool if query in self._haystack.get(iid, "")]
+        self._last_query = query
+        self._show(self._matches)
+
+    def _show(self, iids: list[str]):
+        wanted = set(iids)
+        for iid in self.tree.get_children():
+            if iid not in wanted:
+                self.tree.detach(iid)
+        for pos, iid in enumerate(i for i in iids if self.tree.exists(i)):
+            self.tree.move(iid, "", pos)
+        self._refresh_info()
+
+    def _refresh_info(self):
+        if self._pending:
+            return
+        sel = self.tree.selection()
+        if len(sel) == 1 and sel[0] in self.items:
+            item = self.items[sel[0]]
+            text = f".desktop : {item.get('desktop_path') or ''}\nAppImage : {item.get('appimage_path') or ''}"
+        else:
+            shown = len(self.tree.get_children())
+            text = f"{shown} application(s) affichée(s) sur {len(self.items)}"
+            if sel:
+                text += f" — {len(sel)} sélectionnée(s)"
+            usages = [i["usage"]["total"] for i in self.items.values() if i.get("usage")]
+            if usages:
+                text += f" — occupation totale : {format_bytes(sum(usages))}"
+        self.lbl_info.configure(text=text)
+
+    def _forget(self, iid: str):
+        self.items.pop(iid, None)
+        self._haystack.pop(iid, None)
+        self._order = [i for i in self._order if i != iid]
+        if self._matches is not None:
+            self._matches = [i for i in self._matches if i != iid]
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+
+    # ---- Mise à jour (zsync)
+    def _on_update(self):
+        selected = [self.items[i] for i in self.tree.selection() if i in self.items]
+        for item in selected:
+            self.app.log(f"⬆ Mise à jour : {item['name']}…")
+            repo = self._repo_updates.get(item["desktop_path"])
+            if repo:
+                # Version plus récente dans le dépôt local: copie du fichier du dépôt
+                fn, args = update_from_repo, (item, repo["available"])
+            else:
+                fn, args = update_app, (item,)
+            self.app._run_foreground_job(
+                f"Mise à jour {item['name']}",
+                fn,
+                *args,
+                on_done=lambda job, it=item: self._on_update_done(job, it),
+            )
+
+    def _on_update_done(self, job: Job, item: dict):
         try:
-            data = parse_desktop_file(dp)
-        except Exception:
-            continue
-
-        if data.get(ALIUX_DESKTOP_TAG) != ALIUX_DESKTOP_TAG_VALUE:
-            continue
+            r = job.future.result()
+        except JobCancelled:
+            self.app.log(f"Mise à jour annulée : {item['name']}")
+            return
+        except Exception as e:
+            self.app.log(f"❌ Mise à jour {item['name']} : {e}")
+            return
+        if r["status"] == "no-update-info":
+            self.app.log(f"ℹ️ {item['name']} : l’AppImage ne contient pas d’informations de mise à jour.")
+        elif r["status"] == "up-to-date":
+            self.app.log(f"✔ {item['name']} est à jour.")
+        elif "version" in r:
+            self._repo_updates.pop(item["desktop_path"], None)
+            self.app.log(f"✅ {item['name']} mis à jour depuis le dépôt ({r['version'] or 'version inconnue'}).")
+        else:
+            self.app.log(
+                f"✅ {item['name']} mis à jour : {format_bytes(r['reused'])} réutilisés, "
+                f"{format_bytes(r['downloaded'])} téléchargés sur {format_bytes(r['length'])}."
+            )
 
-        name = data.get("Name", fn)
-        appimage_path = data.get("X-Aliux-AppImagePath")
-        icon_path = data.get("X-Aliux-IconPath")
+    # ---- Vérification (SHA-256)
+    def _on_verify(self):
+        """Vérifie la sélection (ou toutes les applis) en tâche de fond."""
+        selected = [self.items[i] for i in self.tree.selection() if i in self.items]
+        installs = selected or list(self.items.values())
+        self.app.log(f"🔎 Vérification de {len(installs)} application(s)…")
+        self.app._run_foreground_job(
+            "Vérification", verify_installs, installs, on_done=self._on_verify_done, background=True,
+        )
 
-        if not appimage_path:
-            ex = data.get("Exec", "")
-            m = re.search(r'"([^"]+\.AppImage)"', ex)
-            if m:
-                appimage_path = m.group(1)
+    def _on_verify_done(self, job: Job):
+        try:
+            results = job.future.result()
+        except JobCancelled:
+            self.app.log("Vérification annulée.")
+            return
+        except Exception as e:
+            self.app.log(f"❌ Vérification : {e}")
+            return
+        counts: dict[str, int] = {}
+        for r in results:
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+            if r["status"] in ("modified", "missing", "error"):
+                self.app.log(f"⚠️ {r['name']} : {_VERIFY_LABELS[r['status']]} ({r['error'] or r['path']})")
+        self.app.log(
+            "✅ Vérification : " + ", ".join(f"{n} {_VERIFY_LABELS[k]}" for k, n in sorted(counts.items()))
+        )
 
-        if not icon_path:
-            icon = data.get("Icon", "")
-            if icon.startswith("/") and os.path.exists(icon):
-                icon_path = icon
+    # ---- Désinstallation
+    def _on_uninstall(self):
+        selected = [self.items[i] for i in self.tree.selection() if i in self.items]
+        if not selected:
+            return
+        if not messagebox.askyesno(
+            "Confirmation",
+            f"Souhaitez-vous vraiment désinstaller {len(selected)} application(s) ?\n\n"
+            "Cela supprimera le lanceur (.desktop) et, si possible, l’AppImage et l’icône.",
+            parent=self,
+        ):
+            return
 
-        out.append(
-            {
-                "name": name,
-                "desktop_path": dp,
-                "appimage_path": appimage_path,
-                "icon_path": icon_path,
-            }
-        )
+        self.btn_uninstall.configure(state="disabled")
+        self._pending = len(selected)
+        self._errors = 0
+        self._cancelled = 0
+        self.lbl_info.configure(text=f"Désinstallation… {self._pending} restante(s)")
+        # Une tâche par appli: les suppressions s'exécutent en parallèle
+        for item in selected:
+            self._jobs.append(
+                self.app.jobs.submit(
+                    f"Désinstallation {item['name']}",
+                    uninstall_aliux_app,
+                    item,
+                    on_done=lambda j, it=item: self.app.after(0, lambda: self._on_item_done(j, it)),
+                )
+            )
 
-    out.sort(key=lambda x: x.get("name", "").lower())
-    return out
+    def _on_item_done(self, job: Job, item: dict):
+        self._pending -= 1
+        try:
+            removed, errors = job.future.result()
+        except JobCancelled:
+            removed, errors = [], []
+            self._cancelled += 1
+            self.app.log(f"Désinstallation annulée : {item['name']}")
+        except Exception as e:
+            removed, errors = [], [str(e)]
+
+        for r in removed:
+            self.app.log(f"🗑️ Supprimé : {r}")
+        for e in errors:
+            self.app.log(f"⚠️ Suppression : {e}")
+        self._errors += len(errors)
+
+        if self.winfo_exists():
+            if removed:
+                self._forget(item["desktop_path"])
+            self.lbl_info.configure(text=f"Désinstallation… {self._pending} restante(s)")
+
+        if self._pending == 0:
+            self._finish()
+
+    def _finish(self):
+        self._jobs = []
+        self.app.jobs.submit("Cache des lanceurs", lambda _job: refresh_desktop_database())
+        if self._cancelled:
+            messagebox.showinfo("Désinstallation", "Désinstallation interrompue.\n\nVoir le journal.", parent=self)
+        elif self._errors:
+            messagebox.showwarning(
+                "Désinstallation", "Désinstallation terminée avec avertissements.\n\nVoir le journal.", parent=self
+            )
+        else:
+            messagebox.showinfo("Désinstallation", "Désinstallation terminée.", parent=self)
+        if self.winfo_exists():
+            self.btn_uninstall.configure(state="normal")
+            self._refresh_info()
+
+    def _on_cancel(self):
+        if self._pending:
+            for job in self._jobs:
+                job.cancel()
+            self.lbl_info.configure(text="Annulation…")
+            return
+        self.destroy()
 
 
 class AliuxApp(tk.Tk):
@@ -540,6 +6939,7 @@ class AliuxApp(tk.Tk):
 
         # Références images (sinon Tkinter les perd)
         self._header_img = None
+        self._icon_preview_img = None
 
         self._build_ui()
 
@@ -549,10 +6949,84 @@ class AliuxApp(tk.Tk):
         # tente icône de fenêtre
         self._apply_window_icon()
 
+        # Exécuteur partagé des opérations longues (installations, désinstallations…)
+        self.jobs = JobRunner()
+        # Tâches de fond (ménage, vérification, déplacement…): nice/ioprio réduits
+        self.bg_jobs = JobRunner(priority=background_priority())
+        self._fg_jobs: list[Job] = []
+
+        # Transactions interrompues par un arrêt brutal: terminées ou annulées avant tout le reste
+        try:
+            for e in recover_journal(log=lambda m: self.log(f"🧾 {m}"))["errors"]:
+                self.log(f"⚠️ Journal : {e}")
+        except OSError as e:
+            LOG.warning("Reprise du journal impossible : %s", e)
+
+        # Watchdog: mesure les retards de la boucle Tk et journalise les gels
+        self.watchdog = MainLoopWatchdog(self, on_stall=lambda report: self.log(f"⏱️ {report}"))
+        self.after(0, self.watchdog.start)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Ménage en tâche de fond (restes de copies/extractions interrompues, icônes orphelines)
+        self.after(2000, self._start_housekeeping)
+
         # Bootstrap: si Aliux est lancé depuis un support non exécutable (clé FAT/vfat),
         # proposer une installation locale puis relancer automatiquement.
         self.after(350, lambda: bootstrap_offer_install(self))
 
+    def _start_recompress(self, info: dict):
+        """Recompression configurée (« recompress »), en tâche de fond après l'installation."""
+        if not load_config().get("recompress") or not recompress_available():
+            return
+
+        def _done(job: Job):
+            try:
+                job.future.result()
+            except JobCancelled:
+                pass
+            except Exception as e:
+                self.log(f"⚠️ Recompression de {info['name']} : {e}")
+
+        self.bg_jobs.submit("Recompression", recompress_after_install, info, log=self.log, on_done=_done)
+
+    def _start_housekeeping(self):
+        def _done(job: Job):
+            try:
+                report = job.future.result()
+            except Exception as e:
+                LOG.warning("Ménage en échec : %s", e)
+                return
+            if report:
+                self.after(0, lambda: self._log_housekeeping(report))
+
+        self.bg_jobs.submit("Ménage", run_housekeeping, on_done=_done)
+
+    def _log_housekeeping(self, report: dict):
+        if report["removed"]:
+            self.log(
+                f"🧹 Ménage : {len(report['removed'])} élément(s) supprimé(s), "
+                f"{format_bytes(report['reclaimed'])} libérés."
+            )
+        for e in report["errors"]:
+            self.log(f"⚠️ Ménage : {e}")
+        orphans = [i for i in report["found"] if i["kind"] == "orphan-app"]
+        if orphans:
+            self.log(
+                f"ℹ️ {len(orphans)} dossier(s) d’application sans lanceur "
+                f"({format_bytes(sum(i['bytes'] for i in orphans))}) : "
+                "« aliux housekeeping --orphan-apps » pour les supprimer."
+            )
+            for i in orphans:
+                self.log(f"   {i['path']}")
+
+    def on_close(self):
+        self.jobs.shutdown()
+        self.bg_jobs.shutdown()
+        METRICS.flush(force=True)
+        self.watchdog.stop()
+        LOG.info(self.watchdog.summary())
+        self.destroy()
+
     def _apply_window_icon(self):
         try:
             if os.path.isfile(HEADER_IMAGE_PATH):
@@ -737,6 +7211,49 @@ class AliuxApp(tk.Tk):
         self.lbl_status.configure(text=msg)
         self.update_idletasks()
 
+    def _run_foreground_job(self, label: str, fn, *args, on_done=None, background: bool = False) -> Job:
+        """Lance une tâche de la fenêtre principale (annulable via le bouton Annuler).
+
+        La progression est affichée dans la barre d'état; `on_done(job)` est appelé
+        dans le thread Tk. background=True: exécutée à priorité réduite (self.bg_jobs).
+        """
+
+        def _progress(message: str, fraction: float | None):
+            self.after(0, lambda: self._show_progress(message, fraction))
+
+        def _done(job: Job):
+            def _ui():
+                if job in self._fg_jobs:
+                    self._fg_jobs.remove(job)
+                if not self._fg_jobs:
+                    self.btn_cancel.configure(state="disabled")
+                    self._show_progress("", None)
+                if on_done:
+                    on_done(job)
+
+            self.after(0, _ui)
+
+        runner = self.bg_jobs if background else self.jobs
+        job = runner.submit(label, fn, *args, on_progress=_progress, on_done=_done)
+        self._fg_jobs.append(job)
+        self.btn_cancel.configure(state="normal")
+        return job
+
+    def _show_progress(self, message: str, fraction: float | None):
+        """Barre d'état: texte + barre de progression (masquée sans fraction connue)."""
+        self.lbl_status.configure(text=message)
+        if fraction is None:
+            self.pb_progress.pack_forget()
+            return
+        self.pb_progress.configure(value=max(0.0, min(1.0, fraction)) * 100)
+        if not self.pb_progress.winfo_ismapped():
+            self.pb_progress.pack(fill="x", pady=(6, 0))
+
+    def on_cancel_jobs(self):
+        for job in list(self._fg_jobs):
+            job.cancel()
+        self.set_status("Annulation…")
+
     def _build_ui(self):
         pad = 10
         container = ttk.Frame(self, padding=pad)
@@ -831,6 +7348,14 @@ class AliuxApp(tk.Tk):
             width=25,
         ).grid(row=2, column=1, sticky="ew", pady=4)
 
+        # Dossier d'installation : le changer propose de déplacer les applis déjà installées
+        ttk.Label(grid, text="Dossier :").grid(row=3, column=0, sticky="w", pady=4, padx=(0, 10))
+        row_dir = ttk.Frame(grid)
+        row_dir.grid(row=3, column=1, sticky="ew", pady=4)
+        row_dir.columnconfigure(0, weight=1)
+        ttk.Entry(row_dir, textvariable=self.var_install_dir, state="readonly").grid(row=0, column=0, sticky="ew")
+        ttk.Button(row_dir, text="Parcourir…", command=self.on_choose_dir).grid(row=0, column=1, padx=(10, 0))
+
         # Icône : répartition sur 2 lignes
         # Ligne 1 : "Icône :" + (checkbox extraction)
         row_icon_top = ttk.Frame(grid)
@@ -844,6 +7369,10 @@ class AliuxApp(tk.Tk):
             text="Tenter d’extraire une icône depuis l’AppImage (recommandé)",
         ).pack(side="left", anchor="w")
 
+        # Aperçu de l'icône qui sera installée (vignette préparée en tâche de fond)
+        self.lbl_icon_preview = ttk.Label(row_icon_top)
+        self.lbl_icon_preview.pack(side="left", padx=(10, 0))
+
         # Ligne 2 : bouton "Chemin icône…" + champ chemin
         row_icon_bottom = ttk.Frame(grid)
         row_icon_bottom.grid(row=5, column=0, columnspan=2, sticky="ew", pady=(6, 0))
@@ -867,6 +7396,9 @@ class AliuxApp(tk.Tk):
 
         ttk.Button(frm_act, text="Désinstaller…", command=self.on_uninstall_dialog).pack(side="left", padx=(10, 0))
 
+        self.btn_cancel = ttk.Button(frm_act, text="Annuler", command=self.on_cancel_jobs, state="disabled")
+        self.btn_cancel.pack(side="left", padx=(10, 0))
+
         # Spacer qui pousse le bouton Aliux tout à droite
         spacer = ttk.Frame(frm_act)
         spacer.pack(side="left", fill="x", expand=True)
@@ -877,8 +7409,15 @@ class AliuxApp(tk.Tk):
             side="right"
         )
 
-        self.lbl_status = ttk.Label(frm_act, text="")
-        self.lbl_status.pack(side="left", padx=(12, 0))
+        # ---- Barre d'état (texte sous les boutons + progression pendant les copies)
+        frm_status = ttk.Frame(main)
+        frm_status.pack(fill="x", pady=(6, 0))
+
+        self.lbl_status = ttk.Label(frm_status, text="")
+        self.lbl_status.pack(anchor="w")
+
+        self.pb_progress = ttk.Progressbar(frm_status, mode="determinate", maximum=100)
+        # (packée uniquement pendant une opération avec progression)
 
         # ---- Journal (panneau droit, masqué par défaut)
         frm_log = ttk.LabelFrame(self._log_panel, text="Journal")
@@ -915,18 +7454,46 @@ class AliuxApp(tk.Tk):
 
         if not self.var_name.get().strip():
             self.var_name.set(base_noext)
+        if not self.var_icon_path.get().strip():
+            self._set_icon_preview(None)
+
+        # Signature embarquée: lue dans les en-têtes; vérifiée pendant la copie
+        if read_signature_info(path):
+            self.log("🔏 AppImage signée : la signature sera vérifiée pendant l’installation.")
+        else:
+            self.log("AppImage non signée.")
 
         if self.var_extract_icon.get():
-            def _worker():
-                self.set_status("Analyse AppImage…")
-                suggested_name, _icon, _hint = try_extract_appimage_metadata(path)
+
+            def _analyse(job: Job) -> tuple[str | None, str | None]:
+                # Nom et icône lus dans le squashfs (quelques blocs de métadonnées), sans extraction
+                cache = AppImageMetadataCache()
+                try:
+                    meta = cache.metadata(path)
+                    cache.save()
+                    return (meta["name"], THUMBNAILS.get(meta["icon_path"], THUMB_PREVIEW_SIZE))
+                except SQUASHFS_READ_ERRORS:
+                    pass
+                tmp_root = choose_extract_dir(path)
+                if not tmp_root:
+                    self.log("⚠️ Espace temporaire insuffisant pour analyser l’AppImage.")
+                    return (None, None)
+                return (try_extract_appimage_metadata(path, tmp_root=tmp_root, job=job)[0], None)
+
+            def _done(job: Job):
+                try:
+                    suggested_name, thumb = job.future.result()
+                except JobCancelled:
+                    self.log("⏹️ Analyse de l’AppImage annulée.")
+                    return
+                if thumb and not self.var_icon_path.get().strip() and self.var_file.get() == path:
+                    self._set_icon_preview(thumb)
                 if suggested_name:
                     current = self.var_name.get().strip()
                     if not current or current == base_noext:
                         self.var_name.set(suggested_name)
-                self.set_status("")
 
-            threading.Thread(target=_worker, daemon=True).start()
+            self._run_foreground_job("Analyse AppImage", _analyse, on_done=_done)
 
     def on_choose_dir(self):
         path = filedialog.askdirectory(
@@ -937,6 +7504,43 @@ class AliuxApp(tk.Tk):
             return
         self.var_install_dir.set(path)
         self.log(f"Dossier d’installation : {path}")
+        # Recherche des applis à déplacer (lecture des lanceurs) hors du thread Tk
+        self.jobs.submit(
+            "Applications à déplacer",
+            lambda _job: plan_relocation(path),
+            on_done=lambda job: self.after(0, lambda: self._offer_relocation(job, path)),
+        )
+
+    def _offer_relocation(self, job: Job, path: str):
+        try:
+            moves = job.future.result()
+        except Exception as e:
+            self.log(f"⚠️ Applications à déplacer : {e}")
+            return
+        if path != self.var_install_dir.get():
+            return  # un autre dossier a été choisi entre-temps
+        if moves and messagebox.askyesno(
+            "Aliux",
+            f"{len(moves)} application(s) sont installées ailleurs.\n\n"
+            f"Les déplacer dans {path} (lanceurs mis à jour) ?",
+        ):
+            self._run_foreground_job(
+                "Déplacement", relocate_installs, path,
+                on_done=self._on_relocate_done, background=True,
+            )
+
+    def _on_relocate_done(self, job: Job):
+        try:
+            r = job.future.result()
+        except JobCancelled:
+            self.log("⏹️ Déplacement interrompu : il reprendra avec « aliux relocate ».")
+            return
+        except Exception as e:
+            self.log(f"❌ Déplacement : {e}")
+            return
+        for e in r["errors"]:
+            self.log(f"⚠️ {e}")
+        self.log(f"✅ {len(r['moved'])} application(s) déplacée(s) vers {r['target']}")
 
     def on_choose_icon_path(self):
         path = filedialog.askopenfilename(
@@ -951,11 +7555,26 @@ class AliuxApp(tk.Tk):
         self.last_browse_dir = os.path.dirname(path)
         self.var_icon_path.set(path)
         self.log(f"Icône sélectionnée : {path}")
+        self.jobs.submit(
+            "Vignette",
+            lambda _job: THUMBNAILS.get(path, THUMB_PREVIEW_SIZE),
+            on_done=lambda job: self.after(
+                0, lambda: self._set_icon_preview(job.future.result() if not job.future.exception() else None)
+            ),
+        )
+
+    def _set_icon_preview(self, thumb: str | None):
+        """Affiche la vignette `thumb` à côté des options d'icône (None: efface l'aperçu)."""
+        try:
+            self._icon_preview_img = tk.PhotoImage(file=thumb) if thumb else None
+        except tk.TclError:
+            self._icon_preview_img = None
+        self.lbl_icon_preview.configure(image=self._icon_preview_img or "")
 
     def _validate(self) -> tuple[bool, str]:
         f = self.var_file.get().strip()
-        if not f or not os.path.isfile(f):
-            return (False, "Veuillez sélectionner un fichier AppImage valide.")
+        if not f or not (os.path.isfile(f) or is_http_url(f)):
+            return (False, "Veuillez sélectionner un fichier AppImage valide (ou saisir une URL http(s)).")
         name = self.var_name.get().strip()
         if not name:
             return (False, "Veuillez renseigner un nom d’application.")
@@ -970,11 +7589,11 @@ class AliuxApp(tk.Tk):
             messagebox.showerror("Erreur", err)
             return
         self.btn_install.configure(state="disabled")
-        threading.Thread(target=self._install_worker, daemon=True).start()
+        self._run_foreground_job("Installation", self._install_worker)
 
-    def _install_worker(self):
+    def _install_worker(self, job: Job):
         try:
-            self.set_status("Installation en cours…")
+            job.progress("Installation en cours…")
 
             src = self.var_file.get().strip()
             name = self.var_name.get().strip()
@@ -983,21 +7602,7 @@ class AliuxApp(tk.Tk):
             categories = CATEGORY_MAP.get(cat_human, "Utility;")
             install_dir = self.var_install_dir.get().strip()
 
-            manual_icon = self.var_icon_path.get().strip()
-            if manual_icon and not os.path.isfile(manual_icon):
-                manual_icon = ""
-
-            ensure_dir(install_dir)
-            ensure_dir(DESKTOP_DIR)
-            ensure_dir(ICON_DIR)
-
-            slug = slugify(name)
-
-            # 1 dossier par application (évite de tout mélanger dans ~/Applications)
-            app_dir = os.path.join(install_dir, slug)
-            ensure_dir(app_dir)
-
-            dst_appimage = os.path.join(app_dir, f"{slug}.AppImage")
+            dst_appimage = app_paths(name, install_dir)["appimage_path"]
 
             if os.path.exists(dst_appimage):
                 choice = {"val": None}
@@ -1017,72 +7622,20 @@ class AliuxApp(tk.Tk):
                     self.log("Installation annulée (fichier existant).")
                     return
 
-            self.log(f"Copie vers : {dst_appimage}")
-            # Copie atomique = update sûr (même si un autre processus exécute l'ancien fichier)
-            atomic_copy_replace(src, dst_appimage)
-            self.log("Permissions : exécutable (chmod +x)")
-
-            # Icône : priorité à l'icône manuelle
-            icon_dst = None
-
-            if manual_icon:
-                self.log("Icône : utilisation du chemin d’icône sélectionné.")
-                ext = os.path.splitext(manual_icon)[1].lower()
-                if ext not in (".png", ".svg", ".ico", ".jpg", ".jpeg"):
-                    ext = ".png"
-                icon_dst = os.path.join(ICON_DIR, f"{slug}{ext}")
-                shutil.copy2(manual_icon, icon_dst)
-                self.log(f"Icône copiée : {icon_dst}")
-            elif self.var_extract_icon.get():
-                self.log("Extraction d’icône : tentative via --appimage-extract…")
-                _suggested_name, icon_src, _icon_hint = try_extract_appimage_metadata(dst_appimage)
-                if icon_src and os.path.isfile(icon_src):
-                    ext = os.path.splitext(icon_src)[1].lower()
-                    if ext not in (".png", ".svg"):
-                        ext = ".png"
-                    icon_dst = os.path.join(ICON_DIR, f"{slug}{ext}")
-                    shutil.copy2(icon_src, icon_dst)
-                    self.log(f"Icône extraite : {icon_dst}")
-                else:
-                    self.log("Icône : aucune icône exploitable trouvée dans l’AppImage.")
-            else:
-                self.log("Icône : extraction désactivée.")
-
-            desktop_path = os.path.join(DESKTOP_DIR, f"{slug}.desktop")
-            exec_line = f'"{dst_appimage}" %U'
-            icon_line = icon_dst if icon_dst else "application-x-executable"
-
-            desktop_content = (
-                "[Desktop Entry]\n"
-                "Type=Application\n"
-                f"Name={name}\n"
-                f"Comment={desc}\n"
-                f"Exec={exec_line}\n"
-                f"Icon={icon_line}\n"
-                "Terminal=false\n"
-                f"Categories={categories}\n"
-                "StartupNotify=true\n"
-                f"{ALIUX_DESKTOP_TAG}={ALIUX_DESKTOP_TAG_VALUE}\n"
-                f"X-Aliux-AppImagePath={dst_appimage}\n"
-                f"X-Aliux-IconPath={icon_dst or ''}\n"
+            info = install_appimage(
+                job,
+                src,
+                name,
+                desc=desc,
+                categories=categories,
+                install_dir=install_dir,
+                manual_icon=self.var_icon_path.get().strip(),
+                extract_icon=self.var_extract_icon.get(),
+                log=self.log,
             )
 
-            self.log(f"Création du lanceur : {desktop_path}")
-            with open(desktop_path, "w", encoding="utf-8") as f:
-                f.write(desktop_content)
-
-            self.log("Mise à jour du cache des lanceurs (optionnel)…")
-            try:
-                subprocess.run(
-                    ["update-desktop-database", DESKTOP_DIR],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    check=False,
-                )
-            except Exception:
-                pass
-
             self.log("✅ Installation terminée.")
+            self._start_recompress(info)
             self.after(
                 0,
                 lambda: messagebox.showinfo(
@@ -1090,212 +7643,635 @@ class AliuxApp(tk.Tk):
                     "Installation terminée.\n\nL’application devrait apparaître dans le menu des applications.",
                 ),
             )
+        except JobCancelled:
+            self.log("Installation annulée.")
         except Exception as e:
             self.log(f"❌ Erreur : {e}")
             self.after(0, lambda: messagebox.showerror("Erreur", f"Une erreur est survenue :\n\n{e}"))
         finally:
-            self.set_status("")
+            self.after(0, lambda: self.set_status(""))
             self.after(0, lambda: self.btn_install.configure(state="normal"))
 
     # ---------------------------
     # Désinstallation (dialog)
     # ---------------------------
     def on_uninstall_dialog(self):
-        installs = list_aliux_installs()
-        if not installs:
-            messagebox.showinfo("Désinstallation", "Aucune application installée par Aliux n’a été trouvée.")
-            return
+        InstalledAppsDialog(self)
+
+    # ---------------------------
+    # .desktop pour Aliux lui-même
+    # ---------------------------
 
-        win = tk.Toplevel(self)
-        win.title("Désinstaller une application")
-        win.transient(self)
-        win.grab_set()
-        win.resizable(False, False)
+    def on_install_aliux_desktop(self):
+        """Ajoute Aliux au menu des applications (et met à jour l'installation si déjà présente).
 
-        frm = ttk.Frame(win, padding=12)
-        frm.pack(fill="both", expand=True)
+        Comportement voulu:
+        - L'AppImage en cours d'exécution est copiée vers:
+            ~/Applications/Aliux/Aliux.AppImage
+          en remplacement atomique (safe si une ancienne version tourne).
+        - Le lanceur ~/.local/share/applications/aliux.desktop pointe vers cette copie locale.
+        - En mode dev (sans APPIMAGE), création d'un lanceur qui exécute aliux.py via python3.
+        """
+        self._run_foreground_job("Installation d’Aliux", self._install_aliux_desktop_worker, on_done=self._on_aliux_desktop_done)
 
-        ttk.Label(frm, text="Veuillez choisir l’application à désinstaller :").pack(anchor="w")
+    def _install_aliux_desktop_worker(self, job: Job) -> str:
+        """Tâche de fond de on_install_aliux_desktop(); retourne le chemin du lanceur."""
+        ensure_dir(DESKTOP_DIR)
+        ensure_dir(ICON_DIR)
 
-        names = [i["name"] for i in installs]
-        var_choice = tk.StringVar(value=names[0])
+        # Icône du lanceur (fallback: icône générique)
+        icon_data = None
+        if os.path.isfile(HEADER_IMAGE_PATH):
+            try:
+                with open(HEADER_IMAGE_PATH, "rb") as f:
+                    icon_data = f.read()
+            except OSError:
+                icon_data = None
+        icon_dst = os.path.join(ICON_DIR, "aliux.png") if icon_data else None
+
+        desktop_path = os.path.join(DESKTOP_DIR, "aliux.desktop")
+
+        appimage_src = os.environ.get("APPIMAGE")
+        if appimage_src and os.path.isfile(appimage_src):
+            # Copie en local (mise à jour incluse) +x garanti + remplacement atomique
+            job.progress("Copie d’Aliux…")
+            local_appimage = ensure_self_local_copy(progress=transfer_progress(job, "Copie d’Aliux"))
+            if not local_appimage or not os.path.isfile(local_appimage):
+                raise RuntimeError("Impossible de copier Aliux dans ~/Applications/Aliux/.")
+
+            exec_value = f'"{local_appimage}" %U'
+            self.log(f"✅ Aliux installé / mis à jour : {local_appimage}")
+        else:
+            # Mode script (dev)
+            script_path = os.path.abspath(__file__)
+            exec_value = f'python3 "{script_path}"'
+            self.log("ℹ️ Mode script détecté (APPIMAGE absent). Lanceur en mode dev.")
+
+        desktop_content = (
+            "[Desktop Entry]\n"
+            "Type=Application\n"
+            "Name=Aliux\n"
+            "Comment=Installateur AppImage local\n"
+            f"Exec={exec_value}\n"
+            f"Icon={icon_dst if icon_dst else 'application-x-executable'}\n"
+            "Terminal=false\n"
+            "Categories=Utility;\n"
+            "StartupNotify=true\n"
+            "X-Aliux-Self=true\n"
+        )
 
-        cmb = ttk.Combobox(frm, values=names, textvariable=var_choice, state="readonly", width=55)
-        cmb.pack(fill="x", pady=(8, 10))
+        job.progress("Création du lanceur…")
+        # Icône et lanceur remplacés d'un bloc (jamais de lanceur à moitié écrit)
+        with Transaction("install", "Aliux") as tx:
+            if icon_data:
+                tx.write(icon_dst, icon_data)
+            tx.write(desktop_path, desktop_content.encode("utf-8"))
+            tx.commit()
 
-        info = ttk.Label(frm, text="")
-        info.pack(anchor="w", pady=(0, 10))
+        job.progress("Mise à jour du cache des lanceurs…")
+        refresh_desktop_database()
+        return desktop_path
 
-        def _refresh_info(*_):
-            sel = var_choice.get()
-            item = next((x for x in installs if x["name"] == sel), None)
-            if not item:
-                info.configure(text="")
-                return
-            dp = item.get("desktop_path") or ""
-            ap = item.get("appimage_path") or ""
-            info.configure(text=f".desktop : {dp}\nAppImage : {ap}")
+    def _on_aliux_desktop_done(self, job: Job):
+        self.set_status("")
+        try:
+            desktop_path = job.future.result()
+        except JobCancelled:
+            self.log("Installation d’Aliux annulée.")
+            return
+        except Exception as e:
+            self.log(f"❌ Erreur installation lanceur Aliux : {e}")
+            messagebox.showerror("Aliux", f"Impossible de créer le lanceur Aliux.\n\n{e}")
+            return
 
-        _refresh_info()
-        cmb.bind("<<ComboboxSelected>>", _refresh_info)
+        self.log(f"✅ Lanceur Aliux créé : {desktop_path}")
+        messagebox.showinfo(
+            "Aliux",
+            "Aliux a été ajouté au menu des applications.\n\n"
+            "Le lanceur pointe vers la copie locale (~/Applications/Aliux/Aliux.AppImage) lorsqu'Aliux est lancé en AppImage.",
+        )
 
-        btn_row = ttk.Frame(frm)
-        btn_row.pack(fill="x")
+# ---------------------------------------------------------------------------
+# Ligne de commande
+# ---------------------------------------------------------------------------
 
-        def _do_uninstall():
-            sel = var_choice.get()
-            item = next((x for x in installs if x["name"] == sel), None)
-            if not item:
-                return
-            if not messagebox.askyesno(
-                "Confirmation",
-                "Souhaitez-vous vraiment désinstaller cette application ?\n\n"
-                "Cela supprimera le lanceur (.desktop) et, si possible, l’AppImage et l’icône.",
-                parent=win,
-            ):
-                return
+_HOUSEKEEPING_LABELS = {
+    "tmp-copy": "copie interrompue",
+    "extract-dir": "extraction interrompue",
+    "partial-download": "téléchargement abandonné",
+    "orphan-icon": "icône orpheline",
+    "orphan-app": "appli sans lanceur",
+}
 
-            removed = []
-            errors = []
 
-            dp = item.get("desktop_path")
-            if dp and os.path.exists(dp):
-                try:
-                    os.remove(dp)
-                    removed.append(dp)
-                except Exception as e:
-                    errors.append(f"{dp} : {e}")
+def cmd_housekeeping(args: argparse.Namespace) -> int:
+    report = run_housekeeping(dry_run=args.dry_run, include_orphan_apps=args.orphan_apps)
+    if report is None:
+        print("Une autre passe de ménage est en cours.", file=sys.stderr)
+        return 1
+
+    removed = {i["path"] for i in report["removed"]}
+    for item in report["found"]:
+        mark = "supprimé" if item["path"] in removed else "trouvé"
+        print(f"{mark:9} {format_bytes(item['bytes']):>10}  {_HOUSEKEEPING_LABELS[item['kind']]:24} {item['path']}")
+    for e in report["errors"]:
+        print(f"erreur : {e}", file=sys.stderr)
+    print(
+        f"Récupérable : {format_bytes(report['reclaimable'])} — "
+        f"libéré : {format_bytes(report['reclaimed'])}"
+    )
+    return 1 if report["errors"] else 0
 
-            ap = item.get("appimage_path")
-            if ap and os.path.exists(ap):
-                try:
-                    os.remove(ap)
-                    removed.append(ap)
-                except Exception as e:
-                    errors.append(f"{ap} : {e}")
 
-            # Supprimer le dossier de l'app si vide
-            try:
-                d = os.path.dirname(ap)
-                if d and os.path.isdir(d) and not os.listdir(d):
-                    os.rmdir(d)
-                    removed.append(d)
-            except Exception as e:
-                errors.append(f"{os.path.dirname(ap)} : {e}")
+def _cli_job(label: str) -> Job:
+    """Job pour la ligne de commande: la progression s'affiche sur une seule ligne."""
 
-            ic = item.get("icon_path")
-            if ic and os.path.exists(ic):
-                try:
-                    os.remove(ic)
-                    removed.append(ic)
-                except Exception as e:
-                    errors.append(f"{ic} : {e}")
+    def _progress(message: str, _fraction: float | None):
+        if sys.stdout.isatty():
+            print(f"\r\033[K{message}", end="", flush=True)
 
-            try:
-                subprocess.run(
-                    ["update-desktop-database", DESKTOP_DIR],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    check=False,
-                )
-            except Exception:
-                pass
+    return Job(label, on_progress=_progress)
 
-            for r in removed:
-                self.log(f"🗑️ Supprimé : {r}")
-            for e in errors:
-                self.log(f"⚠️ Suppression : {e}")
 
-            win.destroy()
-            if errors:
-                messagebox.showwarning("Désinstallation", "Désinstallation terminée avec avertissements.\n\nVoir le journal.")
-            else:
-                messagebox.showinfo("Désinstallation", "Désinstallation terminée.")
+def _cli_log(message: str) -> None:
+    if sys.stdout.isatty():
+        print("\r\033[K", end="")
+    print(message, flush=True)
 
-        ttk.Button(btn_row, text="Annuler", command=win.destroy).pack(side="right")
-        ttk.Button(btn_row, text="Désinstaller", command=_do_uninstall).pack(side="right", padx=(0, 10))
 
-    # ---------------------------
-    # .desktop pour Aliux lui-même
-    # ---------------------------
+def cmd_watch(args: argparse.Namespace) -> int:
+    cfg = load_config()
+    dirs = [os.path.expanduser(d) for d in (args.dirs or cfg["watch_dirs"] or [xdg_download_dir()])]
+    missing = [d for d in dirs if not os.path.isdir(d)]
+    for d in missing:
+        print(f"Dossier introuvable (ignoré) : {d}", file=sys.stderr)
+    if len(missing) == len(dirs):
+        return 1
 
-    def on_install_aliux_desktop(self):
-        """Ajoute Aliux au menu des applications (et met à jour l'installation si déjà présente).
+    runner = JobRunner(max_workers=2)
 
-        Comportement voulu:
-        - L'AppImage en cours d'exécution est copiée vers:
-            ~/Applications/Aliux/Aliux.AppImage
-          en remplacement atomique (safe si une ancienne version tourne).
-        - Le lanceur ~/.local/share/applications/aliux.desktop pointe vers cette copie locale.
-        - En mode dev (sans APPIMAGE), création d'un lanceur qui exécute aliux.py via python3.
-        """
+    def _recompressed(job: Job):
         try:
-            ensure_dir(DESKTOP_DIR)
-            ensure_dir(ICON_DIR)
+            job.future.result()
+        except Exception as e:
+            _cli_log(f"⚠️ {job.label} : {e}")
 
-            # Icône du lanceur (fallback: icône générique)
-            icon_dst = None
-            if os.path.isfile(HEADER_IMAGE_PATH):
-                icon_dst = os.path.join(ICON_DIR, "aliux.png")
-                try:
-                    shutil.copy2(HEADER_IMAGE_PATH, icon_dst)
-                except Exception:
-                    icon_dst = None
+    def _done(job: Job):
+        try:
+            info = job.future.result()
+            _cli_log(f"✅ Installé : {info['name']} -> {info['appimage_path']}")
+        except Exception as e:
+            _cli_log(f"❌ {job.label} : {e}")
+            return
+        if cfg.get("recompress") and recompress_available():
+            runner.submit(f"Recompression {info['name']}", recompress_after_install, info, log=_cli_log,
+                          on_done=_recompressed)
+
+    def _on_ready(path: str):
+        _cli_log(f"Nouvelle AppImage : {path}")
+        runner.submit(f"Installation {os.path.basename(path)}", watch_install, path,
+                      install_dir=os.path.expanduser(args.install_dir), log=_cli_log, on_done=_done)
+
+    watcher = FolderWatcher(
+        dirs,
+        _on_ready,
+        settle=args.settle if args.settle is not None else float(cfg["watch_settle_seconds"]),
+        poll=args.poll,
+        poll_interval=float(cfg["watch_poll_seconds"]),
+        existing=args.existing,
+    )
+    if not args.existing:
+        watcher.mark_existing_seen()
+    _cli_log(f"Surveillance ({watcher.mode}) : {', '.join(watcher.dirs)} — Ctrl+C pour arrêter.")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        runner.shutdown()
+    return 0
+
+
+def cmd_du(args: argparse.Namespace) -> int:
+    installs = list_aliux_installs()
+    usage = compute_disk_usage(installs, job=_cli_job("Occupation disque"))
+    if args.json:
+        print(json.dumps({i["desktop_path"]: dict(name=i["name"], **usage.get(i["desktop_path"], {})) for i in installs}, indent=2))
+        return 0
+
+    _cli_log(f"{'Application':30} {'AppImage':>10} {'Extraite':>10} {'Anciennes':>10} {'Icône':>10} {'Total':>10}")
+    totals = {"appimage": 0, "extracted": 0, "older": 0, "icons": 0, "total": 0}
+    rows = sorted(installs, key=lambda i: usage.get(i["desktop_path"], {}).get("total", 0), reverse=True)
+    for item in rows:
+        u = usage.get(item["desktop_path"])
+        if not u:
+            continue
+        for k in totals:
+            totals[k] += u[k]
+        print(
+            f"{item['name'][:30]:30} {format_bytes(u['appimage']):>10} {format_bytes(u['extracted']):>10} "
+            f"{format_bytes(u['older']):>10} {format_bytes(u['icons']):>10} {format_bytes(u['total']):>10}"
+        )
+    print(
+        f"{'TOTAL (' + str(len(rows)) + ')':30} {format_bytes(totals['appimage']):>10} {format_bytes(totals['extracted']):>10} "
+        f"{format_bytes(totals['older']):>10} {format_bytes(totals['icons']):>10} {format_bytes(totals['total']):>10}"
+    )
+    return 0
 
-            desktop_path = os.path.join(DESKTOP_DIR, "aliux.desktop")
 
-            appimage_src = os.environ.get("APPIMAGE")
-            if appimage_src and os.path.isfile(appimage_src):
-                # Copie en local (mise à jour incluse) +x garanti + remplacement atomique
-                local_appimage = ensure_self_local_copy()
-                if not local_appimage or not os.path.isfile(local_appimage):
-                    raise RuntimeError("Impossible de copier Aliux dans ~/Applications/Aliux/.")
+def select_installs(names: list[str]) -> list[dict]:
+    """Applis installées désignées par leur nom ou leur slug (toutes si `names` est vide)."""
+    installs = list_aliux_installs()
+    if not names:
+        return installs
+    wanted = {n.casefold() for n in names} | {slugify(n) for n in names}
+    return [i for i in installs if i["name"].casefold() in wanted or slugify(i["name"]) in wanted]
 
-                exec_value = f'"{local_appimage}" %U'
-                self.log(f"✅ Aliux installé / mis à jour : {local_appimage}")
-            else:
-                # Mode script (dev)
-                script_path = os.path.abspath(__file__)
-                exec_value = f'python3 "{script_path}"'
-                self.log("ℹ️ Mode script détecté (APPIMAGE absent). Lanceur en mode dev.")
-
-            desktop_content = (
-                "[Desktop Entry]\n"
-                "Type=Application\n"
-                "Name=Aliux\n"
-                "Comment=Installateur AppImage local\n"
-                f"Exec={exec_value}\n"
-                f"Icon={icon_dst if icon_dst else 'application-x-executable'}\n"
-                "Terminal=false\n"
-                "Categories=Utility;\n"
-                "StartupNotify=true\n"
-                "X-Aliux-Self=true\n"
+
+def cmd_update(args: argparse.Namespace) -> int:
+    installs = select_installs(args.names)
+    if not installs:
+        print("Aucune application correspondante.", file=sys.stderr)
+        return 1
+    rc = 0
+    for item in installs:
+        try:
+            r = update_app(_cli_job(f"Mise à jour {item['name']}"), item, check_only=args.check)
+        except Exception as e:
+            _cli_log(f"❌ {item['name']} : {e}")
+            rc = 1
+            continue
+        status = r["status"]
+        if status == "no-update-info":
+            _cli_log(f"–  {item['name']} : pas d’informations de mise à jour")
+        elif status == "up-to-date":
+            _cli_log(f"✔  {item['name']} : à jour")
+        elif status == "available":
+            _cli_log(f"⬆  {item['name']} : mise à jour disponible ({format_bytes(r['length'])})")
+        else:
+            _cli_log(
+                f"✅ {item['name']} : mis à jour — {format_bytes(r['reused'])} réutilisés, "
+                f"{format_bytes(r['downloaded'])} téléchargés sur {format_bytes(r['length'])}"
             )
+    return rc
 
-            with open(desktop_path, "w", encoding="utf-8") as f:
-                f.write(desktop_content)
 
-            try:
-                subprocess.run(
-                    ["update-desktop-database", DESKTOP_DIR],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    check=False,
-                )
-            except Exception:
-                pass
+def cmd_export(args: argparse.Namespace) -> int:
+    manifest = export_manifest(_cli_job("Export"), args.manifest)
+    _cli_log(f"Manifeste écrit : {args.manifest} ({len(manifest['apps'])} application(s))")
+    return 0
 
-            self.log(f"✅ Lanceur Aliux créé : {desktop_path}")
 
-            messagebox.showinfo(
-                "Aliux",
-                "Aliux a été ajouté au menu des applications.\n\n"
-                "Le lanceur pointe vers la copie locale (~/Applications/Aliux/Aliux.AppImage) lorsqu'Aliux est lancé en AppImage.",
+def cmd_replay(args: argparse.Namespace) -> int:
+    r = replay_manifest(
+        _cli_job("Rejeu"), args.manifest, args.source,
+        install_dir=os.path.expanduser(args.install_dir), workers=args.jobs, log=_cli_log,
+    )
+    _cli_log(
+        f"Installées : {len(r['installed'])} — identiques : {len(r['skipped'])} — "
+        f"introuvables : {len(r['missing'])} — en échec : {len(r['failed'])}"
+    )
+    return 1 if (r["missing"] or r["failed"]) else 0
+
+
+def cmd_relocate(args: argparse.Namespace) -> int:
+    if not args.target and not load_relocate_state():
+        print("Aucun déplacement interrompu à reprendre.", file=sys.stderr)
+        return 1
+    r = relocate_installs(_cli_job("Déplacement"), args.target, workers=args.jobs, log=_cli_log)
+    for e in r["errors"]:
+        print(f"erreur : {e}", file=sys.stderr)
+    _cli_log(f"{len(r['moved'])} application(s) déplacée(s) vers {r['target']}")
+    return 1 if r["errors"] else 0
+
+
+def _fmt_ms(stats: dict | None, key: str) -> str:
+    return f"{stats[key] * 1000:.0f}" if stats else "—"
+
+
+def _print_bench(rec: dict) -> None:
+    load = f", charge {rec['load']}" if rec.get("load") else ""
+    print(f"{rec['name']}  ({rec['time']}, {format_bytes(rec['size'])}, {rec.get('compression') or '?'}{load})")
+    print(f"  {'':6} {'':7} {'n':>3} {'min':>7} {'p50':>7} {'p90':>7} {'max':>7}  (ms)")
+    for phase, label in (("cold", "froid"), ("warm", "chaud")):
+        for key, klabel in (("mount", "montage"), ("ready", "prêt")):
+            st = rec[phase][key]
+            print(
+                f"  {label:6} {klabel:7} {st['n'] if st else 0:>3} {_fmt_ms(st, 'min'):>7} {_fmt_ms(st, 'p50'):>7} "
+                f"{_fmt_ms(st, 'p90'):>7} {_fmt_ms(st, 'max'):>7}"
+                + (f"  [{', '.join(rec[phase]['methods'])}]" if key == "ready" else "")
             )
 
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    if args.history:
+        history = load_bench_history(args.names)
+        for rec in history:
+            _print_bench(rec)
+        return 0 if history else 1
+    installs = select_installs(args.names)
+    if not installs:
+        print("Aucune application correspondante.", file=sys.stderr)
+        return 1
+    rc = 0
+    for item in installs:
+        try:
+            rec = bench_app(
+                _cli_job("Mesure"), item, cold_runs=args.cold, warm_runs=args.warm, timeout=args.timeout,
+                load=args.under_load,
+            )
         except Exception as e:
-            self.log(f"❌ Erreur installation lanceur Aliux : {e}")
-            messagebox.showerror("Aliux", f"Impossible de créer le lanceur Aliux.\n\n{e}")
+            _cli_log(f"❌ {item['name']} : {e}")
+            rc = 1
+            continue
+        _print_bench(rec)
+    return rc
+
+
+def cmd_verify(args: argparse.Namespace) -> int:
+    installs = select_installs(args.names)
+    if not installs:
+        print("Aucune application correspondante.", file=sys.stderr)
+        return 1
+    results = verify_installs(
+        _cli_job("Vérification"), installs, full=args.full, record=args.record, workers=args.jobs
+    )
+    for r in results:
+        line = f"{_VERIFY_LABELS[r['status']]:22} {r['name'][:30]:30} {r['path'] or ''}"
+        print(line + (f" ({r['error']})" if r["error"] else ""))
+    bad = [r for r in results if r["status"] in ("modified", "missing", "error")]
+    unrecorded = sum(1 for r in results if r["status"] == "unrecorded")
+    if unrecorded:
+        print(f"{unrecorded} installation(s) sans empreinte : « aliux verify --record » pour l'enregistrer.")
+    return 1 if bad else 0
+
+
+def cmd_adopt(args: argparse.Namespace) -> int:
+    r = adopt_appimages(
+        _cli_job("Adoption"), args.dirs or None, recursive=args.recursive, move=args.move,
+        install_dir=os.path.expanduser(args.install_dir), dry_run=args.dry_run, workers=args.jobs, log=_cli_log,
+    )
+    if args.dry_run:
+        for item in r["adopted"]:
+            print(f"{item['name'][:30]:30} {item['path']}")
+    for e in r["errors"]:
+        print(f"erreur : {e}", file=sys.stderr)
+    verb = "à adopter" if args.dry_run else "adoptée(s)"
+    _cli_log(f"{len(r['adopted'])} AppImage {verb}.")
+    return 1 if r["errors"] else 0
+
+
+def cmd_install(args: argparse.Namespace) -> int:
+    src = args.source if is_http_url(args.source) else os.path.abspath(os.path.expanduser(args.source))
+    filename = os.path.basename(urllib.parse.urlsplit(src).path) if is_http_url(src) else os.path.basename(src)
+    name = args.name or name_from_filename(urllib.parse.unquote(filename))
+    try:
+        info = install_appimage(
+            _cli_job(f"Installation {name}"), src, name, desc=args.comment or "",
+            categories=CATEGORY_MAP.get(args.category, "Utility;"),
+            install_dir=os.path.expanduser(args.install_dir), extract_icon=not args.no_icon, log=_cli_log,
+        )
+    except JobCancelled:
+        _cli_log("Installation annulée.")
+        return 130
+    except Exception as e:
+        _cli_log(f"❌ {name} : {e}")
+        return 1
+    _cli_log(f"✅ Installé : {info['name']} -> {info['appimage_path']}")
+    codec = args.recompress or load_config().get("recompress")
+    if codec and codec != "none":
+        try:
+            recompress_appimage(_cli_job(f"Recompression {name}"), info, codec=codec, log=_cli_log)
+        except JobCancelled:
+            _cli_log("Recompression annulée.")
+        except Exception as e:
+            _cli_log(f"⚠️ Recompression : {e}")
+    return 0
+
+
+def _print_recompress(name: str, r: dict) -> None:
+    if r["status"] == "unchanged":
+        print(f"=  {name} : déjà en {r['codec']}")
+        return
+    delta = (r["size_after"] - r["size_before"]) * 100 / max(1, r["size_before"])
+    print(
+        f"✅ {name} : {r['compression']} {format_bytes(r['size_before'])} → {r['codec']} "
+        f"{format_bytes(r['size_after'])} ({delta:+.0f} %)"
+    )
+    if r["bench_before"] and r["bench_after"]:
+        for phase, label in (("cold", "à froid"), ("warm", "à chaud")):
+            before, after = r["bench_before"][phase]["ready"], r["bench_after"][phase]["ready"]
+            print(f"   prêt {label} (p50) : {_fmt_ms(before, 'p50')} → {_fmt_ms(after, 'p50')} ms")
+
+
+def cmd_recompress(args: argparse.Namespace) -> int:
+    if not recompress_available():
+        print("unsquashfs et mksquashfs sont requis (paquet squashfs-tools).", file=sys.stderr)
+        return 1
+    installs = select_installs(args.names)
+    if not installs:
+        print("Aucune application correspondante.", file=sys.stderr)
+        return 1
+    rc = 0
+    for item in installs:
+        try:
+            r = recompress_appimage(
+                _cli_job(f"Recompression {item['name']}"), item, codec=args.codec, bench=args.bench,
+                cold_runs=args.cold, warm_runs=args.warm,
+            )
+        except JobCancelled:
+            _cli_log("Recompression annulée.")
+            return 130
+        except Exception as e:
+            _cli_log(f"❌ {item['name']} : {e}")
+            rc = 1
+            continue
+        _print_recompress(item["name"], r)
+    return rc
+
+
+def cmd_repo(args: argparse.Namespace) -> int:
+    root = args.dir or repo_dir()
+    if not root:
+        print("Aucun dépôt : indiquez un dossier ou « repo_dir » dans la configuration.", file=sys.stderr)
+        return 1
+    if not os.path.isdir(os.path.expanduser(root)):
+        print(f"Dossier introuvable : {root}", file=sys.stderr)
+        return 1
+    index = RepoIndex(root)
+    t0 = time.perf_counter()
+    stats = index.refresh(_cli_job("Dépôt"), workers=args.jobs)
+    apps = index.apps()
+    _cli_log(
+        f"Dépôt {index.root} : {len(apps)} AppImage — {len(stats['added'])} nouvelle(s), "
+        f"{len(stats['changed'])} modifiée(s), {len(stats['removed'])} retirée(s) "
+        f"({(time.perf_counter() - t0) * 1000:.0f} ms)"
+    )
+    if not (args.updates or args.apply):
+        if args.json:
+            print(json.dumps(apps, indent=2, ensure_ascii=False))
+        else:
+            for app in index.latest().values():
+                print(f"{app['name'][:30]:30} {app['version'] or '?':>14} {format_bytes(app['size']):>10}  {app['path']}")
+        return 0
+
+    updates = repo_updates(index)
+    if args.json and not args.apply:
+        print(json.dumps(
+            [{"name": u["item"]["name"], "installed": u["installed"], "available": u["available"]} for u in updates],
+            indent=2, ensure_ascii=False,
+        ))
+        return 0
+    rc = 0
+    for u in updates:
+        item, avail = u["item"], u["available"]
+        _cli_log(f"⬆  {item['name']} : {u['installed'] or '?'} → {avail['version'] or '?'}")
+        if not args.apply:
+            continue
+        try:
+            update_from_repo(_cli_job(f"Mise à jour {item['name']}"), item, avail, log=_cli_log)
+            _cli_log(f"✅ {item['name']} : mis à jour depuis le dépôt")
+        except Exception as e:
+            _cli_log(f"❌ {item['name']} : {e}")
+            rc = 1
+    if not updates:
+        _cli_log("Toutes les applications du dépôt sont à jour.")
+    return rc
+
+
+def build_cli_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="aliux",
+        description="Aliux en ligne de commande (sans argument : interface graphique).",
+    )
+    parser.add_argument("--version", action="version", version=f"{APP_TITLE} {APP_VERSION}")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("housekeeping", help="supprimer les restes de copies/extractions interrompues")
+    p.add_argument("--dry-run", action="store_true", help="lister sans rien supprimer")
+    p.add_argument(
+        "--orphan-apps",
+        action="store_true",
+        help="supprimer aussi les dossiers d'applications sans lanceur",
+    )
+    p.set_defaults(func=cmd_housekeeping, background=True)
+
+    p = sub.add_parser("watch", help="installer automatiquement les AppImage arrivant dans des dossiers")
+    p.add_argument("dirs", nargs="*", help="dossiers à surveiller (défaut : configuration ou Téléchargements)")
+    p.add_argument("--install-dir", default=DEFAULT_INSTALL_DIR, help="dossier d'installation")
+    p.add_argument("--settle", type=float, default=None, help="secondes sans changement avant installation")
+    p.add_argument("--poll", action="store_true", help="scrutation périodique au lieu d'inotify")
+    p.add_argument("--existing", action="store_true", help="installer aussi les AppImage déjà présentes")
+    p.set_defaults(func=cmd_watch, background=True)
+
+    p = sub.add_parser("install", help="installer une AppImage (fichier local ou URL http(s))")
+    p.add_argument("source", help="fichier AppImage ou URL d'un miroir (téléchargement avec reprise)")
+    p.add_argument("--name", default=None, help="nom de l'application (défaut : tiré du nom de fichier)")
+    p.add_argument("--comment", default=None, help="description")
+    p.add_argument("--category", default="Utilitaire", choices=sorted(CATEGORY_MAP), help="catégorie")
+    p.add_argument("--install-dir", default=DEFAULT_INSTALL_DIR, help="dossier d'installation")
+    p.add_argument("--no-icon", action="store_true", help="ne pas extraire l'icône")
+    p.add_argument(
+        "--recompress", choices=(*RECOMPRESS_CODECS, "none"), default=None,
+        help="recompresser après l'installation (défaut : « recompress » de la configuration)",
+    )
+    p.set_defaults(func=cmd_install)
+
+    p = sub.add_parser("recompress", help="recompresser les AppImage installées (zstd, lz4)")
+    p.add_argument("names", nargs="*", metavar="NOM", help="applications (toutes par défaut)")
+    p.add_argument("--codec", choices=tuple(RECOMPRESS_CODECS), default="zstd", help="compression du squashfs")
+    p.add_argument("--bench", action="store_true", help="mesurer le temps de lancement avant et après")
+    p.add_argument("--cold", type=int, default=3, help="lancements à froid par mesure")
+    p.add_argument("--warm", type=int, default=5, help="lancements à chaud par mesure")
+    p.set_defaults(func=cmd_recompress, background=True)
+
+    p = sub.add_parser("du", help="occupation disque des applications installées")
+    p.add_argument("--json", action="store_true", help="sortie JSON")
+    p.set_defaults(func=cmd_du, background=True)
+
+    p = sub.add_parser("update", help="mise à jour différentielle (zsync) des applications installées")
+    p.add_argument("names", nargs="*", help="applications (nom ou slug ; toutes par défaut)")
+    p.add_argument("--check", action="store_true", help="vérifier seulement la disponibilité")
+    p.set_defaults(func=cmd_update)
+
+    p = sub.add_parser("export", help="exporter les applications installées dans un manifeste")
+    p.add_argument("manifest", help="fichier manifeste (JSON) à écrire")
+    p.set_defaults(func=cmd_export, background=True)
+
+    p = sub.add_parser("replay", help="installer les applications d'un manifeste depuis un dossier")
+    p.add_argument("manifest", help="manifeste produit par « aliux export »")
+    p.add_argument("source", help="dossier contenant les AppImage (recherchées par empreinte)")
+    p.add_argument("--install-dir", default=DEFAULT_INSTALL_DIR, help="dossier d'installation")
+    p.add_argument("--jobs", type=int, default=None, help="installations en parallèle")
+    p.set_defaults(func=cmd_replay, background=True)
+
+    p = sub.add_parser("relocate", help="déplacer les applications installées vers un autre dossier")
+    p.add_argument("target", nargs="?", help="nouveau dossier d'installation (sans argument : reprise)")
+    p.add_argument("--jobs", type=int, default=None, help="copies en parallèle (autre disque)")
+    p.set_defaults(func=cmd_relocate, background=True)
+
+    p = sub.add_parser("bench", help="mesurer le temps de lancement des applications")
+    p.add_argument("names", nargs="*", metavar="NOM", help="applications (toutes par défaut)")
+    p.add_argument("--cold", type=int, default=3, help="lancements à froid (cache disque vidé pour l'AppImage)")
+    p.add_argument("--warm", type=int, default=5, help="lancements à chaud")
+    p.add_argument("--timeout", type=float, default=30.0, help="délai maximal par lancement (s)")
+    p.add_argument("--history", action="store_true", help="afficher les mesures précédentes")
+    p.add_argument(
+        "--under-load", choices=("normal", "background"), default=None,
+        help="mesurer sous une charge disque/CPU, à priorité normale ou de tâche de fond",
+    )
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("verify", help="vérifier l'intégrité des AppImage installées (SHA-256)")
+    p.add_argument("names", nargs="*", metavar="NOM", help="applications (toutes par défaut)")
+    p.add_argument("--full", action="store_true", help="tout relire, même les fichiers inchangés")
+    p.add_argument("--record", action="store_true", help="enregistrer l'empreinte des installations qui n'en ont pas")
+    p.add_argument("--jobs", type=int, default=None, help="fichiers hachés en parallèle (défaut : nombre de cœurs)")
+    p.set_defaults(func=cmd_verify, background=True)
+
+    p = sub.add_parser("adopt", help="créer les lanceurs des AppImage déjà présentes sur le disque")
+    p.add_argument("dirs", nargs="*", metavar="DOSSIER", help="dossiers à parcourir (défaut : ~/Applications, Téléchargements)")
+    p.add_argument("--recursive", action="store_true", help="parcourir aussi les sous-dossiers")
+    p.add_argument("--move", action="store_true", help="déplacer les AppImage dans le dossier d'installation")
+    p.add_argument("--install-dir", default=DEFAULT_INSTALL_DIR, help="dossier d'installation (avec --move)")
+    p.add_argument("--dry-run", action="store_true", help="lister sans rien créer")
+    p.add_argument("--jobs", type=int, default=None, help="analyses en parallèle")
+    p.set_defaults(func=cmd_adopt, background=True)
+
+    p = sub.add_parser("repo", help="indexer un dépôt local d'AppImage et lister les mises à jour")
+    p.add_argument("dir", nargs="?", metavar="DOSSIER", help="dépôt (défaut : « repo_dir » de la configuration)")
+    p.add_argument("--updates", action="store_true", help="lister les applications installées à mettre à jour")
+    p.add_argument("--apply", action="store_true", help="installer ces mises à jour")
+    p.add_argument("--jobs", type=int, default=None, help="analyses en parallèle")
+    p.add_argument("--json", action="store_true", help="sortie JSON")
+    p.set_defaults(func=cmd_repo, background=True)
+
+    parser.commands = set(sub.choices)  # type: ignore[attr-defined]
+    return parser
+
+
+def is_cli_invocation(argv: list[str]) -> bool:
+    """Vrai si argv désigne une sous-commande (les lanceurs passent des fichiers via %U)."""
+    if not argv:
+        return False
+    return argv[0] in ("-h", "--help", "--version") or argv[0] in build_cli_parser().commands  # type: ignore[attr-defined]
+
+
+def cli_main(argv: list[str]) -> int:
+    args = build_cli_parser().parse_args(argv)
+    try:
+        for e in recover_journal(log=_cli_log)["errors"]:
+            _cli_log(f"⚠️ Journal : {e}")
+    except OSError as e:
+        LOG.warning("Reprise du journal impossible : %s", e)
+    if getattr(args, "background", False):
+        # Commandes de fond: le thread principal et tout ce qu'il crée (pools, sous-processus)
+        apply_thread_priority(background_priority())
+    try:
+        return args.func(args)
+    finally:
+        METRICS.flush(force=True)
 
 
 if __name__ == "__main__":
@@ -1307,5 +8283,13 @@ if __name__ == "__main__":
         )
         raise SystemExit(1)
 
+    logging.basicConfig(
+        level=os.environ.get("ALIUX_LOG_LEVEL", "WARNING").upper(),
+        format="%(asctime)s %(name)s %(levelname)s %(message)s",
+    )
+
+    if is_cli_invocation(sys.argv[1:]):
+        raise SystemExit(cli_main(sys.argv[1:]))
+
     app = AliuxApp()
     app.mainloop()
@@ -0,0 +1,115 @@
+"""Outils communs aux tests: HOME temporaire et serveur HTTP local avec requêtes Range."""
+
+import http.server
+import os
+import re
+import sys
+import tempfile
+import threading
+
+import pytest
+
+# Aliux calcule ses chemins (~/.local/share/aliux…) à l'import: HOME isolé avant l'import
+os.environ["HOME"] = tempfile.mkdtemp(prefix="aliux-tests-home-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Sert les fichiers de server.root (GET, Range, If-Range, ETag) en HTTP/1.1 keep-alive.
+
+    - /redirect/<nom> répond 302 vers /<nom>;
+    - server.cut[nom] = n: la prochaine réponse pour <nom> est coupée après n octets.
+    """
+
+    protocol_version = "HTTP/1.1"
+    validators = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        srv.requests.append((self.path, self.headers.get("Range"), self.headers.get("If-Range")))
+        if self.path.startswith("/redirect/"):
+            self.send_response(302)
+            self.send_header("Location", "/" + self.path[len("/redirect/"):])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        name = self.path.lstrip("/")
+        path = os.path.join(srv.root, name)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        st = os.stat(path)
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        start, end, status = 0, len(data) - 1, 200
+        m = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if m and self.headers.get("If-Range", etag) == etag:
+            start = int(m.group(1))
+            end = min(int(m.group(2)), len(data) - 1) if m.group(2) else len(data) - 1
+            status = 206
+        body = data[start : end + 1]
+        self.send_response(status)
+        self.send_header("Accept-Ranges", "bytes")
+        if self.validators:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.end_headers()
+        cut = srv.cut.pop(name, None)
+        if cut is not None:
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class NoValidatorHandler(RangeHandler):
+    """Comme RangeHandler, sans ETag ni Last-Modified (If-Range inutilisable)."""
+
+    validators = False
+
+
+def _serve(tmp_path, handler):
+    root = tmp_path / "www"
+    root.mkdir()
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    srv.daemon_threads = True
+    srv.root = str(root)
+    srv.requests = []
+    srv.cut = {}
+    srv.url = lambda name: f"http://127.0.0.1:{srv.server_address[1]}/{name}"
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield srv
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+@pytest.fixture
+def http_server(tmp_path):
+    """Serveur local: `root` (dossier servi), `url(nom)`, `requests` (chemin, Range, If-Range)."""
+    yield from _serve(tmp_path, RangeHandler)
+
+
+@pytest.fixture
+def http_server_no_validators(tmp_path):
+    """Comme http_server, pour un miroir qui n'envoie aucun validateur."""
+    yield from _serve(tmp_path, NoValidatorHandler)
+
+
+@pytest.fixture
+def pool():
+    """Pool de connexions propre au test (pas de connexion gardée d'un serveur arrêté)."""
+    import aliux
+
+    p = aliux.HTTPPool()
+    yield p
+    p.close()
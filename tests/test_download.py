@@ -0,0 +1,163 @@
+"""Téléchargements depuis un miroir HTTP (reprise, If-Range, segments, redirections)."""
+
+import hashlib
+import os
+import random
+
+import pytest
+
+import aliux
+
+
+def _publish(server, data: bytes, name: str = "app.AppImage") -> str:
+    with open(os.path.join(server.root, name), "wb") as f:
+        f.write(data)
+    return server.url(name)
+
+
+def _ranges(server, name: str = "app.AppImage") -> list[str]:
+    """En-têtes Range des requêtes de téléchargement (sonde « bytes=0-0 » exclue)."""
+    return [r for p, r, _i in server.requests if p == f"/{name}" and r != "bytes=0-0"]
+
+
+def _cancel_after(limit: int):
+    def _progress(done: int, _total: int):
+        if done >= limit:
+            raise aliux.JobCancelled("test")
+
+    return _progress
+
+
+def test_resume_after_interruption(http_server, pool, tmp_path):
+    data = random.Random(1).randbytes(3 * 1024 * 1024 + 17)
+    url = _publish(http_server, data)
+    part = str(tmp_path / ".aliux-part-app")
+
+    with pytest.raises(aliux.JobCancelled):
+        aliux.download_file(url, part, progress=_cancel_after(1024 * 1024), segments=1, pool=pool)
+    assert os.path.exists(part + ".json")
+
+    digest = hashlib.sha256()
+    r = aliux.download_file(url, part, sink=digest.update, segments=1, pool=pool)
+
+    assert r["resumed"] >= 1024 * 1024
+    assert _ranges(http_server)[-1] == f"bytes={r['resumed']}-{len(data) - 1}"
+    with open(part, "rb") as f:
+        assert f.read() == data
+    # Le sink reçoit aussi la partie reprise, dans l'ordre
+    assert digest.hexdigest() == hashlib.sha256(data).hexdigest()
+    assert not os.path.exists(part + ".json")
+
+
+def test_dropped_connection_is_retried_with_range(http_server, pool, tmp_path):
+    data = random.Random(2).randbytes(2 * 1024 * 1024)
+    url = _publish(http_server, data)
+    probe = aliux.http_probe(url, pool)
+    http_server.cut["app.AppImage"] = 300 * 1024
+    part = str(tmp_path / ".aliux-part-app")
+
+    aliux.download_file(url, part, segments=1, probe=probe, pool=pool)
+
+    with open(part, "rb") as f:
+        assert f.read() == data
+    first, retry = _ranges(http_server)
+    assert first == f"bytes=0-{len(data) - 1}"
+    assert int(retry[len("bytes="):].split("-")[0]) > 0
+
+
+def test_changed_file_is_not_resumed(http_server, pool, tmp_path):
+    rng = random.Random(3)
+    old = rng.randbytes(2 * 1024 * 1024)
+    url = _publish(http_server, old)
+    part = str(tmp_path / ".aliux-part-app")
+    stale_probe = aliux.http_probe(url, pool)
+    with pytest.raises(aliux.JobCancelled):
+        aliux.download_file(url, part, progress=_cancel_after(512 * 1024), segments=1, probe=stale_probe, pool=pool)
+
+    new = rng.randbytes(2 * 1024 * 1024 + 5)
+    _publish(http_server, new)
+
+    # If-Range avec l'ancien validateur: le serveur renvoie tout le fichier (200)
+    with pytest.raises(aliux.DownloadError):
+        aliux.download_file(url, part, segments=1, probe=stale_probe, pool=pool)
+    assert http_server.requests[-1][2] == stale_probe["etag"]
+    assert not os.path.exists(part + ".json")
+
+    # Nouvelle sonde: validateurs différents, le téléchargement repart de zéro
+    r = aliux.download_file(url, part, segments=1, pool=pool)
+    assert r["resumed"] == 0
+    with open(part, "rb") as f:
+        assert f.read() == new
+
+
+def test_segmented_download(http_server, pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(aliux, "DOWNLOAD_SEGMENT_MIN", 256 * 1024)
+    data = random.Random(4).randbytes(2 * 1024 * 1024 + 3)
+    url = _publish(http_server, data)
+    part = str(tmp_path / ".aliux-part-app")
+    digest = hashlib.sha256()
+
+    r = aliux.download_file(url, part, sink=digest.update, segments=4, pool=pool)
+
+    assert r["length"] == len(data)
+    ranges = _ranges(http_server)
+    assert len(ranges) == 4 and len(set(ranges)) == 4
+    with open(part, "rb") as f:
+        assert f.read() == data
+    assert digest.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_redirect_is_followed(http_server, pool, tmp_path):
+    data = random.Random(5).randbytes(100 * 1024)
+    _publish(http_server, data)
+    url = http_server.url("redirect/app.AppImage")
+
+    probe = aliux.http_probe(url, pool)
+    assert probe["url"] == http_server.url("app.AppImage")
+    assert probe["ranges"] and probe["length"] == len(data)
+
+    part = str(tmp_path / ".aliux-part-app")
+    r = aliux.download_file(url, part, segments=1, probe=probe, pool=pool)
+    assert r["url"] == http_server.url("app.AppImage")
+    with open(part, "rb") as f:
+        assert f.read() == data
+
+
+def test_without_validators(http_server_no_validators, pool, tmp_path):
+    server = http_server_no_validators
+    data = random.Random(6).randbytes(2 * 1024 * 1024)
+    url = _publish(server, data)
+    part = str(tmp_path / ".aliux-part-app")
+    probe = aliux.http_probe(url, pool)
+    assert probe["ranges"] and not probe["etag"] and not probe["last_modified"]
+
+    # Rien ne prouve que le fichier est le même au lancement suivant: pas d'état de reprise
+    with pytest.raises(aliux.JobCancelled):
+        aliux.download_file(url, part, progress=_cancel_after(512 * 1024), segments=1, probe=probe, pool=pool)
+    assert not os.path.exists(part + ".json")
+
+    # Dans un même lancement, la nouvelle tentative reprend avec un simple Range
+    server.requests.clear()
+    server.cut["app.AppImage"] = 300 * 1024
+    r = aliux.download_file(url, part, segments=1, probe=probe, pool=pool)
+
+    assert r["resumed"] == 0
+    with open(part, "rb") as f:
+        assert f.read() == data
+    first, retry = _ranges(server)
+    assert first == f"bytes=0-{len(data) - 1}"
+    assert int(retry[len("bytes="):].split("-")[0]) > 0
+    assert all(if_range is None for _p, _r, if_range in server.requests)
+
+
+def test_segmented_download_without_validators(http_server_no_validators, pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(aliux, "DOWNLOAD_SEGMENT_MIN", 256 * 1024)
+    data = random.Random(7).randbytes(1024 * 1024 + 9)
+    url = _publish(http_server_no_validators, data)
+    part = str(tmp_path / ".aliux-part-app")
+
+    aliux.download_file(url, part, segments=3, pool=pool)
+
+    assert len(_ranges(http_server_no_validators)) == 3
+    with open(part, "rb") as f:
+        assert f.read() == data
@@ -0,0 +1,163 @@
+"""Mises à jour différentielles zsync contre un serveur HTTP local (requêtes Range)."""
+
+import hashlib
+import os
+import random
+import time
+
+import pytest
+
+import aliux
+
+
+def make_zsync(data: bytes, blocksize: int, hash_lengths=(2, 4, 16), url: str = "") -> bytes:
+    """Fichier de contrôle au format de zsyncmake (dernier bloc complété par des zéros)."""
+    seq, rsum_bytes, checksum_bytes = hash_lengths
+    head = (
+        f"zsync: 0.6.2\nFilename: app.AppImage\nBlocksize: {blocksize}\nLength: {len(data)}\n"
+        f"Hash-Lengths: {seq},{rsum_bytes},{checksum_bytes}\nURL: {url}\n"
+        f"SHA-1: {hashlib.sha1(data).hexdigest()}\n\n"
+    ).encode()
+    body = bytearray()
+    for off in range(0, len(data), blocksize):
+        block = data[off : off + blocksize].ljust(blocksize, b"\0")
+        a, b = aliux.zsync_rsum(block)
+        body += ((a << 16) | b).to_bytes(4, "big")[4 - rsum_bytes :]
+        body += aliux.md4(block)[:checksum_bytes]
+    return head + bytes(body)
+
+
+def _publish(server, data: bytes, blocksize: int, hash_lengths) -> str:
+    with open(os.path.join(server.root, "app.AppImage"), "wb") as f:
+        f.write(data)
+    with open(os.path.join(server.root, "app.AppImage.zsync"), "wb") as f:
+        f.write(make_zsync(data, blocksize, hash_lengths, url="app.AppImage"))
+    return server.url("app.AppImage.zsync")
+
+
+def test_md4_matches_rfc1320():
+    assert aliux._md4_py(b"").hex() == "31d6cfe0d16ae931b73c59d7e0c089c0"
+    assert aliux._md4_py(b"abc").hex() == "a448017aaf21d8525fc10ae87aa6729d"
+    block = random.Random(0).randbytes(4096)
+    assert aliux.md4(block) == aliux._md4_py(block)
+
+
+def test_rsum_matches_definition():
+    block = random.Random(0).randbytes(2048)
+    n = len(block)
+    assert aliux.zsync_rsum(block) == (sum(block) & 0xFFFF, sum((n - i) * c for i, c in enumerate(block)) & 0xFFFF)
+
+
+@pytest.mark.parametrize("hash_lengths", [(1, 4, 16), (2, 2, 5)])
+def test_update_downloads_only_changed_blocks(http_server, tmp_path, hash_lengths):
+    rng = random.Random(1)
+    bs = 2048
+    old = rng.randbytes(256 * bs)
+    # Point release: quelques blocs modifiés et un décalage (octets insérés)
+    new = bytearray(old)
+    new[10 * bs : 12 * bs] = rng.randbytes(2 * bs)
+    new[100 * bs + 7 : 100 * bs + 7] = b"inserted"
+    new = bytes(new)
+    url = _publish(http_server, new, bs, hash_lengths)
+    installed = tmp_path / "app.AppImage"
+    installed.write_bytes(old)
+
+    result = aliux.zsync_update_file(aliux.Job("test"), str(installed), url)
+
+    assert result["status"] == "updated"
+    assert installed.read_bytes() == new
+    assert result["sha256"] == hashlib.sha256(new).hexdigest()
+    assert result["downloaded"] < 8 * bs
+    assert result["reused"] + result["downloaded"] == len(new)
+    assert all(rng_hdr for path, rng_hdr, _ in http_server.requests if path == "/app.AppImage")
+
+
+def test_shifted_regions_are_found_after_large_changes(monkeypatch):
+    # Fenêtre de somme glissante réduite: une suppression et un remplacement plus longs
+    # qu'elle ne doivent pas empêcher de retrouver les zones décalées qui suivent.
+    monkeypatch.setattr(aliux, "ZSYNC_ROLL_WINDOW", 8 * 1024)
+    monkeypatch.setattr(aliux, "ZSYNC_PROBE_SPACING", 32 * 1024)
+    rng = random.Random(6)
+    bs = 1024
+    old = rng.randbytes(1024 * bs)
+    new = bytearray(old)
+    new[100 * bs + 3 : 100 * bs + 3] = b"x" * 5                    # insertion
+    del new[300 * bs : 300 * bs + 40_000]                           # suppression > fenêtre
+    new[500 * bs : 560 * bs] = rng.randbytes(60 * bs + 777)         # remplacement > fenêtre
+    del new[800 * bs + 11 : 800 * bs + 20]                          # suppression
+    new = bytes(new)
+    ctrl = aliux.parse_zsync(make_zsync(new, bs, (2, 2, 5)))
+
+    found = aliux.zsync_match_blocks(old, ctrl)
+
+    assert all(old[p : p + bs] == new[t * bs : (t + 1) * bs] for t, p in found.items())
+    # Blocs non réutilisables: ceux qui chevauchent une des 4 modifications
+    assert len(found) >= len(ctrl["checksums"]) - 70 - 4 * 2
+
+
+def test_unrelated_seed_is_not_scanned_byte_by_byte():
+    # 32 Mio sans aucun bloc commun: positions alignées + deux fenêtres seulement
+    rng = random.Random(7)
+    ctrl = aliux.parse_zsync(make_zsync(rng.randbytes(1024 * 1024), 4096, (2, 2, 5)))
+    seed = rng.randbytes(32 * 1024 * 1024)
+    t0 = time.monotonic()
+    assert aliux.zsync_match_blocks(seed, ctrl) == {}
+    assert time.monotonic() - t0 < 10  # ~25 s avec la somme glissante sur tout le fichier
+
+
+def test_without_seed_everything_is_downloaded(http_server, tmp_path):
+    data = random.Random(8).randbytes(64 * 1024)
+    url = _publish(http_server, data, 2048, (2, 2, 5))
+    installed = tmp_path / "app.AppImage"
+    installed.write_bytes(data[:-1] + b"!")
+
+    result = aliux.zsync_update_file(aliux.Job("test"), str(installed), url, use_seed=False)
+
+    assert result["downloaded"] == len(data) and result["reused"] == 0
+    assert installed.read_bytes() == data
+
+
+def test_up_to_date_downloads_nothing(http_server, tmp_path):
+    data = random.Random(2).randbytes(64 * 1024 + 123)
+    url = _publish(http_server, data, 2048, (2, 2, 5))
+    installed = tmp_path / "app.AppImage"
+    installed.write_bytes(data)
+
+    result = aliux.zsync_update_file(aliux.Job("test"), str(installed), url)
+
+    assert result["status"] == "up-to-date"
+    assert [p for p, _r, _i in http_server.requests if p == "/app.AppImage"] == []
+
+
+def test_seq_matches_avoids_md4_on_unrelated_seed(monkeypatch):
+    # Sommes tronquées à 2 octets (gros fichiers): sans la confirmation par le bloc suivant,
+    # environ une position sur 32 déclenche un MD4 et des faux positifs passent.
+    rng = random.Random(3)
+    bs = 2048
+    target = rng.randbytes(2048 * bs // 4)
+    ctrl = aliux.parse_zsync(make_zsync(target, bs, (2, 2, 5)))
+    seed = rng.randbytes(256 * 1024)
+    calls = []
+    real_md4 = aliux.md4
+    monkeypatch.setattr(aliux, "md4", lambda data: calls.append(1) or real_md4(data))
+
+    assert aliux.zsync_match_blocks(seed, ctrl) == {}
+    assert len(calls) < 20
+
+
+def test_seq_matches_requires_next_block(monkeypatch):
+    rng = random.Random(4)
+    bs = 1024
+    target = rng.randbytes(8 * bs)
+    ctrl = aliux.parse_zsync(make_zsync(target, bs, (2, 2, 5)))
+    # Bloc 3 présent, mais suivi d'autre chose que le bloc 4: rejeté sans calculer de MD4
+    seed = target[3 * bs : 4 * bs] + rng.randbytes(bs)
+    calls = []
+    monkeypatch.setattr(aliux, "md4", lambda data: calls.append(1) or b"\0" * 16)
+    assert aliux.zsync_match_blocks(seed, ctrl) == {}
+    assert calls == []
+    monkeypatch.undo()
+
+    # Blocs 3 et 4 consécutifs: retenus tous les deux
+    seed = rng.randbytes(100) + target[3 * bs : 5 * bs] + rng.randbytes(100)
+    assert aliux.zsync_match_blocks(seed, ctrl) == {3: 100, 4: 100 + bs}